@@ -6,6 +6,7 @@ import logging
 from flask import jsonify
 from flasgger import Swagger
 from app.tasks.scheduler import start_scheduler
+from app.utils.compression import init_compression
 
 def setup_roles_on_startup(app):
     """Automatically setup roles when the app starts."""
@@ -105,6 +106,9 @@ def create_app(config_object=None):
     # register routes/blueprints
     register_routes(app)
 
+    # gzip/br for large JSON responses (app/utils/compression.py)
+    init_compression(app)
+
      # -------------------------------
     # 💠 Base route for your brand
     # -------------------------------
@@ -1,19 +1,31 @@
+from datetime import datetime
 from ..extensions import db
 from ..models import Attendance
+from ..models.attendance import ATTENDANCE_NATURAL_KEY, ATTENDANCE_UPSERT_COLUMNS
+from ..utils.attendance_rollup import rollup_key, refresh_rollup_buckets
+from ..utils.upsert import NaturalKeyConflictError, find_natural_key_conflict, upsert_one
 
 def create_attendance(data):
-
+    """
+    Record a submission. Submitting the same entity, period and service
+    again replaces the counts instead of adding a duplicate row, so client
+    retries are safe.
+    """
     data.setdefault("new_comers", 0)
     data.setdefault("tithe_offering", 0.00)
-    
-    attendance = Attendance(**data)
-    db.session.add(attendance)
+    data["updated_at"] = datetime.utcnow()
+
+    attendance = upsert_one(Attendance, data, ATTENDANCE_NATURAL_KEY, ATTENDANCE_UPSERT_COLUMNS)
+    refresh_rollup_buckets([rollup_key(attendance)])
     db.session.commit()
     return attendance
 
 
-def get_all_attendance(service_type=None, state_id=None, region_id=None, district_id=None, 
-                      group_id=None, old_group_id=None, year=None, month=None):
+MAX_PAGE_SIZE = 1000
+
+
+def build_attendance_query(service_type=None, state_id=None, region_id=None, district_id=None,
+                           group_id=None, old_group_id=None, year=None, month=None):
     query = Attendance.query
 
     print(f"🔍 [ATTENDANCE CONTROLLER] Building query with filters:")
@@ -40,6 +52,16 @@ def get_all_attendance(service_type=None, state_id=None, region_id=None, distric
         query = query.filter_by(year=year)
     if month:
         query = query.filter_by(month=month)
+
+    return query
+
+
+def get_all_attendance(service_type=None, state_id=None, region_id=None, district_id=None, 
+                      group_id=None, old_group_id=None, year=None, month=None):
+    query = build_attendance_query(
+        service_type=service_type, state_id=state_id, region_id=region_id, district_id=district_id,
+        group_id=group_id, old_group_id=old_group_id, year=year, month=month
+    )
     
     results = query.all()
     print(f"🔍 [ATTENDANCE CONTROLLER] Query returned {len(results)} records")
@@ -47,22 +69,67 @@ def get_all_attendance(service_type=None, state_id=None, region_id=None, distric
     return results
 
 
+def get_attendance_page(limit, cursor=None, **filters):
+    """
+    Keyset pagination on the primary key (ids grow with created_at).
+
+    Returns (records, next_cursor); next_cursor is None on the last page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = build_attendance_query(**filters)
+    if cursor is not None:
+        query = query.filter(Attendance.id > cursor)
+
+    # Fetch one extra row to know whether another page exists
+    records = query.order_by(Attendance.id.asc()).limit(limit + 1).all()
+    next_cursor = records[limit - 1].id if len(records) > limit else None
+
+    return records[:limit], next_cursor
+
+
+def iter_attendance(batch_size=500, **filters):
+    """
+    Yield matching records in id order without loading the whole result.
+
+    Uses a server-side cursor where the driver supports it (psycopg2) and
+    fetches `batch_size` rows at a time.
+    """
+    query = build_attendance_query(**filters).order_by(Attendance.id.asc())
+    yield from query.execution_options(stream_results=True).yield_per(batch_size)
+
+
 def get_attendance_by_id(attendance_id):
     return Attendance.query.get(attendance_id)
 
 def update_attendance(attendance_id, data):
+    """
+    Apply `data` to a record. Raises NaturalKeyConflictError (nothing is
+    changed) when the new entity/period/service is already another record's.
+    """
     attendance = Attendance.query.get(attendance_id)
     if not attendance:
         return None
+    previous = rollup_key(attendance)
     for key, value in data.items():
         setattr(attendance, key, value)
+
+    existing_id = find_natural_key_conflict(Attendance, attendance, ATTENDANCE_NATURAL_KEY)
+    if existing_id is not None:
+        db.session.rollback()
+        raise NaturalKeyConflictError(existing_id)
+
+    db.session.flush()
+    refresh_rollup_buckets([previous, rollup_key(attendance)])
     db.session.commit()
     return attendance
 
 def delete_attendance(attendance_id):
     attendance = Attendance.query.get(attendance_id)
     if attendance:
+        key = rollup_key(attendance)
         db.session.delete(attendance)
+        db.session.flush()
+        refresh_rollup_buckets([key])
         db.session.commit()
         return True
     return False
\ No newline at end of file
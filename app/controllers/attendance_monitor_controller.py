@@ -1,50 +1,73 @@
-from app.models import State, Region, District, Group, OldGroup, Attendance
-from app.utils.attendance_monitor import get_attendance_status
-from sqlalchemy import func, case
-from datetime import datetime
+from app.models import AttendanceRollup
+from app.utils.attendance_monitor import get_attendance_status, get_current_month_info
+from app.utils.hierarchy_cache import hierarchy_cache
+from app.utils.access_control import FULL_ACCESS, build_scope_predicate
+from sqlalchemy import func, literal, select, union_all
 from ..extensions import db
 
-def get_attendance_monitor_summary():
-    current_year = datetime.now().year
-    current_month = datetime.now().strftime('%B')  # e.g., "November"
-    
-    # Get all attendance data in ONE query
-    attendance_data = db.session.query(
-        Attendance.state_id,
-        Attendance.region_id, 
-        Attendance.district_id,
-        Attendance.group_id,
-        Attendance.old_group_id,
-        func.max(Attendance.week).label('last_week')
-    ).filter(
-        Attendance.year == current_year,
-        Attendance.month == current_month
-    ).group_by(
-        Attendance.state_id,
-        Attendance.region_id,
-        Attendance.district_id, 
-        Attendance.group_id,
-        Attendance.old_group_id
-    ).all()
-    
-    # Convert to dictionaries for fast lookup
-    state_weeks = {}
-    region_weeks = {}
-    district_weeks = {}
-    group_weeks = {}
-    old_group_weeks = {}
+# level -> rollup column holding that level's id
+MONITOR_LEVELS = {
+    "state": AttendanceRollup.state_id,
+    "region": AttendanceRollup.region_id,
+    "old_group": AttendanceRollup.old_group_id,
+    "group": AttendanceRollup.group_id,
+    "district": AttendanceRollup.district_id,
+}
+
+
+def get_last_weeks_by_level(year, month, scope=None):
+    """
+    MAX(week) per entity for every hierarchy level, as {level: {id: week}}.
+
+    The period's rollups (one row per hierarchy path and month, carrying its
+    last_week) are scanned once into a CTE, then each level takes the MAX over
+    its own id; the per-level aggregates are combined with UNION ALL so the
+    database is hit once.
+    """
+    filters = [AttendanceRollup.year == year, AttendanceRollup.month == month]
+    if scope is not None and scope != FULL_ACCESS:
+        filters.append(build_scope_predicate(scope, AttendanceRollup))
+
+    paths = select(
+        *MONITOR_LEVELS.values(),
+        func.max(AttendanceRollup.last_week).label("last_week"),
+    ).where(*filters).group_by(*MONITOR_LEVELS.values()).cte("monitor_paths")
+
+    statement = union_all(*[
+        select(
+            literal(level).label("level"),
+            paths.c[column.key].label("entity_id"),
+            func.max(paths.c.last_week).label("last_week"),
+        ).where(paths.c[column.key].isnot(None)).group_by(paths.c[column.key])
+        for level, column in MONITOR_LEVELS.items()
+    ])
+
+    last_weeks = {level: {} for level in MONITOR_LEVELS}
+    for level, entity_id, last_week in db.session.execute(statement):
+        last_weeks[level][entity_id] = last_week
+    return last_weeks
+
+
+def get_attendance_monitor_summary(scope=None):
+    """
+    Last filled week and status per state/region/district/group/old group.
+
+    `scope` is a (level, id) pair from access_control.resolve_scope; both the
+    aggregate and the entity lists are limited to that subtree. None (or
+    FULL_ACCESS) returns the whole hierarchy.
+    """
+    if scope == FULL_ACCESS:
+        scope = None
+
+    current_year, current_month, _, _ = get_current_month_info()  # e.g., 2026, "November"
     
-    for record in attendance_data:
-        if record.state_id:
-            state_weeks[record.state_id] = record.last_week
-        if record.region_id:
-            region_weeks[record.region_id] = record.last_week
-        if record.district_id:
-            district_weeks[record.district_id] = record.last_week
-        if record.group_id:
-            group_weeks[record.group_id] = record.last_week
-        if record.old_group_id:
-            old_group_weeks[record.old_group_id] = record.last_week
+    # Last filled week per entity of every level in ONE round-trip (from the pre-aggregated rollups)
+    last_weeks = get_last_weeks_by_level(current_year, current_month, scope)
+    state_weeks = last_weeks["state"]
+    region_weeks = last_weeks["region"]
+    district_weeks = last_weeks["district"]
+    group_weeks = last_weeks["group"]
+    old_group_weeks = last_weeks["old_group"]
     
     summary = {
         "states": [],
@@ -54,62 +77,61 @@ def get_attendance_monitor_summary():
         "old_groups": []
     }
 
-    # STATES - Single query
-    states = State.query.all()
+    # Hierarchy comes from the versioned in-process snapshot (no queries when warm),
+    # walked only within the scope subtree
+    hierarchy = hierarchy_cache.get()
+
+    # STATES
     summary["states"] = [{
-        "id": state.id,
-        "name": state.name,
-        "last_filled_week": state_weeks.get(state.id, 0),
-        "status": get_attendance_status(state_weeks.get(state.id, 0))
-    } for state in states]
-
-    # REGIONS - Single query  
-    regions = Region.query.all()
+        "id": state["id"],
+        "name": state["name"],
+        "last_filled_week": state_weeks.get(state["id"], 0),
+        "status": get_attendance_status(state_weeks.get(state["id"], 0))
+    } for state in hierarchy.in_scope("state", scope)]
+
+    # REGIONS
     summary["regions"] = [{
-        "id": region.id,
-        "name": region.name,
-        "last_filled_week": region_weeks.get(region.id, 0),
-        "status": get_attendance_status(region_weeks.get(region.id, 0))
-    } for region in regions]
-
-    # DISTRICTS - Single query
-    districts = District.query.all()
+        "id": region["id"],
+        "name": region["name"],
+        "last_filled_week": region_weeks.get(region["id"], 0),
+        "status": get_attendance_status(region_weeks.get(region["id"], 0))
+    } for region in hierarchy.in_scope("region", scope)]
+
+    # DISTRICTS
     summary["districts"] = [{
-        "id": district.id,
-        "name": district.name,
-        "last_filled_week": district_weeks.get(district.id, 0),
-        "status": get_attendance_status(district_weeks.get(district.id, 0)),
+        "id": district["id"],
+        "name": district["name"],
+        "last_filled_week": district_weeks.get(district["id"], 0),
+        "status": get_attendance_status(district_weeks.get(district["id"], 0)),
          # Add group information
-        "group_id": district.group_id,
-        "group": district.group.name if district.group else None,
+        "group_id": district["group_id"],
+        "group": hierarchy.name("group", district["group_id"]),
         # Also include region/state for hierarchical filtering
-        "region_id": district.region_id,
-        "region": district.region.name if district.region else None,
-        "state_id": district.state_id,
-        "state": district.state.name if district.state else None,
+        "region_id": district["region_id"],
+        "region": hierarchy.name("region", district["region_id"]),
+        "state_id": district["state_id"],
+        "state": hierarchy.name("state", district["state_id"]),
 
         # also including old groups
-        "old_group": district.old_group.name if district.group else None,
-        "old_group_id": district.old_group_id
+        "old_group": hierarchy.name("old_group", district["old_group_id"]) if district["group_id"] else None,
+        "old_group_id": district["old_group_id"]
 
-    } for district in districts]
+    } for district in hierarchy.in_scope("district", scope)]
 
-    # GROUPS - Single query
-    groups = Group.query.all()
+    # GROUPS
     summary["groups"] = [{
-        "id": group.id,
-        "name": group.name,
-        "last_filled_week": group_weeks.get(group.id, 0),
-        "status": get_attendance_status(group_weeks.get(group.id, 0))
-    } for group in groups]
-
-    # OLD GROUPS - Single query
-    old_groups = OldGroup.query.all()
+        "id": group["id"],
+        "name": group["name"],
+        "last_filled_week": group_weeks.get(group["id"], 0),
+        "status": get_attendance_status(group_weeks.get(group["id"], 0))
+    } for group in hierarchy.in_scope("group", scope)]
+
+    # OLD GROUPS
     summary["old_groups"] = [{
-        "id": old_group.id,
-        "name": old_group.name,
-        "last_filled_week": old_group_weeks.get(old_group.id, 0),
-        "status": get_attendance_status(old_group_weeks.get(old_group.id, 0))
-    } for old_group in old_groups]
+        "id": old_group["id"],
+        "name": old_group["name"],
+        "last_filled_week": old_group_weeks.get(old_group["id"], 0),
+        "status": get_attendance_status(old_group_weeks.get(old_group["id"], 0))
+    } for old_group in hierarchy.in_scope("old_group", scope)]
 
     return summary
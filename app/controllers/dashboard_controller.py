@@ -0,0 +1,134 @@
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from app.models import User, AttendanceRollup, State, Region, District, Group
+from ..extensions import db
+
+# Hierarchy counts each dashboard scope gets: key -> (model, filter column names)
+SCOPE_HIERARCHY_COUNTS = {
+    "global": {
+        "states_count": (State, ()),
+        "regions_count": (Region, ()),
+        "districts_count": (District, ()),
+        "groups_count": (Group, ()),
+    },
+    "state": {
+        "regions_count": (Region, ("state_id",)),
+        "districts_count": (District, ("state_id",)),
+        "groups_count": (Group, ("state_id",)),
+    },
+    "region": {
+        "districts_count": (District, ("region_id",)),
+        "groups_count": (Group, ("region_id",)),
+    },
+}
+
+
+def _filters(model, filters, columns=None):
+    return [getattr(model, column) == filters[column] for column in (columns or filters)]
+
+
+def build_summary_statement(access_scope):
+    """
+    The whole dashboard summary as ONE statement for an access scope from
+    dashboard_routes.get_user_access_scope: the rollup totals come from a
+    single scoped scan (a one-row CTE), users and hierarchy counts are
+    scalar subqueries next to it.
+    """
+    filters = access_scope.get("filters", {})
+    people = (
+        AttendanceRollup.men + AttendanceRollup.women
+        + AttendanceRollup.youth_boys + AttendanceRollup.youth_girls
+        + AttendanceRollup.children_boys + AttendanceRollup.children_girls
+    )
+
+    totals = select(
+        func.coalesce(func.sum(AttendanceRollup.record_count), 0).label("total_attendance_records"),
+        func.coalesce(func.sum(people), 0).label("total_attendance"),
+        func.coalesce(func.sum(AttendanceRollup.new_comers), 0).label("total_new_comers"),
+        func.coalesce(func.sum(AttendanceRollup.tithe_offering), 0).label("total_tithe_offering"),
+    ).where(*_filters(AttendanceRollup, filters)).cte("attendance_totals")
+
+    counts = [
+        select(func.count()).select_from(User).where(*_filters(User, filters))
+        .scalar_subquery().label("total_users")
+    ]
+    for key, (model, columns) in SCOPE_HIERARCHY_COUNTS.get(access_scope["scope"], {}).items():
+        counts.append(
+            select(func.count()).select_from(model).where(*_filters(model, filters, columns))
+            .scalar_subquery().label(key)
+        )
+
+    return select(*totals.c, *counts).select_from(totals)
+
+
+def _compute_summary(access_scope):
+    row = db.session.execute(build_summary_statement(access_scope)).mappings().one()
+    summary = {
+        "total_users": row["total_users"],
+        "total_attendance_records": int(row["total_attendance_records"] or 0),
+        "total_attendance": int(row["total_attendance"] or 0),
+        "total_new_comers": int(row["total_new_comers"] or 0),
+        "total_tithe_offering": float(row["total_tithe_offering"] or 0),
+    }
+    for key in SCOPE_HIERARCHY_COUNTS.get(access_scope["scope"], {}):
+        summary[key] = row[key]
+    return summary
+
+
+class SummaryCache:
+    """
+    Per-scope dashboard summaries kept for DASHBOARD_CACHE_SECONDS.
+
+    Every admin of the same scope (e.g. all admins of one state) shares an
+    entry, so a dashboard refreshed by many users costs one statement per
+    scope per TTL.
+
+    Entries only expire; writes don't invalidate them. Each worker process
+    holds its own cache, so clearing it on a write would only freshen the
+    process that took the write, and clearing on every submission would
+    empty it exactly when dashboards are busiest. Totals and hierarchy
+    counts can therefore lag attendance and hierarchy writes by up to
+    DASHBOARD_CACHE_SECONDS (0 disables the cache).
+    """
+
+    MAX_ENTRIES = 1024
+
+    def __init__(self):
+        self._entries = {}  # scope key -> (expires_at, summary)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(access_scope):
+        return access_scope["scope"], tuple(sorted(access_scope.get("filters", {}).items()))
+
+    def get(self, access_scope):
+        ttl = current_app.config.get("DASHBOARD_CACHE_SECONDS", 30)
+        key = self._key(access_scope)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return dict(entry[1])
+
+        summary = _compute_summary(access_scope)
+        if ttl > 0:
+            with self._lock:
+                if len(self._entries) >= self.MAX_ENTRIES:
+                    self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                    if len(self._entries) >= self.MAX_ENTRIES:
+                        self._entries.clear()
+                self._entries[key] = (now + ttl, summary)
+        return dict(summary)
+
+
+# Global instance
+summary_cache = SummaryCache()
+
+
+def get_dashboard_summary(access_scope):
+    """Scoped totals and hierarchy counts (cached briefly per scope)."""
+    return summary_cache.get(access_scope)
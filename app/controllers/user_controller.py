@@ -4,6 +4,7 @@ from app.models.hierarchy import Group, OldGroup
 from ..extensions import db
 from ..models import User, Role
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..utils.access_control import get_current_user
 
 
 
@@ -162,10 +163,9 @@ def create_user():
     data = request.get_json()
     print("🔍 [CREATE_USER] Incoming data:", data)  # Log incoming request body
 
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
+    current_user = get_current_user()
     if not current_user:
-        print("❌ [CREATE_USER] Current user not found for ID:", current_user_id)
+        print("❌ [CREATE_USER] Current user not found for ID:", get_jwt_identity())
         return jsonify({"error": "Unauthorized - User not found"}), 401
 
     print("👤 [CREATE_USER] Current user:", current_user.email, "Roles:", [r.name for r in current_user.roles])
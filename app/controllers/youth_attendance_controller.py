@@ -1,19 +1,35 @@
+from datetime import datetime
 from ..extensions import db
 from ..models import YouthAttendance
+from ..models.youth_attendance import YOUTH_ATTENDANCE_NATURAL_KEY, YOUTH_ATTENDANCE_UPSERT_COLUMNS
+from ..utils.upsert import NaturalKeyConflictError, find_natural_key_conflict, upsert_one, upsert_rows
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 def create_youth_attendance(data):
+    """Record a submission; the same district/period/type again replaces it."""
     logger.info(f"Creating youth attendance with data: {data}")
-    obj = YouthAttendance(**data)
-    db.session.add(obj)
+    data["updated_at"] = datetime.utcnow()
+    obj = upsert_one(YouthAttendance, data, YOUTH_ATTENDANCE_NATURAL_KEY, YOUTH_ATTENDANCE_UPSERT_COLUMNS)
     db.session.commit()
-    logger.info(f"Created youth attendance record ID: {obj.id}")
+    logger.info(f"Stored youth attendance record ID: {obj.id}")
     return obj
 
 
+def upsert_youth_attendance_rows(rows):
+    """
+    Bulk version of create_youth_attendance for uploads; the caller commits.
+    Returns the number of distinct submissions written (repeated natural
+    keys in `rows` count once, the last one wins).
+    """
+    now = datetime.utcnow()
+    for values in rows:
+        values["updated_at"] = now
+    return upsert_rows(YouthAttendance, rows, YOUTH_ATTENDANCE_NATURAL_KEY, YOUTH_ATTENDANCE_UPSERT_COLUMNS)
+
+
 # def get_all_youth_attendance(attendance_type=None, state_id=None, region_id=None, district_id=None, year=None, month=None):
 #     query = YouthAttendance.query
 
@@ -73,11 +89,18 @@ def get_youth_attendance_by_id(record_id):
 
 
 def update_youth_attendance(record_id, data):
+    """Raises NaturalKeyConflictError when the change collides with another record."""
     obj = YouthAttendance.query.get(record_id)
     if not obj:
         return None
     for key, value in data.items():
         setattr(obj, key, value)
+
+    existing_id = find_natural_key_conflict(YouthAttendance, obj, YOUTH_ATTENDANCE_NATURAL_KEY)
+    if existing_id is not None:
+        db.session.rollback()
+        raise NaturalKeyConflictError(existing_id)
+
     db.session.commit()
     return obj
 
@@ -2,8 +2,15 @@
 from .user import User, Role, Permission, user_roles, role_permissions
 # from .state import State
 from .attendance import Attendance
-from .hierarchy import State, Region, District, Group, OldGroup
+from .attendance_rollup import AttendanceRollup
+from .hierarchy import State, Region, District, Group, OldGroup, HierarchyVersion
 # youth attendance model
 from .youth_attendance import YouthAttendance
+# reminder outbox
+from .notification import NotificationJob, NotificationOutbox
+# scheduler leader election
+from .scheduler_lease import SchedulerLease
+# admin background jobs (imports)
+from .background_job import BackgroundJob
 # from .service import Service
 
@@ -1,8 +1,35 @@
 from ..extensions import db
 from datetime import datetime
+from sqlalchemy import func, literal_column
+
+# Natural key of a submission: one row per hierarchy position, period and
+# service. (column, value used for NULL): nullable levels are COALESCEd in
+# the unique index so that, e.g., two group-level rows (district NULL) for the
+# same week still collide. `app.utils.upsert` builds its ON CONFLICT target
+# from the same spec.
+ATTENDANCE_NATURAL_KEY = (
+    ("state_id", None), ("region_id", None),
+    ("old_group_id", 0), ("group_id", 0), ("district_id", 0),
+    ("year", None), ("month", None), ("week", None), ("service_type", None),
+)
+
+# Columns a re-submission under the same natural key overwrites
+ATTENDANCE_UPSERT_COLUMNS = (
+    "men", "women", "youth_boys", "youth_girls", "children_boys", "children_girls",
+    "new_comers", "tithe_offering", "updated_at",
+)
 
 class Attendance(db.Model):
     __tablename__ = "attendance"
+    # Hot paths filter on one hierarchy level + year/month and read MAX/ORDER BY week
+    __table_args__ = (
+        db.Index("ix_attendance_state_period", "state_id", "year", "month", "week"),
+        db.Index("ix_attendance_region_period", "region_id", "year", "month", "week"),
+        db.Index("ix_attendance_old_group_period", "old_group_id", "year", "month", "week"),
+        db.Index("ix_attendance_group_period", "group_id", "year", "month", "week"),
+        db.Index("ix_attendance_district_period", "district_id", "year", "month", "week"),
+        db.Index("ix_attendance_period", "year", "month", "week"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     service_type = db.Column(db.String(50), nullable=False)  # e.g. 'Sunday Worship Service'
@@ -40,14 +67,21 @@ class Attendance(db.Model):
     group = db.relationship("Group", backref="attendances")
     old_group = db.relationship("OldGroup", backref="attendances")
 
-    def to_dict(self):
+    def to_dict(self, hierarchy_names=None):
+        # Listings pass pre-resolved names (see utils.attendance_serializer)
+        # to avoid one lazy district SELECT per record
+        if hierarchy_names is not None:
+            district_name = hierarchy_names.get("district", {}).get(self.district_id)
+        else:
+            district_name = self.district.name if self.district else None
+
         return {
             "id": self.id,
             "service_type": self.service_type,
             "state_id": self.state_id,
             "region_id": self.region_id,
             "district_id": self.district_id,
-            "district_name": self.district.name if self.district else None,
+            "district_name": district_name,
 
             "group_id": self.group_id,
             "old_group_id": self.old_group_id,
@@ -64,3 +98,14 @@ class Attendance(db.Model):
             "year": self.year,
             "created_at": self.created_at.isoformat(),
         }
+
+
+db.Index(
+    "uq_attendance_submission",
+    *[
+        getattr(Attendance, column) if null_value is None
+        else func.coalesce(getattr(Attendance, column), literal_column(repr(null_value)))
+        for column, null_value in ATTENDANCE_NATURAL_KEY
+    ],
+    unique=True,
+)
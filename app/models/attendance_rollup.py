@@ -0,0 +1,90 @@
+from ..extensions import db
+from datetime import datetime
+from sqlalchemy import func, literal_column
+
+# Natural key of a rollup bucket: one row per hierarchy position and month.
+# Same (column, value used for NULL) format as ATTENDANCE_NATURAL_KEY, so
+# group- and region-level buckets (district/group NULL) collide in the unique
+# index below and `app.utils.upsert` can target it with ON CONFLICT.
+ROLLUP_NATURAL_KEY = (
+    ("state_id", None), ("region_id", None),
+    ("old_group_id", 0), ("group_id", 0), ("district_id", 0),
+    ("year", None), ("month", None),
+)
+
+
+class AttendanceRollup(db.Model):
+    """Pre-aggregated attendance totals.
+
+    One row per hierarchy position (state/region/old_group/group/district)
+    and month, summing every week and service submitted for it. Rows are kept
+    in step with the `attendance` table by `app.utils.attendance_rollup`, so
+    dashboard and monitor queries can aggregate this (much smaller) table
+    instead of the raw attendance history.
+    """
+
+    __tablename__ = "attendance_rollups"
+    __table_args__ = (
+        db.Index("ix_attendance_rollups_period", "year", "month"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Hierarchy key
+    state_id = db.Column(db.Integer, db.ForeignKey("states.id"), nullable=False)
+    region_id = db.Column(db.Integer, db.ForeignKey("regions.id"), nullable=False)
+    old_group_id = db.Column(db.Integer, db.ForeignKey("old_groups.id"), nullable=True)
+    group_id = db.Column(db.Integer, db.ForeignKey("groups.id"), nullable=True)
+    district_id = db.Column(db.Integer, db.ForeignKey("districts.id"), nullable=True)
+
+    # Period key
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.String(20), nullable=False)
+
+    # Totals
+    men = db.Column(db.Integer, nullable=False, default=0)
+    women = db.Column(db.Integer, nullable=False, default=0)
+    youth_boys = db.Column(db.Integer, nullable=False, default=0)
+    youth_girls = db.Column(db.Integer, nullable=False, default=0)
+    children_boys = db.Column(db.Integer, nullable=False, default=0)
+    children_girls = db.Column(db.Integer, nullable=False, default=0)
+    new_comers = db.Column(db.Integer, nullable=False, default=0)
+    tithe_offering = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    record_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Latest week submitted in the month (read by the attendance monitor)
+    last_week = db.Column(db.Integer, nullable=False, default=0)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "state_id": self.state_id,
+            "region_id": self.region_id,
+            "old_group_id": self.old_group_id,
+            "group_id": self.group_id,
+            "district_id": self.district_id,
+            "year": self.year,
+            "month": self.month,
+            "last_week": self.last_week,
+            "men": self.men,
+            "women": self.women,
+            "youth_boys": self.youth_boys,
+            "youth_girls": self.youth_girls,
+            "children_boys": self.children_boys,
+            "children_girls": self.children_girls,
+            "new_comers": self.new_comers,
+            "tithe_offering": float(self.tithe_offering or 0),
+            "record_count": self.record_count,
+        }
+
+
+db.Index(
+    "uq_attendance_rollups_key",
+    *[
+        getattr(AttendanceRollup, column) if null_value is None
+        else func.coalesce(getattr(AttendanceRollup, column), literal_column(repr(null_value)))
+        for column, null_value in ROLLUP_NATURAL_KEY
+    ],
+    unique=True,
+)
@@ -0,0 +1,53 @@
+from ..extensions import db
+from datetime import datetime
+
+
+class BackgroundJob(db.Model):
+    """A long-running task (e.g. a hierarchy import) run off the request path.
+
+    The endpoint records the job and hands it to `app.utils.job_runner`; the
+    runner's worker thread reports its stage/progress here while it works and
+    stores the outcome (counts, rejected rows, or the error) when it's done,
+    so any worker process can answer `GET /admin/jobs/<id>`.
+    """
+
+    __tablename__ = "background_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # registered handler name, e.g. import_hierarchy
+    params = db.Column(db.JSON, nullable=False)
+
+    # queued → running → completed | failed
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)
+    stage = db.Column(db.String(50), nullable=True)
+    progress = db.Column(db.Float, nullable=False, default=0.0)  # percent
+    counts = db.Column(db.JSON, nullable=True)
+    error_rows = db.Column(db.JSON, nullable=True)  # [{"row", "error"}]
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress or 0.0, 1),
+            "counts": self.counts or {},
+            "error_rows": self.error_rows or [],
+            "result": self.result,
+            "error": self.error,
+            "created_by": self.created_by,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f"<BackgroundJob {self.id} {self.kind} {self.status}>"
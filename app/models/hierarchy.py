@@ -1,4 +1,5 @@
 from app.extensions import db
+from datetime import datetime
 
 # =========================
 # State
@@ -150,6 +151,21 @@ class District(db.Model):
         }
 
 
+# =========================
+# HierarchyVersion
+# =========================
+class HierarchyVersion(db.Model):
+    """Single-row counter bumped on every hierarchy write.
+
+    In-process hierarchy caches compare against it to know when to rebuild,
+    which keeps every gunicorn worker consistent.
+    """
+    __tablename__ = 'hierarchy_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 # run on server after push  - 
 # docker exec -it church-backend flask db migrate -m "Restructure hierarchy to State->Region->OldGroups->Groups->Districts"
 
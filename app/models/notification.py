@@ -0,0 +1,104 @@
+from ..extensions import db
+from datetime import datetime
+
+
+class NotificationJob(db.Model):
+    """A reminder request accepted by the API.
+
+    The HTTP handler only records what was asked for (entity type, optional
+    entity id, channels); the outbox worker in `app.utils.notification_outbox`
+    expands it into one `NotificationOutbox` row per recipient and channel,
+    delivers them and keeps the counters below up to date.
+    """
+
+    __tablename__ = "notification_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # manual | targeted
+    entity_type = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=True)
+    methods = db.Column(db.JSON, nullable=False)
+
+    # queued → running → completed | failed
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    sent = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+
+    created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    messages = db.relationship("NotificationOutbox", backref="job", lazy="dynamic")
+
+    def to_dict(self):
+        done = self.sent + self.failed
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "entity_type": self.entity_type,
+            "entity_id": self.entity_id,
+            "methods": self.methods,
+            "status": self.status,
+            "total": self.total,
+            "sent": self.sent,
+            "failed": self.failed,
+            "pending": max(self.total - done, 0),
+            "progress": round(done / self.total * 100, 1) if self.total else (100.0 if self.finished_at else 0.0),
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f"<NotificationJob {self.id} {self.kind}:{self.entity_type} {self.status}>"
+
+
+class NotificationOutbox(db.Model):
+    """One message to one recipient over one channel.
+
+    Rows are written in the same transaction that plans the job and are only
+    marked `sent` after the provider accepted them, so a crash or deploy
+    mid-run leaves them `pending` (or `sending` with an expired lease) and
+    the next worker pass picks them up again.
+    """
+
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        db.Index("ix_notification_outbox_due", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey("notification_jobs.id"), nullable=False, index=True)
+    channel = db.Column(db.String(20), nullable=False)  # email | whatsapp
+    recipient = db.Column(db.String(255), nullable=False)  # email address or phone number
+    recipient_name = db.Column(db.String(255), nullable=True)
+    entity_name = db.Column(db.String(255), nullable=True)
+    payload = db.Column(db.JSON, nullable=False)
+
+    # pending → sending → sent | failed (pending again while retries remain)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "channel": self.channel,
+            "recipient": self.recipient,
+            "name": self.recipient_name,
+            "entity": self.entity_name,
+            "status": self.status,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None,
+        }
+
+    def __repr__(self):
+        return f"<NotificationOutbox {self.id} {self.channel}:{self.recipient} {self.status}>"
@@ -0,0 +1,21 @@
+from ..extensions import db
+
+
+class SchedulerLease(db.Model):
+    """Leader lease for background schedulers.
+
+    Every app process competes for the row named after its scheduler; the
+    holder renews `expires_at` on each heartbeat and is the only process
+    that runs scheduled jobs. See `app.tasks.leader`.
+    """
+
+    __tablename__ = "scheduler_leases"
+
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(120), nullable=True)
+    acquired_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<SchedulerLease {self.name} held by {self.holder} until {self.expires_at}>"
@@ -1,5 +1,20 @@
 from ..extensions import db
 from datetime import datetime
+from sqlalchemy import func, literal_column
+
+# Natural key of a youth submission (see ATTENDANCE_NATURAL_KEY in
+# attendance.py). Revival rows have no week, so period is part of the key.
+YOUTH_ATTENDANCE_NATURAL_KEY = (
+    ("attendance_type", None), ("state_id", None), ("region_id", None), ("district_id", None),
+    ("old_group_id", 0), ("group_id", 0),
+    ("year", 0), ("month", ""), ("week", 0), ("period", ""),
+)
+
+# Columns a re-submission under the same natural key overwrites
+YOUTH_ATTENDANCE_UPSERT_COLUMNS = (
+    "member_boys", "member_girls", "visitor_boys", "visitor_girls",
+    "male", "female", "testimony", "challenges", "solutions", "remarks", "updated_at",
+)
 
 
 class YouthAttendance(db.Model):
@@ -18,6 +33,12 @@ class YouthAttendance(db.Model):
     """
 
     __tablename__ = "youth_attendance"
+    __table_args__ = (
+        db.Index("ix_youth_attendance_state_period", "state_id", "year", "month", "week"),
+        db.Index("ix_youth_attendance_region_period", "region_id", "year", "month", "week"),
+        db.Index("ix_youth_attendance_district_period", "district_id", "year", "month", "week"),
+        db.Index("ix_youth_attendance_type_period", "attendance_type", "year", "month", "week"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     attendance_type = db.Column(db.String(50), nullable=False)  # 'weekly' | 'revival' | other
@@ -93,3 +114,14 @@ class YouthAttendance(db.Model):
             })
 
         return data
+
+
+db.Index(
+    "uq_youth_attendance_submission",
+    *[
+        getattr(YouthAttendance, column) if null_value is None
+        else func.coalesce(getattr(YouthAttendance, column), literal_column(repr(null_value)))
+        for column, null_value in YOUTH_ATTENDANCE_NATURAL_KEY
+    ],
+    unique=True,
+)
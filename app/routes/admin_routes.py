@@ -1,12 +1,16 @@
 # app/routes/admin_routes.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 from werkzeug.utils import secure_filename
 import importlib
 # from app.utils.excel_importer import import_hierarchy_from_excel
 # Force reload the module
 # importlib.reload(utils.excel_importer)
-from app.utils.excel_importer_new import import_hierarchy_from_excel
+from app.utils.district_import import missing_district_columns
+from flask_jwt_extended import get_jwt_identity, jwt_required
 from app.utils.access_control import require_role
+from app.utils.job_runner import get_job, job_runner
+from app.tasks import import_jobs  # registers the import job handlers
+from app.extensions import db
 import os
 import tempfile
 import datetime
@@ -15,53 +19,81 @@ from datetime import datetime
 admin_bp = Blueprint("admin_bp", __name__)
 
 
+def _save_upload(file):
+    """Uploads outlive the request when imported in the background: keep them in a temp file."""
+    suffix = os.path.splitext(secure_filename(file.filename))[1]
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+        file.save(tmp_file)
+        return tmp_file.name
+
+
+def _job_accepted(job):
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": url_for("admin_bp.job_status", job_id=job.id)
+    }), 202
+
+
 @admin_bp.post("/import-hierarchy")
+@jwt_required()
+@require_role(["super-admin"])
 def import_hierarchy():
-
+    """Queue a hierarchy workbook import; poll status_url for progress and the result."""
     if "file" not in request.files:
         return jsonify({"error": "No file provided"}), 400
 
     file = request.files["file"]
     state_name = request.form.get("state_name", "Rivers Central")  # 🎯 Default to Rivers Central
     import_districts = request.form.get('import_districts', 'false').lower() == 'true'
+    dry_run = request.form.get('dry_run', 'false').lower() == 'true'
     
     # Validate file type
     if not file.filename.endswith(('.xlsx', '.xls', '.csv')):
         return jsonify({"error": "Only Excel files (.xlsx, .xls, .csv) are allowed"}), 400
 
-    # Create temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-        file_path = tmp_file.name
-        file.save(file_path)
-
-    try:
-        print(f"=== Starting hierarchy import for state: {state_name} ===")
-        
-        # 🎯 Use enhanced importer with fixed state and region
-        result = import_hierarchy_from_excel(file_path, state_name, import_districts=import_districts)
-        
-        print(f"=== Hierarchy import completed ===")
-        
-        # Clean up
-        try:
-            os.unlink(file_path)
-        except:
-            pass
-            
-        return jsonify(result), 200
-        
-    except Exception as e:
-        print(f"=== Hierarchy import failed ===")
-        print(f"Error: {e}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
-        
-        # Clean up
-        try:
-            os.unlink(file_path)
-        except:
-            pass
-            
-        return jsonify({"error": str(e)}), 400
-
-        
\ No newline at end of file
+    job = job_runner.submit("import_hierarchy", {
+        "file_path": _save_upload(file),
+        "state_name": state_name,
+        "import_districts": import_districts,
+        "dry_run": dry_run,
+    }, created_by=int(get_jwt_identity()))
+    print(f"=== Hierarchy import for state {state_name} queued as job {job.id} ===")
+    return _job_accepted(job)
+
+
+@admin_bp.post("/import-districts")
+@jwt_required()
+@require_role(["super-admin"])
+def import_districts():
+    """Queue a districts CSV (district_name, group_name) import under existing groups."""
+    if "file" not in request.files:
+        return jsonify({"error": "No file provided"}), 400
+
+    file = request.files["file"]
+    dry_run = request.form.get('dry_run', 'false').lower() == 'true'
+
+    if not file.filename.endswith('.csv'):
+        return jsonify({"error": "Only CSV files are allowed"}), 400
+
+    file_path = _save_upload(file)
+    missing = missing_district_columns(file_path)
+    if missing:
+        os.unlink(file_path)
+        return jsonify({"error": f"Missing column in CSV: {', '.join(missing)}"}), 400
+
+    job = job_runner.submit("import_districts", {"file_path": file_path, "dry_run": dry_run},
+                           created_by=int(get_jwt_identity()))
+    print(f"=== District import queued as job {job.id} ===")
+    return _job_accepted(job)
+
+
+@admin_bp.get("/jobs/<int:job_id>")
+@jwt_required()
+@require_role(["super-admin"])
+def job_status(job_id):
+    """State, stage, progress %, counts and rejected rows of a background job."""
+    job = get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
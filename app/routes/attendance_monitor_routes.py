@@ -1,14 +1,25 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, url_for
 from app.controllers.attendance_monitor_controller import get_attendance_monitor_summary
-from app.controllers.reminder_controller import send_manual_reminders, send_targeted_reminders
+from app.controllers.reminder_controller import REMINDER_MODELS
 from app.models.hierarchy import Group, OldGroup, District, Region, State
 from app.models.user import User    
-from app.utils.access_control import require_role
+from app.models.notification import NotificationJob, NotificationOutbox
+from app.utils.access_control import require_role, get_current_user, get_current_principal, resolve_scope
+from app.utils.notification_outbox import enqueue_reminder_job
 from flasgger import swag_from
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
 monitor_bp = Blueprint("monitor_bp", __name__)
 
+# (role, user fields that must be set, error) checked in order for non-Super Admins
+MONITOR_ROLE_REQUIREMENTS = (
+    ("State Admin", ("state_id",), "State Admin must have a state assigned"),
+    ("Region Admin", ("state_id", "region_id"), "Region Admin must have state and region assigned"),
+    ("District Admin", ("state_id", "region_id", "district_id"), "District Admin must have complete hierarchy assigned"),
+    ("Group Admin", ("state_id", "region_id", "old_group_id", "group_id"), "Group Admin must have complete hierarchy assigned (state, region, old_group, group)"),
+    ("Old Group Admin", ("state_id", "region_id", "old_group_id"), "Old Group Admin must have state, region, and old_group assigned"),
+)
+
 
 @monitor_bp.get("/monitor/attendance")
 @jwt_required()
@@ -41,8 +52,7 @@ monitor_bp = Blueprint("monitor_bp", __name__)
     }
 })
 def attendance_monitor():
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
+    current_user = get_current_principal()
     
     if not current_user:
         return jsonify({"error": "User not found"}), 404
@@ -119,15 +129,13 @@ def attendance_monitor():
 
         return index
     
-    # Get the full summary first
-    full_summary = get_attendance_monitor_summary()
-    
     # Check if user is Super Admin
     user_roles = [role.name for role in current_user.roles]
     is_super_admin = "Super Admin" in user_roles
 
 
     if is_super_admin:
+        full_summary = get_attendance_monitor_summary()
         return jsonify({
             "data": full_summary,
             "summary": build_submission_index(full_summary)
@@ -135,151 +143,23 @@ def attendance_monitor():
 
         # return jsonify(format_submission_summary(full_summary)), 200
     
-    # For non-Super Admins, filter based on hierarchy
-    print("👤 Regular admin - filtering summary based on hierarchy")
-    
-    filtered_summary = {
-        "states": [],
-        "regions": [],
-        "districts": [],
-        "groups": [],
-        "old_groups": []
-    }
-    
-    if "State Admin" in user_roles:
-        if not current_user.state_id:
-            return jsonify({"error": "State Admin must have a state assigned"}), 400
-        
-        print(f"🔐 State Admin - filtering for state_id: {current_user.state_id}")
-        
-        # Filter states - only show user's state
-        filtered_summary["states"] = [
-            state for state in full_summary["states"] 
-            if state["id"] == current_user.state_id
-        ]
-        
-        # Filter regions - only show regions in user's state
-        user_state_regions = Region.query.filter_by(state_id=current_user.state_id).all()
-        region_ids = [region.id for region in user_state_regions]
-        filtered_summary["regions"] = [
-            region for region in full_summary["regions"]
-            if region["id"] in region_ids
-        ]
-        
-        # Filter districts - only show districts in user's state
-        user_state_districts = District.query.filter_by(state_id=current_user.state_id).all()
-        district_ids = [district.id for district in user_state_districts]
-        filtered_summary["districts"] = [
-            district for district in full_summary["districts"]
-            if district["id"] in district_ids
-        ]
-        
-        # Filter groups - only show groups in user's state
-        user_state_groups = Group.query.filter_by(state_id=current_user.state_id).all()
-        group_ids = [group.id for group in user_state_groups]
-        filtered_summary["groups"] = [
-            group for group in full_summary["groups"]
-            if group["id"] in group_ids
-        ]
-        
-        # Filter old_groups - only show old_groups in user's state
-        user_state_old_groups = OldGroup.query.filter_by(state_id=current_user.state_id).all()
-        old_group_ids = [old_group.id for old_group in user_state_old_groups]
-        filtered_summary["old_groups"] = [
-            old_group for old_group in full_summary["old_groups"]
-            if old_group["id"] in old_group_ids
-        ]
-        
-    elif "Region Admin" in user_roles:
-        if not current_user.state_id or not current_user.region_id:
-            return jsonify({"error": "Region Admin must have state and region assigned"}), 400
-        
-        print(f"🔐 Region Admin - filtering for region_id: {current_user.region_id}")
-        
-        # Filter regions - only show user's region
-        filtered_summary["regions"] = [
-            region for region in full_summary["regions"]
-            if region["id"] == current_user.region_id
-        ]
-        
-        # Filter districts - only show districts in user's region
-        user_region_districts = District.query.filter_by(region_id=current_user.region_id).all()
-        district_ids = [district.id for district in user_region_districts]
-        filtered_summary["districts"] = [
-            district for district in full_summary["districts"]
-            if district["id"] in district_ids
-        ]
-        
-        # Filter groups - only show groups in user's region
-        user_region_groups = Group.query.filter_by(region_id=current_user.region_id).all()
-        group_ids = [group.id for group in user_region_groups]
-        filtered_summary["groups"] = [
-            group for group in full_summary["groups"]
-            if group["id"] in group_ids
-        ]
-        
-        # Filter old_groups - only show old_groups in user's region
-        user_region_old_groups = OldGroup.query.filter_by(region_id=current_user.region_id).all()
-        old_group_ids = [old_group.id for old_group in user_region_old_groups]
-        filtered_summary["old_groups"] = [
-            old_group for old_group in full_summary["old_groups"]
-            if old_group["id"] in old_group_ids
-        ]
-        
-    elif "District Admin" in user_roles:
-        if not all([current_user.state_id, current_user.region_id, current_user.district_id]):
-            return jsonify({"error": "District Admin must have complete hierarchy assigned"}), 400
-        
-        print(f"🔐 District Admin - filtering for district_id: {current_user.district_id}")
-        
-        # Filter districts - only show user's district
-        filtered_summary["districts"] = [
-            district for district in full_summary["districts"]
-            if district["id"] == current_user.district_id
-        ]
-        
-        # Filter groups - only show groups in user's district
-        user_district_groups = Group.query.filter_by(district_id=current_user.district_id).all()
-        group_ids = [group.id for group in user_district_groups]
-        filtered_summary["groups"] = [
-            group for group in full_summary["groups"]
-            if group["id"] in group_ids
-        ]
-        
-    elif "Group Admin" in user_roles:
-        if not all([current_user.state_id, current_user.region_id, current_user.old_group_id, current_user.group_id]):
-            return jsonify({"error": "Group Admin must have complete hierarchy assigned (state, region, old_group, group)"}), 400
-        
-        print(f"🔐 Group Admin - filtering for group_id: {current_user.group_id}")
-        
-        # Filter groups - only show user's group
-        filtered_summary["groups"] = [
-            group for group in full_summary["groups"]
-            if group["id"] == current_user.group_id
-        ]
-        
-    elif "Old Group Admin" in user_roles:
-        if not all([current_user.state_id, current_user.region_id, current_user.old_group_id]):
-            return jsonify({"error": "Old Group Admin must have state, region, and old_group assigned"}), 400
-        
-        print(f"🔐 Old Group Admin - filtering for old_group_id: {current_user.old_group_id}")
-        
-        # Filter old_groups - only show user's old_group
-        filtered_summary["old_groups"] = [
-            old_group for old_group in full_summary["old_groups"]
-            if old_group["id"] == current_user.old_group_id
-        ]
-        
-        # Filter groups - only show groups in user's old_group
-        user_old_group_groups = Group.query.filter_by(old_group_id=current_user.old_group_id).all()
-        group_ids = [group.id for group in user_old_group_groups]
-        filtered_summary["groups"] = [
-            group for group in full_summary["groups"]
-            if group["id"] in group_ids
-        ]
-        
+    # For non-Super Admins, the summary is computed for their subtree only
+    print("👤 Regular admin - scoping summary to hierarchy")
+
+    for role_name, required_fields, message in MONITOR_ROLE_REQUIREMENTS:
+        if role_name in user_roles:
+            if not all(getattr(current_user, field) for field in required_fields):
+                return jsonify({"error": message}), 400
+            break
     else:
         return jsonify({"error": "Insufficient permissions to view attendance monitor"}), 403
+
+    scope = resolve_scope(current_user)
+    if scope is None:
+        return jsonify({"error": "Insufficient permissions to view attendance monitor"}), 403
+
+    print(f"🔐 Scoping attendance monitor to {scope[0]}_id: {scope[1]}")
+    filtered_summary = get_attendance_monitor_summary(scope)
     
     print(f"🔍 Returning filtered summary with counts - States: {len(filtered_summary['states'])}, Regions: {len(filtered_summary['regions'])}, Districts: {len(filtered_summary['districts'])}, Groups: {len(filtered_summary['groups'])}, Old Groups: {len(filtered_summary['old_groups'])}")
 
@@ -311,9 +191,9 @@ def attendance_monitor():
         }
     ],
     "responses": {
-        200: {
-            "description": "Emails sent successfully",
-            "examples": {"application/json": {"sent_to": ["admin1@gmail.com", "admin2@gmail.com"]}}
+        202: {
+            "description": "Reminders queued; poll status_url for progress",
+            "examples": {"application/json": {"job_id": 12, "status": "queued", "sent_via": ["email", "whatsapp"], "status_url": "/attendance-monitor/monitor/remind/jobs/12"}}
         },
         400: {"description": "Invalid entity type"},
     }
@@ -326,13 +206,10 @@ def manual_remind(entity_type):
     # Get methods from request body (default to both)
     data = request.get_json() or {}
     methods = data.get('methods', ['email', 'whatsapp'])
-    
-    result = send_manual_reminders(entity_type, methods=methods)
-    return jsonify({
-        "sent_via": methods,
-        "failed_list": result['failed_list'],
-        "detailed_results": result['notification_results']
-    }), 200
+
+    # Delivery happens in the outbox worker, not in this request
+    job = enqueue_reminder_job(entity_type, methods=methods, created_by=_current_user_id())
+    return _job_accepted(job)
 # def manual_remind(entity_type):
 #     valid = ["state", "region", "district", "group", "old_group"]
 #     if entity_type not in valid:
@@ -370,11 +247,14 @@ def manual_remind(entity_type):
         }
     ],
     "responses": {
-        200: {
-            "description": "Reminder emails sent successfully",
+        202: {
+            "description": "Reminders queued; poll status_url for progress",
             "examples": {
                 "application/json": {
-                    "sent_to": ["admin1@gmail.com", "admin2@gmail.com"]
+                    "job_id": 13,
+                    "status": "queued",
+                    "sent_via": ["email", "whatsapp"],
+                    "status_url": "/attendance-monitor/monitor/remind/jobs/13"
                 }
             }
         },
@@ -389,9 +269,69 @@ def targeted_remind(entity_type, entity_id):
     # Get methods from request body (default to both)
     data = request.get_json() or {}
     methods = data.get('methods', ['email', 'whatsapp'])
-    
-    results = send_targeted_reminders(entity_type, entity_id, methods=methods)
+
+    # Cheap existence check now, so a typo fails fast instead of in the worker
+    entity = REMINDER_MODELS[entity_type].query.get(entity_id)
+    if not entity:
+        return jsonify({"error": "Entity not found"}), 400
+
+    job = enqueue_reminder_job(entity_type, entity.id, methods=methods, created_by=_current_user_id())
+    return _job_accepted(job)
+
+
+@monitor_bp.get("/monitor/remind/jobs/<int:job_id>")
+@jwt_required()
+@swag_from({
+    "tags": ["Attendance Reminders"],
+    "summary": "Reminder job status",
+    "description": "Progress of a queued reminder job and the outcome for each recipient and channel. Filter recipients with ?status=pending|sending|sent|failed.",
+    "security": [{"BearerAuth": []}],
+    "parameters": [
+        {"name": "job_id", "in": "path", "required": True, "type": "integer"},
+        {"name": "status", "in": "query", "required": False, "type": "string",
+         "enum": ["pending", "sending", "sent", "failed"]}
+    ],
+    "responses": {
+        200: {
+            "description": "Job progress and per-recipient outcomes",
+            "examples": {
+                "application/json": {
+                    "job": {"id": 13, "status": "running", "total": 40, "sent": 31, "failed": 1, "pending": 8, "progress": 80.0},
+                    "recipients": [
+                        {"channel": "email", "recipient": "admin1@gmail.com", "name": "Admin One",
+                         "entity": "Lagos", "status": "sent", "attempts": 1, "last_error": None}
+                    ]
+                }
+            }
+        },
+        404: {"description": "Job not found"},
+    }
+})
+def reminder_job_status(job_id):
+    job = NotificationJob.query.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    recipients = job.messages.order_by(NotificationOutbox.id)
+    status = request.args.get("status")
+    if status:
+        recipients = recipients.filter(NotificationOutbox.status == status)
+
     return jsonify({
-        "sent_via": methods,
-        "detailed_results": results
+        "job": job.to_dict(),
+        "recipients": [message.to_dict() for message in recipients]
     }), 200
+
+
+def _current_user_id():
+    user = get_current_user()
+    return user.id if user else None
+
+
+def _job_accepted(job):
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "sent_via": job.methods,
+        "status_url": url_for("monitor_bp.reminder_job_status", job_id=job.id)
+    }), 202
@@ -1,11 +1,15 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from ..controllers import attendance_controller
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..utils.access_control import get_current_user, get_current_principal
 from ..models import User, Attendance
 from ..extensions import db
-import csv
-from io import StringIO
+import json
+from io import TextIOWrapper
 from ..utils.role_required import role_required
+from ..utils.attendance_import import import_attendance_csv, AttendanceImportError
+from ..utils.attendance_serializer import serialize_attendance, iter_serialized_attendance
+from ..utils.upsert import NaturalKeyConflictError
 from flasgger import swag_from
 
 
@@ -75,8 +79,7 @@ attendance_bp = Blueprint("attendance", __name__)
 })
 def create_attendance():
     data = request.get_json() or {}
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
+    current_user = get_current_user()
     
     print(f"🔍 Current user: {current_user.id}, Roles: {[r.name for r in current_user.roles]}")
     print(f"🔍 User hierarchy - State: {current_user.state_id}, Region: {current_user.region_id}, District: {current_user.district_id}, Group: {current_user.group_id}, OldGroup: {current_user.old_group_id}")
@@ -165,7 +168,7 @@ def create_attendance():
 @swag_from({
     "tags": ["Attendance"],
     "summary": "Bulk upload attendance via CSV",
-    "description": "Allows admins to upload multiple attendance records from a CSV file. The CSV must include headers matching the Attendance model fields.",
+    "description": "Allows admins to upload multiple attendance records from a CSV file. The CSV must include headers matching the Attendance model fields. Invalid rows are skipped and reported by line number; the valid ones are imported.",
     "consumes": ["multipart/form-data"],
     "parameters": [
         {
@@ -179,9 +182,14 @@ def create_attendance():
     "responses": {
         "201": {
             "description": "Attendance records uploaded successfully",
-            "examples": {"application/json": {"message": "45 attendance records uploaded successfully"}}
+            "examples": {"application/json": {
+                "message": "45 attendance records uploaded successfully",
+                "imported": 45,
+                "error_count": 1,
+                "errors": [{"row": 7, "error": "Group with ID 99 does not exist"}]
+            }}
         },
-        "400": {"description": "Invalid file format or missing CSV column"}
+        "400": {"description": "Invalid file format, missing CSV column, or no valid rows"}
     }
 })
 def upload_attendance_csv():
@@ -189,54 +197,25 @@ def upload_attendance_csv():
     if not file or not file.filename.endswith(".csv"):
         return jsonify({"error": "Invalid file format. Please upload a .csv file."}), 400
 
-    stream = StringIO(file.stream.read().decode("utf-8"))
-    csv_reader = csv.DictReader(stream)
+    # Decoded and parsed incrementally; the upload is never held in memory as a whole
+    stream = TextIOWrapper(file.stream, encoding="utf-8-sig", newline="")
 
-    records = []
-    for row in csv_reader:
-        try:
-            # Validate old_group_id exists if provided
-            if row.get("old_group_id") and row["old_group_id"].strip():
-                from ..models import OldGroup
-                old_group = OldGroup.query.get(int(row["old_group_id"]))
-                if not old_group:
-                    return jsonify({"error": f"Old Group with ID {row['old_group_id']} does not exist"}), 400
-            
-            # Validate group_id exists if provided
-            if row.get("group_id") and row["group_id"].strip():
-                from ..models import Group
-                group = Group.query.get(int(row["group_id"]))
-                if not group:
-                    return jsonify({"error": f"Group with ID {row['group_id']} does not exist"}), 400
+    try:
+        result = import_attendance_csv(stream)
+    except AttendanceImportError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
 
-            attendance = Attendance(
-                service_type=row["service_type"],
-                state_id=int(row["state_id"]),
-                region_id=int(row["region_id"]),
-                # district_id=int(row["district_id"]),
-                district_id=int(row["district_id"]) if row.get("district_id") and row["district_id"].strip() else None,
-                group_id=int(row["group_id"]) if row.get("group_id") and row["group_id"].strip() else None,
-                old_group_id=int(row["old_group_id"]) if row.get("old_group_id") and row["old_group_id"].strip() else None,
-                month=row["month"],
-                week=int(row["week"]),
-                men=int(row["men"]),
-                women=int(row["women"]),
-                youth_boys=int(row["youth_boys"]),
-                youth_girls=int(row["youth_girls"]),
-                children_boys=int(row["children_boys"]),
-                children_girls=int(row["children_girls"]),
-                year=int(row["year"]),
-            )
-            records.append(attendance)
-        except KeyError as e:
-            return jsonify({"error": f"Missing column in CSV: {e}"}), 400
-        except ValueError as e:
-            return jsonify({"error": f"Invalid data format in row: {e}"}), 400
+    if not result["imported"] and result["error_count"]:
+        db.session.rollback()
+        return jsonify({"error": "No valid attendance rows in CSV", **result}), 400
 
-    db.session.bulk_save_objects(records)
     db.session.commit()
 
-    return jsonify({"message": f"{len(records)} attendance records uploaded successfully"}), 201
+    return jsonify({
+        "message": f"{result['imported']} attendance records uploaded successfully",
+        **result
+    }), 201
 
 
 @attendance_bp.route("/attendance", methods=["GET"])
@@ -248,7 +227,11 @@ def upload_attendance_csv():
     "parameters": [
         {"name": "service_type", "in": "query", "type": "string", "required": False, "description": "Filter by service type"},
         {"name": "year", "in": "query", "type": "integer", "required": False, "description": "Filter by year"},
-        {"name": "month", "in": "query", "type": "string", "required": False, "description": "Filter by month"}
+        {"name": "month", "in": "query", "type": "string", "required": False, "description": "Filter by month"},
+        {"name": "limit", "in": "query", "type": "integer", "required": False, "description": "Page size (max 1000). Enables cursor pagination: response becomes {data, next_cursor}"},
+        {"name": "cursor", "in": "query", "type": "integer", "required": False, "description": "next_cursor value from the previous page"},
+        {"name": "stream", "in": "query", "type": "string", "required": False, "enum": ["ndjson"], "description": "Stream all matching records as newline-delimited JSON"},
+        {"name": "include_names", "in": "query", "type": "boolean", "required": False, "description": "Also include state/region/old_group/group names"}
     ],
     "responses": {
         "200": {
@@ -263,8 +246,7 @@ def upload_attendance_csv():
     }
 })
 def get_attendance():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_principal()
 
     service_type = request.args.get("service_type")
     year = request.args.get("year")
@@ -310,7 +292,7 @@ def get_attendance():
         print("🔍 Basic user - no access to attendance records")
         return jsonify([]), 200
 
-    records = attendance_controller.get_all_attendance(
+    filters = dict(
         service_type=service_type,
         state_id=state_id,      # None for Super Admin = no filter ✅
         region_id=region_id,    # None for Super Admin = no filter ✅
@@ -321,8 +303,33 @@ def get_attendance():
         month=month
     )
 
+    include_names = request.args.get("include_names", "false").lower() == "true"
+
+    # 🌊 Streaming mode: one JSON object per line, rows fetched in batches
+    if request.args.get("stream") == "ndjson":
+        def generate():
+            records = attendance_controller.iter_attendance(**filters)
+            for item in iter_serialized_attendance(records, include_names):
+                yield json.dumps(item) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    # 📄 Cursor pagination when a page size or cursor is supplied
+    limit = request.args.get("limit", type=int)
+    cursor = request.args.get("cursor", type=int)
+    if limit is not None or cursor is not None:
+        records, next_cursor = attendance_controller.get_attendance_page(
+            limit=limit or 100, cursor=cursor, **filters
+        )
+        return jsonify({
+            "data": serialize_attendance(records, include_names),
+            "next_cursor": next_cursor
+        }), 200
+
+    records = attendance_controller.get_all_attendance(**filters)
+
     print(f"✅ Found {len(records)} attendance records")
-    return jsonify([a.to_dict() for a in records]), 200
+    return jsonify(serialize_attendance(records, include_names)), 200
 
 
 
@@ -368,12 +375,16 @@ def get_one(attendance_id):
     ],
     "responses": {
         "200": {"description": "Attendance record updated successfully"},
-        "404": {"description": "Attendance record not found"}
+        "404": {"description": "Attendance record not found"},
+        "409": {"description": "Another record already exists for the new entity, period and service"}
     }
 })
 def update_attendance(attendance_id):
     data = request.get_json() or {}
-    attendance = attendance_controller.update_attendance(attendance_id, data)
+    try:
+        attendance = attendance_controller.update_attendance(attendance_id, data)
+    except NaturalKeyConflictError as e:
+        return jsonify({"error": str(e), "existing_id": e.existing_id}), 409
     if not attendance:
         return jsonify({"error": "not found"}), 404
     return jsonify(attendance.to_dict()), 200
@@ -4,6 +4,7 @@ from app.controllers.user_controller import can_create_role
 from ..extensions import db
 from ..models.user import User, Role, Permission
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from ..utils.access_control import get_current_user, user_claims
 from flasgger import swag_from
 
 auth_bp = Blueprint("auth", __name__)
@@ -85,8 +86,7 @@ def setup_admin():
 })
 def get_available_roles():
     """Get roles that the current user can assign to new users."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
+    current_user = get_current_user()
     
     all_roles = Role.query.all()
     available_roles = []
@@ -143,8 +143,7 @@ def create_admin():
         description: Insufficient permissions (not a Super Admin)
     """
     # Check if current user is Super Admin
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
+    current_user = get_current_user()
     
     current_user_roles = [r.name for r in current_user.roles]
     if "Super Admin" not in current_user_roles:
@@ -304,7 +303,8 @@ def login():
 
     # access = create_access_token(identity=user.id, additional_claims={"roles": [r.name for r in user.roles]})
     # refresh = create_refresh_token(identity=user.id)
-    access = create_access_token(identity=str(user.id), additional_claims={"roles": [r.name for r in user.roles]})
+    # Roles + hierarchy ids are signed into the token so read-only endpoints can skip the user lookup
+    access = create_access_token(identity=str(user.id), additional_claims=user_claims(user))
     refresh = create_refresh_token(identity=str(user.id))
 
     return jsonify({"access_token": access, "refresh_token": refresh, "user": user.to_dict()}), 200
@@ -326,9 +326,12 @@ def refresh():
       401:
         description: Missing or invalid refresh token
     """
-    user_id = get_jwt_identity()
+    user = get_current_user()
+    if not user:
+        return jsonify({"error": "User not found"}), 401
     # access = create_access_token(identity=user_id)
-    access = create_access_token(identity=str(user_id))
+    # Re-read roles/hierarchy so role changes reach the claims on refresh
+    access = create_access_token(identity=str(user.id), additional_claims=user_claims(user))
     return jsonify({"access_token": access}), 200
 
 
@@ -356,7 +359,7 @@ def delete_user(user_id):
       403:
         description: Insufficient permissions
     """
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
     user = User.query.get(user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -393,8 +396,7 @@ def me():
       404:
         description: User not found
     """
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user:
         return jsonify({"error": "user not found"}), 404
     return jsonify({"user": user.to_dict()}), 200
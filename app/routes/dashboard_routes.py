@@ -1,9 +1,12 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..utils.access_control import get_current_principal
 from ..models import User, Attendance, State, Region, District, Group, OldGroup
+from ..controllers import dashboard_controller
 from ..extensions import db
 from flasgger import swag_from
 from sqlalchemy import func
+from ..utils.attendance_serializer import serialize_attendance
 
 
 dashboard_bp = Blueprint("dashboard", __name__)
@@ -63,68 +66,17 @@ def get_user_access_scope(user):
     }
 })
 def get_dashboard_summary():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_principal()
     access_scope = get_user_access_scope(user)
-    
-    # Build queries based on access scope
-    users_query = User.query
-    attendance_query = Attendance.query
-
-    attendance_totals = attendance_query.with_entities(
-    func.sum(
-        Attendance.men +
-        Attendance.women +
-        Attendance.youth_boys +
-        Attendance.youth_girls +
-        Attendance.children_boys +
-        Attendance.children_girls
-    ).label("total_attendance"),
-    func.sum(Attendance.new_comers).label("total_new_comers"),
-    func.coalesce(func.sum(Attendance.tithe_offering), 0).label("total_tithe_offering")
-).first()
 
-    
-    if access_scope["scope"] == "state":
-        users_query = users_query.filter_by(state_id=user.state_id)
-        attendance_query = attendance_query.filter_by(state_id=user.state_id)
-    elif access_scope["scope"] == "region":
-        users_query = users_query.filter_by(state_id=user.state_id, region_id=user.region_id)
-        attendance_query = attendance_query.filter_by(state_id=user.state_id, region_id=user.region_id)
-    elif access_scope["scope"] == "district":
-        users_query = users_query.filter_by(state_id=user.state_id, region_id=user.region_id, district_id=user.district_id)
-        attendance_query = attendance_query.filter_by(state_id=user.state_id, region_id=user.region_id, district_id=user.district_id)
-    
-    summary = {
-        "total_users": users_query.count(),
-        "total_attendance_records": attendance_query.count(),
-        "total_attendance": int(attendance_totals.total_attendance or 0),
-        "total_new_comers": int(attendance_totals.total_new_comers or 0),
-        "total_tithe_offering": float(attendance_totals.total_tithe_offering or 0),
+    # One scoped statement over the rollups, users and hierarchy tables,
+    # shared by every admin of the same scope for a few seconds
+    summary = dashboard_controller.get_dashboard_summary(access_scope)
+    summary.update({
         "access_level": user.access_level(),
         "user_scope": access_scope["scope"]
-    }
-    
-    # Add hierarchy counts based on scope
-    if access_scope["scope"] == "global":
-        summary.update({
-            "states_count": State.query.count(),
-            "regions_count": Region.query.count(),
-            "districts_count": District.query.count(),
-            "groups_count": Group.query.count()
-        })
-    elif access_scope["scope"] == "state":
-        summary.update({
-            "regions_count": Region.query.filter_by(state_id=user.state_id).count(),
-            "districts_count": District.query.filter_by(state_id=user.state_id).count(),
-            "groups_count": Group.query.filter_by(state_id=user.state_id).count()
-        })
-    elif access_scope["scope"] == "region":
-        summary.update({
-            "districts_count": District.query.filter_by(region_id=user.region_id).count(),
-            "groups_count": Group.query.filter_by(region_id=user.region_id).count()
-        })
-    
+    })
+
     return jsonify(summary), 200
 
 @dashboard_bp.route("/dashboard/users", methods=["GET"])
@@ -145,8 +97,7 @@ def get_dashboard_summary():
     }
 })
 def get_users_in_scope():
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_principal()
     access_scope = get_user_access_scope(current_user)
     
     query = User.query
@@ -177,7 +128,8 @@ def get_users_in_scope():
     "description": "Returns attendance records that the current user has permission to view",
     "parameters": [
         {"name": "year", "in": "query", "type": "integer", "required": False},
-        {"name": "month", "in": "query", "type": "string", "required": False}
+        {"name": "month", "in": "query", "type": "string", "required": False},
+        {"name": "include_names", "in": "query", "type": "boolean", "required": False}
     ],
     "responses": {
         "200": {
@@ -191,8 +143,7 @@ def get_users_in_scope():
     }
 })
 def get_attendance_in_scope():
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_principal()
     access_scope = get_user_access_scope(current_user)
     
     year = request.args.get("year")
@@ -219,7 +170,8 @@ def get_attendance_in_scope():
         query = query.filter_by(month=month)
     
     attendance_records = query.limit(100).all()  # Limit for performance
-    return jsonify([a.to_dict() for a in attendance_records]), 200
+    include_names = request.args.get("include_names", "false").lower() == "true"
+    return jsonify(serialize_attendance(attendance_records, include_names)), 200
 
 @dashboard_bp.route("/dashboard/hierarchy", methods=["GET"])
 @jwt_required()
@@ -241,8 +193,7 @@ def get_attendance_in_scope():
     }
 })
 def get_hierarchy_in_scope():
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_principal()
     access_scope = get_user_access_scope(current_user)
     
     hierarchy_data = {}
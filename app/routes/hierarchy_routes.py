@@ -9,84 +9,10 @@ from io import BytesIO
 from flasgger import swag_from
 from app.models.user import User
 from app.models.youth_attendance import YouthAttendance
-from app.utils.access_control import require_role ##,restrict_by_access
-
-def restrict_by_access(query, user):
-    """
-    ENHANCED ACCESS CONTROL - Better model detection and role handling
-    """
-    print(f"🎯 ACCESS CONTROL for user {user.id}")
-    
-    if not user or not user.roles:
-        return query.filter_by(id=None)
-    
-    role_names = [r.name.lower() for r in user.roles]
-    print(f"🎯 User roles: {role_names}")
-    print(f"🎯 User hierarchy - state: {user.state_id}, region: {user.region_id}, district: {user.district_id}, group: {user.group_id}, old_group: {user.old_group_id}")
-    
-    # Try to detect model more reliably
-    query_str = str(query).lower()
-    
-    # 🎯 SUPER ADMIN - NO RESTRICTIONS
-    if "super admin" or "admin" in role_names:
-        print("🔓 SUPER ADMIN - Full access to all data")
-        return query
-    
-    # 🎯 STATE ADMIN
-    if "state admin" in role_names and user.state_id:
-        print(f"🔐 STATE ADMIN - Access to state_id: {user.state_id}")
-        if "from groups" in query_str:
-            return query.filter(Group.state_id == user.state_id)
-        elif "from districts" in query_str:
-            return query.filter(District.state_id == user.state_id)
-        elif "from regions" in query_str:
-            return query.filter(Region.state_id == user.state_id)
-        elif "from old_groups" in query_str:
-            return query.filter(OldGroup.state_id == user.state_id)
-        elif "from states" in query_str:
-            return query.filter(State.id == user.state_id)
-    
-    # 🎯 REGION ADMIN
-    elif "region admin" in role_names and user.region_id:
-        print(f"🔐 REGION ADMIN - Access to region_id: {user.region_id}")
-        if "from groups" in query_str:
-            return query.filter(Group.region_id == user.region_id)
-        elif "from districts" in query_str:
-            return query.filter(District.region_id == user.region_id)
-        elif "from old_groups" in query_str:
-            return query.filter(OldGroup.region_id == user.region_id)
-        elif "from regions" in query_str:
-            return query.filter(Region.id == user.region_id)
-    
-    # 🎯 DISTRICT ADMIN
-    elif "district admin" in role_names and user.district_id:
-        print(f"🔐 DISTRICT ADMIN - Access to district_id: {user.district_id}")
-        if "from groups" in query_str:
-            return query.filter(Group.district_id == user.district_id)
-        elif "from districts" in query_str:
-            return query.filter(District.id == user.district_id)
-    
-    # 🎯 GROUP ADMIN (WORKING)
-    elif "group admin" in role_names and user.group_id:
-        print(f"🔐 GROUP ADMIN - Access to group_id: {user.group_id}")
-        if "from groups" in query_str:
-            return query.filter(Group.id == user.group_id)
-        elif "from districts" in query_str:
-            return query.filter(District.group_id == user.group_id)
-    
-    # 🎯 OLD GROUP ADMIN
-    elif "old group admin" in role_names and user.old_group_id:
-        print(f"🔐 OLD GROUP ADMIN - Access to old_group_id: {user.old_group_id}")
-        if "from groups" in query_str:
-            return query.filter(Group.old_group_id == user.old_group_id)
-        elif "from districts" in query_str:
-            return query.filter(District.old_group_id == user.old_group_id)
-        elif "from old_groups" in query_str:
-            return query.filter(OldGroup.id == user.old_group_id)
-    
-    print(f"🚫 No access granted for user {user.id}")
-    return query.filter_by(id=None)
-
+from app.utils.access_control import (
+    require_role, restrict_by_access, get_current_user, get_current_principal, resolve_scope, FULL_ACCESS,
+)
+from app.utils.hierarchy_cache import hierarchy_cache, bump_hierarchy_version, hierarchy_etag, TREE_LEVELS
 
 hierarchy_bp = Blueprint('hierarchy_bp', __name__)
 
@@ -95,8 +21,7 @@ hierarchy_bp = Blueprint('hierarchy_bp', __name__)
 @jwt_required()
 def test_all_roles():
     """Test access control for current user across all models"""
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_user()
     
     if not current_user:
         return jsonify({"error": "User not found"}), 404
@@ -140,8 +65,7 @@ def test_all_roles():
 @jwt_required()
 def test_simple_access():
     """Test the simple access control"""
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_user()
     
     if not current_user:
         return jsonify({"error": "User not found"}), 404
@@ -173,6 +97,7 @@ def test_simple_access():
 ### ---------- STATES ----------
 @hierarchy_bp.route('/states', methods=['GET'])
 @jwt_required()
+@hierarchy_etag()
 def get_states():
     """
     Get All States
@@ -198,8 +123,7 @@ def get_states():
                 type: string
     """
 
-    user_id = get_jwt_identity()  # ADD THIS
-    current_user = User.query.get(user_id)  # ADD THIS
+    current_user = get_current_principal()
     # current_user = User.query.get(get_jwt_identity())
     # states = State.query.all()
     states = restrict_by_access(State.query, current_user).all()
@@ -255,6 +179,7 @@ def create_state():
     data = request.get_json()
     new_state = State(name=data['name'], code=data['code'], leader=data.get('leader'), leader_email=data.get('leader_email'), leader_phone=data.get('leader_phone'))
     db.session.add(new_state)
+    bump_hierarchy_version()
     db.session.commit()
     return jsonify({"message": "State created successfully"}), 201
 
@@ -309,6 +234,7 @@ def upload_states():
 
         state = State(name=name, code=code, leader=leader, leader_email=leader_email, leader_phone=leader_phone)
         db.session.add(state)
+    bump_hierarchy_version()
     db.session.commit()
     return jsonify({"message": "States uploaded successfully"}), 201
 
@@ -353,6 +279,7 @@ def update_state(id):
     state.leader = data.get("leader", state.leader)
     state.leader_email = data.get("leader_email", state.leader_email)
     state.leader_phone = data.get("leader_phone", state.leader_phone)
+    bump_hierarchy_version()
     db.session.commit()
     return jsonify(state.to_dict()), 200
 
@@ -383,6 +310,7 @@ def delete_state(id):
     """
     state = State.query.get_or_404(id)
     db.session.delete(state)
+    bump_hierarchy_version()
     db.session.commit()
     return jsonify({"message": "State deleted"}), 200
 
@@ -427,7 +355,7 @@ def create_region():
     """
 
     data = request.get_json()
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
 
     # Validate required fields
     required_fields = ["name", "code", "state_id"]
@@ -449,6 +377,7 @@ def create_region():
         state_id=data['state_id']
     )
     db.session.add(region)
+    bump_hierarchy_version()
     db.session.commit()
     return jsonify({"message": "Region created"}), 201
 
@@ -479,6 +408,7 @@ def create_region():
 
 @hierarchy_bp.route('/regions', methods=['GET'])
 @jwt_required()
+@hierarchy_etag()
 def get_regions():
     """
     Get All Regions
@@ -492,8 +422,7 @@ def get_regions():
     """
 
     # current_user = User.query.get(get_jwt_identity())
-    user_id = get_jwt_identity()  # ADD THIS
-    current_user = User.query.get(user_id)  # ADD THIS
+    current_user = get_current_principal()
     regions = restrict_by_access(Region.query, current_user).all()
 
     # return jsonify([r.to_dict() for r in regions])
@@ -544,7 +473,7 @@ def update_region(id):
         description: Region updated successfully
     """
     data = request.get_json() or {}
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
     region = Region.query.get_or_404(id)
 
     # 🎯 ADD ACCESS CONTROL
@@ -562,6 +491,7 @@ def update_region(id):
     region.leader = data.get("leader", region.leader)
     region.leader_email = data.get("leader_email", region.leader_email)
     region.leader_phone = data.get("leader_phone", region.leader_phone)
+    bump_hierarchy_version()
     db.session.commit()
     return jsonify(region.to_dict()), 200
 
@@ -586,7 +516,7 @@ def delete_region(id):
       200:
         description: Region deleted successfully
     """
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
     region = Region.query.get_or_404(id)
 
     # 🎯 ADD ACCESS CONTROL
@@ -600,6 +530,7 @@ def delete_region(id):
             return jsonify({"error": "You do not have permission to delete regions"}), 403
 
     db.session.delete(region)
+    bump_hierarchy_version()
     db.session.commit()
     return jsonify({"message": "Region deleted"}), 200
 
@@ -650,7 +581,7 @@ def create_district():
     """
 
     data = request.get_json()
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
 
     # 🎯 FIX: Only restrict non-Super Admin users
     # Check if user is NOT Super Admin before applying restrictions
@@ -682,6 +613,7 @@ def create_district():
     )
     
     db.session.add(district)
+    bump_hierarchy_version()
     db.session.commit()
     
     return jsonify({"message": "District created"}), 201
@@ -689,6 +621,7 @@ def create_district():
 
 @hierarchy_bp.route('/districts', methods=['GET'])
 @jwt_required()
+@hierarchy_etag()
 def get_districts():
     """
     Get All Districts
@@ -701,8 +634,7 @@ def get_districts():
     """
 
     # current_user = User.query.get(get_jwt_identity())
-    user_id = get_jwt_identity()  # ADD THIS
-    current_user = User.query.get(user_id)  # ADD THIS
+    current_user = get_current_principal()
     districts = restrict_by_access(District.query, current_user).all()
 
     # return jsonify([d.to_dict() for d in districts])
@@ -731,8 +663,7 @@ def get_districts():
 @jwt_required()
 def debug_group_admin():
     """Debug route to check Group Admin access"""
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_user()
     
     if not current_user:
         return jsonify({"error": "User not found"}), 404
@@ -791,8 +722,7 @@ def debug_group_admin():
 @jwt_required()
 def test_group_access():
     """Simple test to verify Group Admin access"""
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_user()
     
     if not current_user:
         return jsonify({"error": "User not found"}), 404
@@ -825,8 +755,7 @@ def test_group_access():
 @jwt_required()
 def test_direct_groups():
     """Test groups without access control"""
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_user()
     
     if not current_user:
         return jsonify({"error": "User not found"}), 404
@@ -851,8 +780,7 @@ def test_direct_groups():
 @jwt_required()
 def test_restrict_function():
     """Test the restrict_by_access function directly"""
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_user()
     
     if not current_user:
         return jsonify({"error": "User not found"}), 404
@@ -900,8 +828,7 @@ def debug_access():
       200:
         description: response with detailed access data of logged in user
     """
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_user()
     
     if not current_user:
         return jsonify({"error": "User not found"}), 404
@@ -969,7 +896,7 @@ def update_district(id):
       200:
         description: District updated successfully
     """
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
     data = request.get_json() or {}
     district = District.query.get_or_404(id)
 
@@ -1016,6 +943,7 @@ def update_district(id):
         if changed_hierarchy_fields:
             return jsonify({"error": f"You cannot change hierarchy fields: {', '.join(changed_hierarchy_fields)}"}), 403
 
+    bump_hierarchy_version()
     db.session.commit()
     return jsonify(district.to_dict()), 200
 
@@ -1048,7 +976,7 @@ def delete_district(id):
       200:
         description: District deleted successfully
     """
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
     district = District.query.get_or_404(id)
 
     print(f"🔍 User: {current_user.id}, Roles: {[r.name for r in current_user.roles]}")
@@ -1087,6 +1015,7 @@ def delete_district(id):
         }), 400
 
     db.session.delete(district)
+    bump_hierarchy_version()
     db.session.commit()
     
     return jsonify({"message": "District deleted successfully"}), 200
@@ -1150,7 +1079,7 @@ def delete_district(id):
 })
 def create_group():
     data = request.get_json() or {}
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
 
     print(f"🔍 User: {current_user.id}, Roles: {[r.name for r in current_user.roles]}")
     print(f"🔍 Received data: {data}")
@@ -1189,6 +1118,7 @@ def create_group():
     )
 
     db.session.add(group)
+    bump_hierarchy_version()
     db.session.commit()
 
     return jsonify({
@@ -1242,6 +1172,7 @@ def create_group():
 
 @hierarchy_bp.route('/groups', methods=['GET'])
 @jwt_required()
+@hierarchy_etag()
 @swag_from({
     "tags": ["Groups"],
     "summary": "List all groups",
@@ -1268,8 +1199,7 @@ def create_group():
 def get_groups():
 
     # current_user = User.query.get(get_jwt_identity())
-    user_id = get_jwt_identity()  # ADD THIS
-    current_user = User.query.get(user_id)  # ADD THIS
+    current_user = get_current_principal()
 
     groups = restrict_by_access(Group.query, current_user).all()
 
@@ -1311,7 +1241,7 @@ def get_groups():
     },
 })
 def delete_group(group_id):
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
     group = Group.query.get_or_404(group_id)
 
     # 🎯 ADD ACCESS CONTROL
@@ -1329,6 +1259,7 @@ def delete_group(group_id):
             return jsonify({"error": "You do not have permission to delete groups"}), 403
 
     db.session.delete(group)
+    bump_hierarchy_version()
     db.session.commit()
     
     return jsonify({"status": "success", "message": f"Group {group_id} deleted"}), 200
@@ -1386,7 +1317,7 @@ def delete_group(group_id):
 })
 def create_oldgroup():
     data = request.get_json() or {}
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
 
     print(f"🔍 User: {current_user.id}, Roles: {[r.name for r in current_user.roles]}")
 
@@ -1427,6 +1358,7 @@ def create_oldgroup():
     )
 
     db.session.add(old_group)
+    bump_hierarchy_version()
     db.session.commit()
 
     return jsonify({
@@ -1534,7 +1466,7 @@ def create_oldgroup():
     }
 })
 def update_oldgroup(id):
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
     data = request.get_json() or {}
     
     old_group = OldGroup.query.get(id)
@@ -1584,6 +1516,7 @@ def update_oldgroup(id):
         if 'state_id' in data or 'region_id' in data:
             return jsonify({"error": "You cannot change the hierarchy location of old groups"}), 403
     
+    bump_hierarchy_version()
     db.session.commit()
 
     return jsonify({
@@ -1669,7 +1602,7 @@ def update_oldgroup(id):
     }
 })
 def delete_oldgroup(id):
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
     
     old_group = OldGroup.query.get(id)
     if not old_group:
@@ -1690,6 +1623,7 @@ def delete_oldgroup(id):
             return jsonify({"error": "You do not have permission to delete old groups"}), 403
 
     db.session.delete(old_group)
+    bump_hierarchy_version()
     db.session.commit()
 
     return jsonify({"message": "Old Group deleted successfully"}), 200
@@ -1760,6 +1694,7 @@ def get_oldgroup(id):
 
 @hierarchy_bp.route('/oldgroups', methods=['GET'])
 @jwt_required()
+@hierarchy_etag()
 @swag_from({
     "tags": ["Old Groups"],
     "summary": "Get old groups",
@@ -1784,8 +1719,7 @@ def get_oldgroup(id):
 })
 def get_oldgroups():
 
-    user_id = get_jwt_identity()  # ADD THIS
-    current_user = User.query.get(user_id)  # ADD THIS
+    current_user = get_current_principal()
 
     oldgroups = restrict_by_access(OldGroup.query, current_user).all()
     # oldgroups = OldGroup.query.all()
@@ -1808,6 +1742,7 @@ def get_oldgroups():
 
 
 @hierarchy_bp.route("/oldgroups/by_region/<int:region_id>", methods=['GET'])
+@hierarchy_etag(scoped=False)
 @swag_from({
     "tags": ["Old Groups"],
     "summary": "Get Old Groups by Region",
@@ -1828,10 +1763,11 @@ def get_oldgroups():
     },
 })
 def oldgroups_by_region(region_id):
-    old_groups = OldGroup.query.filter_by(region_id=region_id).all()
-    return jsonify([og.to_dict() for og in old_groups])
+    old_groups = hierarchy_cache.get().children("old_group", "region_id", region_id)
+    return jsonify(old_groups)
 
 @hierarchy_bp.route("/groups/by_oldgroup/<int:old_group_id>", methods=['GET'])
+@hierarchy_etag(scoped=False)
 @swag_from({
     "tags": ["Groups"],
     "summary": "Get Groups by Old Group",
@@ -1852,10 +1788,11 @@ def oldgroups_by_region(region_id):
     },
 })
 def groups_by_oldgroup(old_group_id):
-    groups = Group.query.filter_by(old_group_id=old_group_id).all()
-    return jsonify([g.to_dict() for g in groups])
+    groups = hierarchy_cache.get().children("group", "old_group_id", old_group_id)
+    return jsonify(groups)
 
 @hierarchy_bp.route("/districts/by_group/<int:group_id>", methods=['GET'])
+@hierarchy_etag(scoped=False)
 @swag_from({
     "tags": ["Districts"],
     "summary": "Get Districts by Group",
@@ -1876,11 +1813,12 @@ def groups_by_oldgroup(old_group_id):
     },
 })
 def districts_by_group(group_id):
-    districts = District.query.filter_by(group_id=group_id).all()
-    return jsonify([d.to_dict() for d in districts])
+    districts = hierarchy_cache.get().children("district", "group_id", group_id)
+    return jsonify(districts)
 
 
 @hierarchy_bp.route("/regions/by_state/<int:state_id>", methods=["GET"])
+@hierarchy_etag(scoped=False)
 @swag_from({
     "tags": ["Regions"],
     "summary": "Get Regions by State",
@@ -1902,10 +1840,11 @@ def districts_by_group(group_id):
     },
 })
 def regions_by_state(state_id):
-    regions = Region.query.filter_by(state_id=state_id).all()
-    return jsonify([r.to_dict() for r in regions])
+    regions = hierarchy_cache.get().children("region", "state_id", state_id)
+    return jsonify(regions)
 
 @hierarchy_bp.route("/districts/by_region/<int:region_id>", methods=["GET"])
+@hierarchy_etag(scoped=False)
 @swag_from({
     "tags": ["Districts"],
     "summary": "Get Districts by Region",
@@ -1926,10 +1865,11 @@ def regions_by_state(state_id):
     },
 })
 def districts_by_region(region_id):
-    districts = District.query.filter_by(region_id=region_id).all()
-    return jsonify([d.to_dict() for d in districts])
+    districts = hierarchy_cache.get().children("district", "region_id", region_id)
+    return jsonify(districts)
 
 @hierarchy_bp.route("/groups/by_district/<int:district_id>", methods=["GET"])
+@hierarchy_etag(scoped=False)
 @swag_from({
     "tags": ["Groups"],
     "summary": "Get Groups by District",
@@ -1954,6 +1894,7 @@ def groups_by_district(district_id):
     return jsonify([g.to_dict() for g in groups])
 
 @hierarchy_bp.route("/oldgroups/by_group/<int:group_id>", methods=["GET"])
+@hierarchy_etag(scoped=False)
 @swag_from({
     "tags": ["Old Groups"],
     "summary": "Get Old Groups by Group",
@@ -1978,6 +1919,81 @@ def oldgroups_by_group(group_id):
     return jsonify([og.to_dict() for og in old_groups])
 
 
+### ---------- TREE ----------
+@hierarchy_bp.route("/tree", methods=["GET"])
+@jwt_required()
+@hierarchy_etag()
+def get_hierarchy_tree():
+    """
+    Get Hierarchy Tree
+    ---
+    tags:
+      - Hierarchy
+    description: >
+      The caller's State → Region → OldGroup → Group → District tree in one
+      nested payload (replaces the by_state/by_region/by_oldgroup/by_group
+      cascade). Each node has id, name, code and its children under the next
+      level's key. Super Admins get every state; other admins get the subtree
+      of their own scope.
+    parameters:
+      - name: root
+        in: query
+        type: string
+        required: false
+        description: Start at this entity instead, as level:id (e.g. region:12); must be inside the caller's scope
+      - name: depth
+        in: query
+        type: integer
+        required: false
+        description: Number of levels to return, counting the root level (default all)
+    responses:
+      200:
+        description: Nested tree keyed by the root level, e.g. states → regions → old_groups → groups → districts
+      400:
+        description: Invalid root or depth
+      403:
+        description: Root is outside the caller's scope
+      404:
+        description: Root not found
+    """
+    depth = request.args.get("depth", type=int)
+    if depth is not None and depth < 1:
+        return jsonify({"error": "depth must be a positive integer"}), 400
+
+    levels = {level: key for level, key, _ in TREE_LEVELS}
+    scope = resolve_scope(get_current_principal())
+    hierarchy = hierarchy_cache.get()
+
+    root = request.args.get("root")
+    if root:
+        level, _, entity_id = root.partition(":")
+        if level not in levels or not entity_id.isdigit():
+            return jsonify({"error": f"root must be <level>:<id> with level one of {', '.join(levels)}"}), 400
+        entity = hierarchy.get(level, int(entity_id))
+        if entity is None:
+            return jsonify({"error": f"{level} {entity_id} not found"}), 404
+
+        if scope != FULL_ACCESS:
+            scope_level, scope_id = scope or (None, None)
+            order = list(levels)
+            inside = scope is not None and order.index(level) >= order.index(scope_level) and (
+                entity["id"] == scope_id if level == scope_level else entity.get(f"{scope_level}_id") == scope_id
+            )
+            if not inside:
+                return jsonify({"error": "You do not have access to this part of the hierarchy"}), 403
+        ids = [entity["id"]]
+
+    elif scope == FULL_ACCESS:
+        level, ids = "state", hierarchy.ids("state")
+    elif scope is None:
+        return jsonify({"states": []})
+    else:
+        level, scope_id = scope
+        ids = [scope_id]
+
+    return jsonify({levels[level]: hierarchy.tree(level, ids, depth)})
+
+
 @hierarchy_bp.route("/group/<int:id>", methods=["PUT"])
 @swag_from({
     "tags": ["Groups"],
@@ -2009,7 +2025,7 @@ def oldgroups_by_group(group_id):
 @jwt_required()
 def update_group(id):
 
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_current_user()
     group = Group.query.get_or_404(id)
     data = request.get_json() or {}
     
@@ -2037,6 +2053,7 @@ def update_group(id):
     group.leader = data.get("leader", group.leader)
     group.leader_email = data.get("leader_email", group.leader_email)
     group.leader_phone = data.get("leader_phone", group.leader_phone)
+    bump_hierarchy_version()
     db.session.commit()
     return jsonify(group.to_dict()), 200
 
@@ -1,6 +1,7 @@
 # app/routes/profile_routes.py
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..utils.access_control import get_current_user
 from ..extensions import db
 from ..models import User
 
@@ -24,8 +25,7 @@ def get_profile():
         description: Unauthorized
     """
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         
         if not user:
             return jsonify({"error": "User not found"}), 404
@@ -80,8 +80,7 @@ def change_password():
         description: Unauthorized or current password incorrect
     """
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         
         if not user:
             return jsonify({"error": "User not found"}), 404
@@ -162,8 +161,7 @@ def update_profile():
         description: Email already exists
     """
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         
         if not user:
             return jsonify({"error": "User not found"}), 404
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from ..controllers import youth_attendance_controller
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..utils.access_control import get_current_principal
+from ..utils.upsert import NaturalKeyConflictError
 from ..models import User, YouthAttendance
 from ..extensions import db
 import csv
@@ -126,15 +128,16 @@ def upload_youth_csv():
                     "remarks": row.get("remarks"),
                 })
 
-            records.append(YouthAttendance(**base))
+            records.append(base)
         except KeyError as e:
             return jsonify({"error": f"Missing column: {e}"}), 400
         except ValueError as e:
             return jsonify({"error": f"Invalid value: {e}"}), 400
 
-    db.session.bulk_save_objects(records)
+    # Re-uploading the same rows replaces them instead of duplicating
+    uploaded = youth_attendance_controller.upsert_youth_attendance_rows(records)
     db.session.commit()
-    return jsonify({"message": f"{len(records)} records uploaded"}), 201
+    return jsonify({"message": f"{uploaded} records uploaded"}), 201
 
 
 @ya_bp.route("/youth-attendance", methods=["GET"])
@@ -151,8 +154,7 @@ def upload_youth_csv():
     "responses": {"200": {"description": "List returned"}, "401": {"description": "Unauthorized"}}
 })
 def list_youth():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_principal()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -271,11 +273,18 @@ def get_youth_one(ya_id):
         {"name": "ya_id", "in": "path", "type": "integer", "required": True},
         {"name": "body", "in": "body", "schema": {"type": "object"}}
     ],
-    "responses": {"200": {"description": "Updated"}, "404": {"description": "Not found"}}
+    "responses": {
+        "200": {"description": "Updated"},
+        "404": {"description": "Not found"},
+        "409": {"description": "Another record already exists for the new district, period and type"}
+    }
 })
 def update_youth(ya_id):
     data = request.get_json() or {}
-    ya = youth_attendance_controller.update_youth_attendance(ya_id, data)
+    try:
+        ya = youth_attendance_controller.update_youth_attendance(ya_id, data)
+    except NaturalKeyConflictError as e:
+        return jsonify({"error": str(e), "existing_id": e.existing_id}), 409
     if not ya:
         return jsonify({"error": "not found"}), 404
     return jsonify(ya.to_dict()), 200
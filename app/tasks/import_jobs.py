@@ -0,0 +1,53 @@
+import logging
+import os
+
+from app.extensions import db
+from app.utils.district_import import import_districts_by_group_name
+from app.utils.excel_importer_new import HierarchyImportError, import_hierarchy_from_excel
+from app.utils.hierarchy_cache import bump_hierarchy_version
+from app.utils.job_runner import job_handler
+
+logger = logging.getLogger(__name__)
+
+
+def _discard_upload(file_path):
+    try:
+        os.unlink(file_path)
+    except OSError:
+        pass
+
+
+@job_handler("import_hierarchy")
+def run_hierarchy_import(job, file_path, state_name, import_districts=False, dry_run=False):
+    """Background /admin/import-hierarchy: the uploaded workbook is deleted afterwards."""
+    try:
+        result = import_hierarchy_from_excel(file_path, state_name, simulate=dry_run,
+                                             import_districts=import_districts, progress=job.progress)
+    finally:
+        _discard_upload(file_path)
+
+    if "error" in result:
+        raise HierarchyImportError(result["error"])
+    if dry_run:
+        db.session.rollback()
+    else:
+        bump_hierarchy_version()
+    return {**result, "counts": result["created"]}
+
+
+@job_handler("import_districts")
+def run_district_import(job, file_path, dry_run=False):
+    """Background /admin/import-districts: the uploaded CSV is deleted afterwards."""
+    try:
+        result = import_districts_by_group_name(file_path, dry_run=dry_run, progress=job.progress)
+    finally:
+        _discard_upload(file_path)
+
+    if dry_run:
+        db.session.rollback()
+    else:
+        bump_hierarchy_version()
+    return {
+        **result,
+        "counts": {"created": result["created"], "updated": result["updated"], "skipped": result["skipped"]},
+    }
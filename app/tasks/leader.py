@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+import atexit
+import logging
+import os
+import socket
+import threading
+import uuid
+
+from sqlalchemy import insert, or_, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.extensions import db
+from app.models import SchedulerLease
+
+logger = logging.getLogger("attendance_scheduler")
+
+
+class SchedulerLeader:
+    """
+    Run a scheduler in exactly one process out of many (gunicorn workers,
+    several hosts) sharing the same database.
+
+    Every process runs a heartbeat thread that tries to take or renew the
+    `scheduler_leases` row named `name`. The UPDATE only matches when the
+    row is free, expired or already ours, so at most one process holds it.
+    The holder builds and starts the scheduler from `factory`. Any process
+    that loses the lease or can't reach the database stops its scheduler.
+    If the leader dies, its lease expires after `lease_seconds` and another
+    process takes over. A clean shutdown releases the lease at exit so
+    failover happens on the next heartbeat.
+
+    This needs no advisory-lock support: on SQLite the single-statement
+    UPDATE is serialized by the database write lock. An in-memory SQLite
+    database is private to its process, so that process just leads.
+    """
+
+    def __init__(self, app, factory, name="default", lease_seconds=60, heartbeat_seconds=15):
+        self.app = app
+        self.factory = factory
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.scheduler = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        return self.scheduler is not None
+
+    # ---------------- lease ----------------
+
+    def _process_local(self):
+        url = db.engine.url
+        return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+    def try_acquire(self):
+        """Take or renew the lease; True while this process holds it."""
+        if self._process_local():
+            return True
+
+        table = SchedulerLease.__table__
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+
+        with db.engine.begin() as conn:
+            renewed = conn.execute(
+                update(table)
+                .where(table.c.name == self.name, table.c.holder == self.holder_id)
+                .values(heartbeat_at=now, expires_at=expires_at)
+            ).rowcount
+            if renewed:
+                return True
+
+            taken = conn.execute(
+                update(table)
+                .where(
+                    table.c.name == self.name,
+                    or_(table.c.holder.is_(None), table.c.expires_at < now)
+                )
+                .values(holder=self.holder_id, acquired_at=now, heartbeat_at=now, expires_at=expires_at)
+            ).rowcount
+            if taken:
+                return True
+
+        # First process ever: create the row (the primary key decides races)
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(table).values(
+                    name=self.name, holder=self.holder_id,
+                    acquired_at=now, heartbeat_at=now, expires_at=expires_at
+                ))
+            return True
+        except IntegrityError:
+            return False
+
+    def release(self):
+        table = SchedulerLease.__table__
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(table)
+                .where(table.c.name == self.name, table.c.holder == self.holder_id)
+                .values(holder=None, expires_at=None)
+            )
+
+    # ---------------- scheduler ----------------
+
+    def _start_scheduler(self):
+        self.scheduler = self.factory()
+        self.scheduler.start()
+        logger.info(f"👑 {self.holder_id} is now the scheduler leader ({self.name})")
+
+    def _stop_scheduler(self):
+        if self.scheduler is not None:
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
+            logger.warning(f"⚠️ {self.holder_id} lost the scheduler lease ({self.name})")
+
+    def heartbeat(self):
+        """One election round: start, keep or stop the local scheduler."""
+        with self.app.app_context():
+            try:
+                leader = self.try_acquire()
+            except SQLAlchemyError:
+                logger.error("❌ Scheduler lease heartbeat failed", exc_info=True)
+                leader = False
+
+        if leader and self.scheduler is None:
+            self._start_scheduler()
+        elif not leader:
+            self._stop_scheduler()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.heartbeat()
+            self._stop.wait(self.heartbeat_seconds)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"scheduler-leader-{self.name}", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stop.set()
+        was_leader = self.is_leader
+        if self.scheduler is not None:
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
+        if was_leader:
+            try:
+                with self.app.app_context():
+                    self.release()
+            except SQLAlchemyError:
+                pass  # the lease simply expires
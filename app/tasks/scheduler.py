@@ -1,58 +1,111 @@
 from apscheduler.schedulers.background import BackgroundScheduler
+from contextlib import contextmanager
 from datetime import datetime
 import logging
+import threading
+import time
+
+from sqlalchemy import event, func
 
 from app.extensions import db
+from app.controllers.attendance_monitor_controller import get_last_weeks_by_level
+from app.utils.hierarchy_cache import hierarchy_cache
+from app.utils.church_calendar import church_calendar
 from app.utils.email_service import EmailService
-from app.utils.whatsapp_service import WhatsAppService
-from app.models import (
-    Attendance, State, Region, District, Group, OldGroup
-)
-from app.models.user import User
+from app.utils.whatsapp_service import whatsapp_dispatcher
+from app.utils.notification_outbox import run_outbox_with_context
+from app.models.user import User, Role
+from app.tasks.leader import SchedulerLeader
 
 logger = logging.getLogger("attendance_scheduler")
 
-CURRENT_YEAR = datetime.utcnow().year
-CURRENT_MONTH = datetime.utcnow().strftime("%B")
-CURRENT_WEEK = datetime.utcnow().isocalendar().week % 4 or 4
+
+@contextmanager
+def count_queries():
+    """Count SQL statements issued by the current thread inside the block."""
+    counter = {"count": 0}
+    thread_id = threading.get_ident()
+
+    def _count(*args):
+        if threading.get_ident() == thread_id:
+            counter["count"] += 1
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        yield counter
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+
+
+def collect_notification_recipients():
+    """
+    (name, email, phone, level, entity_id) for every group admin and every
+    entity leader with an email. Leaders come from the cached hierarchy
+    snapshot and admins from one query, so this costs at most a version
+    check plus a single SELECT.
+    """
+    recipients = []
+
+    # 1️⃣ GROUP ADMINS ONLY
+    group_admins = User.query.join(User.roles).filter(
+        func.lower(Role.name) == "group admin",
+        User.group_id.isnot(None)
+    ).all()
+    for admin in group_admins:
+        recipients.append((admin.name, admin.email, admin.phone, "group", admin.group_id))
+
+    # 2️⃣ ALL LEADERS ACROSS ENTITIES
+    hierarchy = hierarchy_cache.get()
+    for level in ("state", "region", "district", "group", "old_group"):
+        for entity in hierarchy.all(level):
+            if not entity.get("leader_email"):
+                continue
+            recipients.append((
+                entity.get("leader") or "Leader",
+                entity["leader_email"],
+                entity.get("leader_phone"),
+                level,
+                entity["id"]
+            ))
+
+    return recipients
 
 
 def attendance_notification_job():
+    started = time.perf_counter()
     try:
         email_service = EmailService()
-        whatsapp_service = WhatsAppService()
-
-        def _send_notifications(
-            name,
-            email,
-            phone,
-            entity_filter,
-            email_service,
-            whatsapp_service
-        ):
-            last_record = Attendance.query.filter_by(
-                year=CURRENT_YEAR,
-                month=CURRENT_MONTH,
-                **entity_filter
-            ).order_by(Attendance.week.desc()).first()
-
-            last_week = last_record.week if last_record else 0
-            missing_weeks = CURRENT_WEEK - last_week
+
+        # Messages are collected here and delivered in batches at the end
+        outgoing_emails = []
+        outgoing_whatsapp = []
+        is_monday = datetime.utcnow().weekday() == 0
+        # Evaluated per run: a long-lived worker must not keep the week it was started in
+        current_year, current_month, current_week, _ = church_calendar.today()
+
+        with count_queries() as queries:
+            # Last submitted week of every entity, all levels in one round-trip
+            last_weeks = get_last_weeks_by_level(current_year, current_month)
+            recipients = collect_notification_recipients()
+
+        for name, email, phone, level, entity_id in recipients:
+            last_week = last_weeks[level].get(entity_id, 0)
+            missing_weeks = current_week - last_week
 
             # 🟡 WEEKLY MONDAY REMINDER
-            if datetime.utcnow().weekday() == 0:  # Monday
-                email_service.send_email(
+            if is_monday:
+                outgoing_emails.append(dict(
                     to_email=email,
                     subject="Weekly Church Attendance Reminder",
                     template_name="weekly_attendance_reminder",
                     context={"name": name}
-                )
+                ))
 
             # 🔴 OVERDUE (4+ WEEKS)
             if missing_weeks >= 4:
-                weeks = ", ".join(str(w) for w in range(last_week + 1, CURRENT_WEEK + 1))
+                weeks = ", ".join(str(w) for w in range(last_week + 1, current_week + 1))
 
-                email_service.send_email(
+                outgoing_emails.append(dict(
                     to_email=email,
                     subject="URGENT: Attendance Overdue",
                     template_name="attendance_overdue",
@@ -60,72 +113,28 @@ def attendance_notification_job():
                         "name": name,
                         "week": weeks
                     }
-                )
+                ))
 
                 if phone:
-                    whatsapp_service.send_message(
-                        to_phone=phone,
-                        message=(
-                            f"Hello {name},\n\n"
-                            f"You have not submitted attendance for weeks {weeks}.\n"
-                            f"Please update immediately.\n\n"
-                            f"Thank you."
-                        )
-                    )
-
-        def _build_entity_filter(entity):
-            if isinstance(entity, State):
-                return {"state_id": entity.id}
-            if isinstance(entity, Region):
-                return {"region_id": entity.id}
-            if isinstance(entity, District):
-                return {"district_id": entity.id}
-            if isinstance(entity, Group):
-                return {"group_id": entity.id}
-            if isinstance(entity, OldGroup):
-                return {"old_group_id": entity.id}
-            return {}
-
-
-        # 1️⃣ GROUP ADMINS ONLY
-        group_admins = User.query.filter_by(role="group admin").all()
-
-        for admin in group_admins:
-            _send_notifications(
-                name=admin.name,
-                email=admin.email,
-                phone=admin.phone,
-                entity_filter={"group_id": admin.group_id},
-                email_service=email_service,
-                whatsapp_service=whatsapp_service
-            )
-
-        # 2️⃣ ALL LEADERS ACROSS ENTITIES
-        entities = (
-            list(State.query.all()) +
-            list(Region.query.all()) +
-            list(District.query.all()) +
-            list(Group.query.all()) +
-            list(OldGroup.query.all())
+                    outgoing_whatsapp.append((
+                        phone,
+                        f"Hello {name},\n\n"
+                        f"You have not submitted attendance for weeks {weeks}.\n"
+                        f"Please update immediately.\n\n"
+                        f"Thank you."
+                    ))
+
+        results = email_service.send_many(outgoing_emails)
+        logger.info(f"📧 Sent {sum(results)}/{len(results)} reminder emails")
+
+        results = whatsapp_dispatcher.send_many(outgoing_whatsapp)
+        logger.info(f"💬 Sent {sum(results)}/{len(results)} WhatsApp reminders")
+
+        logger.info(
+            f"✅ Attendance notification job completed in {time.perf_counter() - started:.2f}s: "
+            f"{len(recipients)} recipients checked with {queries['count']} queries"
         )
 
-        for entity in entities:
-            if not entity.leader_email:
-                continue
-
-            entity_filter = _build_entity_filter(entity)
-
-            _send_notifications(
-                name=entity.leader or "Leader",
-                email=entity.leader_email,
-                phone=entity.leader_phone,
-                entity_filter=entity_filter,
-                email_service=email_service,
-                whatsapp_service=whatsapp_service
-            )
-
-        logger.info("✅ Attendance notification job completed")
-
     except Exception:
         logger.error("❌ Attendance notification job failed", exc_info=True)
 
@@ -135,7 +144,7 @@ def run_job_with_context(app):
         attendance_notification_job()
 
 
-def start_scheduler(app):
+def build_scheduler(app):
     scheduler = BackgroundScheduler()
     scheduler.add_job(
         func=lambda: run_job_with_context(app),
@@ -143,7 +152,35 @@ def start_scheduler(app):
         day_of_week="mon",
         hour=6
     )
-    scheduler.start()
+    # Drain reminders queued by the /monitor/remind endpoints
+    scheduler.add_job(
+        func=lambda: run_outbox_with_context(app),
+        trigger="interval",
+        seconds=app.config.get("OUTBOX_POLL_SECONDS", 15),
+        max_instances=1,
+        coalesce=True
+    )
+    return scheduler
+
+
+def start_scheduler(app):
+    """
+    Start the scheduler under leader election: every worker process runs
+    the lease heartbeat, but only the lease holder runs the jobs.
+    """
+    if not app.config.get("SCHEDULER_ENABLED", True):
+        logger.info("Scheduler disabled (SCHEDULER_ENABLED=false)")
+        return None
+
+    leader = SchedulerLeader(
+        app,
+        factory=lambda: build_scheduler(app),
+        name="attendance",
+        lease_seconds=app.config.get("SCHEDULER_LEASE_SECONDS", 60),
+        heartbeat_seconds=app.config.get("SCHEDULER_HEARTBEAT_SECONDS", 15),
+    )
+    leader.start()
+    return leader
 
 
 
@@ -7,8 +7,9 @@ from app.models import User, State, Region, District, Group
 
 
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import get_jwt_identity
+from flask import jsonify, g, has_request_context
+from flask_jwt_extended import get_jwt_identity, get_jwt
+from sqlalchemy import false
 from app.models import User
 from app.models.hierarchy import OldGroup
 from ..extensions import db
@@ -18,20 +19,21 @@ from ..extensions import db
 # -----------------------------
 # ROLE-BASED DECORATOR (OPTIMIZED)
 # -----------------------------
+def normalize_role_name(role_name):
+    """Lowercase and replace hyphens/underscores with spaces"""
+    return role_name.lower().replace('-', ' ').replace('_', ' ').strip()
+
+
 def require_role(allowed_roles):
     def wrapper(fn):
         @wraps(fn)
         def decorated(*args, **kwargs):
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
+            # Guards writes: check the user's current roles, not the token's claims
+            user = get_current_user()
 
             if not user:
                 return jsonify({"error": "Invalid user"}), 401
 
-            # Normalize role names: convert to lowercase and replace hyphens/underscores with spaces
-            def normalize_role_name(role_name):
-                return role_name.lower().replace('-', ' ').replace('_', ' ').strip()
-            
             user_role_names = {normalize_role_name(r.name) for r in user.roles}
             allowed_role_names = {normalize_role_name(role) for role in allowed_roles}
 
@@ -205,74 +207,196 @@ def require_role(allowed_roles):
 #         return query.filter_by(id=None)
 
 # -----------------------------
-# HIERARCHY ACCESS ENFORCEMENT (COMPLETE HIERARCHY) - FIXED VERSION
+# HIERARCHY ACCESS ENFORCEMENT (COMPILED SCOPE PREDICATES)
 # -----------------------------
 
-def restrict_by_access(query, user):
+# Admin roles in precedence order: (normalized role name, hierarchy level).
+# The level doubles as the User column holding the scope id ("<level>_id").
+SCOPE_ROLES = (
+    ("state admin", "state"),
+    ("region admin", "region"),
+    ("district admin", "district"),
+    ("group admin", "group"),
+    ("old group admin", "old_group"),
+)
+
+SCOPE_MODELS = {
+    "state": State,
+    "region": Region,
+    "old_group": OldGroup,
+    "group": Group,
+    "district": District,
+}
+
+# Marker scope for users that see everything
+FULL_ACCESS = ("all", None)
+
+
+def _predicate_builder(level, model):
     """
-    DEBUG VERSION with detailed logging
+    Predicate factory for a (level, model) pair, compiled once and memoized.
+
+    A model is visible to a level if it IS that level (match on id) or carries
+    that level's foreign key; otherwise the scope grants nothing on it.
     """
-    print(f"🎯 ENTERING restrict_by_access")
-    print(f"🎯 User: {user.id}, Email: {user.email}")
-    print(f"🎯 User roles: {[r.name for r in user.roles]}")
-    print(f"🎯 User group_id: {user.group_id}")
-    
-    if not user or not hasattr(user, 'roles'):
-        print("❌ No user or roles - returning empty query")
-        return query.filter_by(id=None)
-    
-    try:
-        # Get role names (case insensitive)
-        role_names = [r.name.lower() for r in user.roles]
-        print(f"🎯 Normalized roles: {role_names}")
-        
-        # Get the model class from the query
-        if not query._entities:
-            print("❌ No query entities - returning empty query")
-            return query.filter_by(id=None)
-        
-        model_class = query._entities[0].type
-        print(f"🎯 Model class: {model_class.__name__}")
-        
-        # 🎯 Check for Group Admin
-        if "group admin" in role_names:
-            print(f"✅ FOUND 'group admin' in roles: {role_names}")
-            if user.group_id:
-                print(f"✅ User has group_id: {user.group_id}")
-                
-                if model_class == Group:
-                    print(f"✅ Processing Group model - filtering by id = {user.group_id}")
-                    result = query.filter(Group.id == user.group_id)
-                    print(f"✅ Group query SQL: {result}")
-                    return result
-                
-                elif model_class == District:
-                    print(f"✅ Processing District model - filtering by group_id = {user.group_id}")
-                    result = query.filter(District.group_id == user.group_id)
-                    print(f"✅ District query SQL: {result}")
-                    return result
-                
-                else:
-                    print(f"❌ Unknown model type for Group Admin: {model_class.__name__}")
-                    return query.filter_by(id=None)
-            else:
-                print("❌ User has 'group admin' role but no group_id")
-                return query.filter_by(id=None)
+    key = (level, model)
+    builder = PREDICATE_BUILDERS.get(key)
+    if builder is None:
+        if model is SCOPE_MODELS[level]:
+            column = model.id
         else:
-            print(f"❌ 'group admin' NOT found in roles: {role_names}")
-            return query.filter_by(id=None)
-            
-    except Exception as e:
-        print(f"❌ Exception in restrict_by_access: {e}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
-        return query.filter_by(id=None)
+            column = getattr(model, f"{level}_id", None)
+
+        if column is None:
+            builder = lambda value: false()
+        else:
+            builder = lambda value: column == value
+        PREDICATE_BUILDERS[key] = builder
+    return builder
+
+
+# (level, model) -> predicate factory; hierarchy models are compiled up front,
+# anything else carrying *_id columns (Attendance, YouthAttendance) on first use
+PREDICATE_BUILDERS = {}
+for _level in SCOPE_MODELS:
+    for _model in SCOPE_MODELS.values():
+        _predicate_builder(_level, _model)
+
+
+def resolve_scope(user):
+    """
+    Return the (level, id) scope granted by the user's highest admin role,
+    FULL_ACCESS for Super Admin, or None when the user has no usable scope.
+    """
+    if not user or not user.roles:
+        return None
+
+    role_names = {normalize_role_name(r.name) for r in user.roles}
+    if "super admin" in role_names:
+        return FULL_ACCESS
+
+    for role_name, level in SCOPE_ROLES:
+        scope_id = getattr(user, f"{level}_id")
+        if role_name in role_names and scope_id:
+            return level, scope_id
+
+    return None
+
+
+def scope_predicate(user, model):
+    """
+    SQL predicate limiting `model` rows to what `user` may see, or None for
+    full access. Cached per (user, model) for the rest of the request.
+    """
+    cache = g.setdefault("scope_predicates", {}) if has_request_context() else {}
+    key = (user.id if user else None, model)
+    if key in cache:
+        return cache[key]
+
+    predicate = build_scope_predicate(resolve_scope(user), model)
+    cache[key] = predicate
+    return predicate
+
+
+def build_scope_predicate(scope, model):
+    """
+    Predicate for a resolved scope (see resolve_scope) on `model`: None for
+    FULL_ACCESS, false() when there is no scope, else the compiled filter.
+    """
+    if scope == FULL_ACCESS:
+        return None
+    if scope is None:
+        return false()
+
+    level, scope_id = scope
+    return _predicate_builder(level, model)(scope_id)
+
+
+def restrict_by_access(query, user, model=None):
+    """
+    Restrict a query to the user's hierarchy scope. The target model is taken
+    from the query's first entity unless given explicitly.
+    """
+    if model is None:
+        model = query.column_descriptions[0]["entity"]
+
+    predicate = scope_predicate(user, model)
+    return query if predicate is None else query.filter(predicate)
     
 
+# -----------------------------
+# REQUEST-SCOPED CURRENT USER
+# -----------------------------
+
+# Bump when the claim layout changes so older tokens fall back to the DB
+CLAIMS_VERSION = 1
+
+HIERARCHY_CLAIMS = ("state_id", "region_id", "district_id", "group_id", "old_group_id")
+
+
+def user_claims(user):
+    """Roles and hierarchy position to embed (signed) in an access token."""
+    claims = {"roles": [r.name for r in user.roles], "claims_v": CLAIMS_VERSION}
+    for field in HIERARCHY_CLAIMS:
+        claims[field] = getattr(user, field)
+    return claims
+
+
+class ClaimsRole:
+    def __init__(self, name):
+        self.name = name
+
+
+class ClaimsUser:
+    """
+    Read-only stand-in for User built from verified JWT claims.
+
+    Carries just what role checks and scope filtering read (id, roles and the
+    hierarchy ids). Claims are as fresh as the token, so anything that writes
+    or needs other User fields must use get_current_user() instead.
+    """
+
+    def __init__(self, user_id, claims):
+        self.id = int(user_id)
+        self.roles = [ClaimsRole(name) for name in claims.get("roles", [])]
+        for field in HIERARCHY_CLAIMS:
+            setattr(self, field, claims.get(field))
+
+    has_role = User.has_role
+    access_level = User.access_level
+
+
 def get_current_user():
-    """Get current user with eager loading of roles for performance"""
+    """
+    The JWT user with roles eagerly loaded, fetched at most once per request
+    and kept on flask.g (decorators and handlers share the same instance).
+    """
     user_id = get_jwt_identity()
-    return User.query.options(db.joinedload(User.roles)).get(user_id)
+    cached = g.get("current_user")
+    if cached is not None and str(cached.id) == str(user_id):
+        return cached
+
+    user = User.query.options(db.joinedload(User.roles)).get(user_id)
+    g.current_user = user
+    return user
+
+
+def get_current_principal():
+    """
+    Identity for read-only checks: built from the token's signed role and
+    hierarchy claims when present (no DB access), else get_current_user().
+    """
+    if "current_user" in g:
+        return get_current_user()
+
+    claims = get_jwt()
+    if claims.get("claims_v") != CLAIMS_VERSION:
+        return get_current_user()
+
+    principal = g.get("current_principal")
+    if principal is None:
+        principal = g.current_principal = ClaimsUser(get_jwt_identity(), claims)
+    return principal
 
 def apply_scope_filters(model, user):
     """
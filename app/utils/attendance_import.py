@@ -0,0 +1,237 @@
+import csv
+import io
+import logging
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import column, select, table, text
+from sqlalchemy.dialects import postgresql
+
+from app.extensions import db
+from app.models import Attendance, State, Region, District, Group, OldGroup
+from app.models.attendance import ATTENDANCE_NATURAL_KEY, ATTENDANCE_UPSERT_COLUMNS
+from app.utils.attendance_rollup import rebuild_attendance_rollups
+from app.utils.upsert import dedupe_by_natural_key, natural_key_expressions, natural_key_value, upsert_rows
+
+logger = logging.getLogger(__name__)
+
+# Rows parsed and inserted per round-trip
+CHUNK_SIZE = 5000
+
+# Per-row errors echoed back to the client (the count is always complete)
+MAX_REPORTED_ERRORS = 500
+
+REQUIRED_COLUMNS = (
+    "service_type", "state_id", "region_id", "month", "week", "year",
+    "men", "women", "youth_boys", "youth_girls", "children_boys", "children_girls",
+)
+OPTIONAL_ID_COLUMNS = ("district_id", "group_id", "old_group_id")
+COUNT_COLUMNS = ("men", "women", "youth_boys", "youth_girls", "children_boys", "children_girls")
+
+# Referenced id column → (model, label used in error messages)
+REFERENCE_MODELS = {
+    "state_id": (State, "State"),
+    "region_id": (Region, "Region"),
+    "old_group_id": (OldGroup, "Old Group"),
+    "group_id": (Group, "Group"),
+    "district_id": (District, "District"),
+}
+
+STAGING_TABLE = "attendance_import_staging"
+
+INSERT_COLUMNS = (
+    "service_type", "state_id", "region_id", "old_group_id", "group_id", "district_id",
+    "month", "week", "year", *COUNT_COLUMNS, "new_comers", "tithe_offering",
+    "created_at", "updated_at",
+)
+
+
+class AttendanceImportError(ValueError):
+    """The upload as a whole is unusable (e.g. a required column is missing)."""
+
+
+def _parse_row(row, now):
+    """CSV dict → insert values; raises ValueError with a readable message."""
+    values = {"created_at": now, "updated_at": now}
+
+    for column in ("service_type", "month"):
+        value = (row.get(column) or "").strip()
+        if not value:
+            raise ValueError(f"{column} is required")
+        values[column] = value
+
+    for column in ("state_id", "region_id", "week", "year", *COUNT_COLUMNS):
+        raw = (row.get(column) or "").strip()
+        if not raw:
+            raise ValueError(f"{column} is required")
+        try:
+            values[column] = int(raw)
+        except ValueError:
+            raise ValueError(f"{column} must be an integer, got {raw!r}")
+
+    for column in OPTIONAL_ID_COLUMNS:
+        raw = (row.get(column) or "").strip()
+        try:
+            values[column] = int(raw) if raw else None
+        except ValueError:
+            raise ValueError(f"{column} must be an integer, got {raw!r}")
+
+    raw = (row.get("new_comers") or "").strip()
+    try:
+        values["new_comers"] = int(raw) if raw else 0
+    except ValueError:
+        raise ValueError(f"new_comers must be an integer, got {raw!r}")
+
+    raw = (row.get("tithe_offering") or "").strip()
+    try:
+        values["tithe_offering"] = Decimal(raw) if raw else Decimal("0")
+    except InvalidOperation:
+        raise ValueError(f"tithe_offering must be a number, got {raw!r}")
+
+    return values
+
+
+class _ReferenceChecker:
+    """
+    Validates hierarchy ids with one `IN` query per level per chunk, and
+    only for ids not seen in an earlier chunk, so a typical upload costs
+    one query per level in total.
+    """
+
+    def __init__(self):
+        self.known = {column: set() for column in REFERENCE_MODELS}
+        self.missing = {column: set() for column in REFERENCE_MODELS}
+
+    def check(self, chunk):
+        for column, (model, _) in REFERENCE_MODELS.items():
+            wanted = {values[column] for _, values in chunk if values[column] is not None}
+            unseen = wanted - self.known[column] - self.missing[column]
+            if unseen:
+                found = set(db.session.scalars(select(model.id).where(model.id.in_(unseen))))
+                self.known[column] |= found
+                self.missing[column] |= unseen - found
+
+    def first_error(self, values):
+        for column, (_, label) in REFERENCE_MODELS.items():
+            if values[column] is not None and values[column] in self.missing[column]:
+                return f"{label} with ID {values[column]} does not exist"
+        return None
+
+
+def _copy_upsert_rows(rows):
+    """
+    PostgreSQL: stream the chunk through COPY ... FROM STDIN into a staging
+    table, then merge it with one INSERT ... SELECT ... ON CONFLICT DO UPDATE
+    (same transaction; the staging table is dropped at commit).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for values in rows:
+        # Unquoted empty fields are NULL in COPY's CSV format
+        writer.writerow(["" if values[column] is None else values[column] for column in INSERT_COLUMNS])
+    buffer.seek(0)
+
+    columns = ", ".join(INSERT_COLUMNS)
+    db.session.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ON COMMIT DROP AS "
+        f"SELECT {columns} FROM {Attendance.__tablename__} WITH NO DATA"
+    ))
+
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+    staging = table(STAGING_TABLE, *[column(name) for name in INSERT_COLUMNS])
+    statement = postgresql.insert(Attendance).from_select(list(INSERT_COLUMNS), select(*staging.c))
+    statement = statement.on_conflict_do_update(
+        index_elements=natural_key_expressions(Attendance, ATTENDANCE_NATURAL_KEY),
+        set_={name: statement.excluded[name] for name in ATTENDANCE_UPSERT_COLUMNS},
+    )
+    db.session.execute(statement)
+    db.session.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+
+
+def _upsert_rows(rows):
+    """
+    Insert a chunk; rows matching an existing submission replace its counts.
+    Returns the rows actually written (the last one per natural key).
+    """
+    rows = dedupe_by_natural_key(rows, ATTENDANCE_NATURAL_KEY)
+    connection = db.session.connection()
+    if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+        _copy_upsert_rows(rows)
+    else:
+        upsert_rows(Attendance, rows, ATTENDANCE_NATURAL_KEY, ATTENDANCE_UPSERT_COLUMNS)  # executemany
+    return rows
+
+
+def import_attendance_csv(text_stream, chunk_size=CHUNK_SIZE):
+    """
+    Stream attendance rows from a CSV text stream into the database.
+
+    Rows are parsed and validated as they are read and upserted in chunks of
+    `chunk_size`: a row for an entity/period/service that is already stored
+    (or repeated later in the file) replaces its counts, so re-importing a
+    file changes nothing. Rows with bad values or unknown hierarchy ids are skipped
+    and reported by line number without aborting the rest. Rollups of the
+    affected (year, month) periods are rebuilt in the same transaction; the
+    caller commits.
+
+    Returns {"imported": int, "error_count": int, "errors": [{"row", "error"}]},
+    where "imported" counts the distinct submissions stored (a row repeated
+    in the file counts once). Raises AttendanceImportError when a required
+    column is missing.
+    """
+    reader = csv.DictReader(text_stream)
+    missing_columns = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing_columns:
+        raise AttendanceImportError(f"Missing column in CSV: {', '.join(missing_columns)}")
+
+    now = datetime.utcnow()
+    checker = _ReferenceChecker()
+    periods = set()
+    errors = []
+    error_count = 0
+    stored = set()  # natural keys written, so repeats across chunks count once
+    chunk = []  # (line number, values)
+
+    def report(line, message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": line, "error": message})
+
+    def flush():
+        checker.check(chunk)
+        rows = []
+        for line, values in chunk:
+            message = checker.first_error(values)
+            if message:
+                report(line, message)
+            else:
+                rows.append(values)
+                periods.add((values["year"], values["month"]))
+        if rows:
+            stored.update(natural_key_value(values, ATTENDANCE_NATURAL_KEY) for values in _upsert_rows(rows))
+        chunk.clear()
+
+    for row in reader:
+        line = reader.line_num  # physical line, so quoted multi-line fields don't skew it
+        try:
+            chunk.append((line, _parse_row(row, now)))
+        except ValueError as e:
+            report(line, str(e))
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+
+    if periods:
+        rebuild_attendance_rollups(periods=periods, commit=False)
+
+    imported = len(stored)
+    errors.sort(key=lambda error: error["row"])
+    logger.info(f"Attendance CSV import: {imported} rows imported, {error_count} rejected")
+    return {"imported": imported, "error_count": error_count, "errors": errors}
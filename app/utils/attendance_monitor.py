@@ -1,7 +1,8 @@
-from datetime import datetime, date
-import calendar
 from typing import List
-from app.models import Attendance, User
+from sqlalchemy import func
+from app.extensions import db
+from app.models import AttendanceRollup, User
+from app.utils.church_calendar import church_calendar
 
 
 # --------------------------------------------------------
@@ -15,28 +16,11 @@ def get_current_month_info():
         current_month_name (str)
         current_week_of_month (int)
         total_weeks_in_month (int)
-    """
-    today = datetime.utcnow().date()
-
-    year = today.year
-    month = today.month
-
-    # First & last day of month
-    first_day = date(year, month, 1)
-    last_day = date(year, month, calendar.monthrange(year, month)[1])
-
-    # Week number within the month (1–5)
-    current_week_of_month = ((today.day - 1) // 7) + 1
 
-    # Total possible attendance weeks this month
-    total_weeks_in_month = ((last_day.day - 1) // 7) + 1
-
-    return (
-        year,
-        today.strftime("%B"),
-        current_week_of_month,
-        total_weeks_in_month
-    )
+    Delegates to the shared church calendar (memoized per month, week rule
+    from CHURCH_WEEK_START) so the monitor and the scheduler agree.
+    """
+    return church_calendar.today()
 
 
 # --------------------------------------------------------
@@ -49,25 +33,23 @@ def get_last_attendance_week(entity_type: str, entity_id: int) -> int:
     """
     year, month_name, _, _ = get_current_month_info()
 
-    query = Attendance.query.filter_by(
-        year=year,
-        month=month_name
+    query = db.session.query(func.max(AttendanceRollup.last_week)).filter(
+        AttendanceRollup.year == year,
+        AttendanceRollup.month == month_name
     )
 
     if entity_type == "state":
-        query = query.filter_by(state_id=entity_id)
+        query = query.filter(AttendanceRollup.state_id == entity_id)
     elif entity_type == "region":
-        query = query.filter_by(region_id=entity_id)
+        query = query.filter(AttendanceRollup.region_id == entity_id)
     elif entity_type == "district":
-        query = query.filter_by(district_id=entity_id)
+        query = query.filter(AttendanceRollup.district_id == entity_id)
     elif entity_type == "group":
-        query = query.filter_by(group_id=entity_id)
+        query = query.filter(AttendanceRollup.group_id == entity_id)
     elif entity_type == "old_group":
-        query = query.filter_by(old_group_id=entity_id)
-
-    last_record = query.order_by(Attendance.week.desc()).first()
+        query = query.filter(AttendanceRollup.old_group_id == entity_id)
 
-    return last_record.week if last_record else 0
+    return query.scalar() or 0
 
 
 def calculate_weeks_missed(last_filled_week: int) -> int:
@@ -0,0 +1,131 @@
+from datetime import datetime
+import logging
+
+from sqlalchemy import func, insert, select, tuple_
+
+from app.extensions import db
+from app.models import Attendance, AttendanceRollup
+from app.models.attendance_rollup import ROLLUP_NATURAL_KEY
+from app.utils.upsert import natural_key_filter, natural_key_value, upsert_rows
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_KEY_FIELDS = tuple(column for column, _ in ROLLUP_NATURAL_KEY)
+
+ROLLUP_SUM_FIELDS = (
+    "men", "women", "youth_boys", "youth_girls",
+    "children_boys", "children_girls", "new_comers", "tithe_offering",
+)
+
+# Everything a bucket holds besides its key, in _rollup_source() order
+ROLLUP_VALUE_FIELDS = ROLLUP_SUM_FIELDS + ("record_count", "last_week")
+
+
+# --------------------------------------------------------
+# 🔑 BUCKET KEYS
+# --------------------------------------------------------
+
+def rollup_key(attendance):
+    """
+    The rollup bucket an attendance record counts towards.
+
+    On update, take the key *before* mutating the record as well, so the
+    bucket it leaves is refreshed too.
+    """
+    key = {field: getattr(attendance, field) for field in ROLLUP_KEY_FIELDS}
+    if key["year"] is not None:
+        key["year"] = int(key["year"])
+    return key
+
+
+# --------------------------------------------------------
+# ♻️ INCREMENTAL MAINTENANCE
+# --------------------------------------------------------
+
+def _key_filters(model, key):
+    # IS NULL / = rather than COALESCE, so the attendance hierarchy indexes apply
+    return [
+        getattr(model, field).is_(None) if value is None
+        else getattr(model, field) == value
+        for field, value in key.items()
+    ]
+
+
+def refresh_rollup_buckets(keys):
+    """
+    Recompute the given buckets from the attendance table.
+
+    Each bucket is first upserted (ON CONFLICT on uq_attendance_rollups_key),
+    which creates it if missing and otherwise row-locks it, so concurrent
+    writers to one bucket queue up instead of inserting it twice. The totals
+    are then read in a later statement, which sees every submission
+    committed before the lock was granted. Buckets left without attendance
+    are deleted. Keys are locked in sorted order to avoid deadlocks; the
+    caller commits.
+    """
+    unique = {natural_key_value(key, ROLLUP_NATURAL_KEY): key for key in keys}
+    for _, key in sorted(unique.items()):
+        upsert_rows(AttendanceRollup, [{**key, "updated_at": datetime.utcnow()}],
+                    ROLLUP_NATURAL_KEY, ("updated_at",))
+        bucket = natural_key_filter(AttendanceRollup, key, ROLLUP_NATURAL_KEY)
+
+        totals = db.session.execute(
+            _rollup_source().where(*_key_filters(Attendance, key))
+        ).first()
+        if totals is None:
+            db.session.query(AttendanceRollup).filter(*bucket).delete(synchronize_session=False)
+        else:
+            db.session.query(AttendanceRollup).filter(*bucket).update(
+                {field: totals._mapping[field] for field in ROLLUP_VALUE_FIELDS},
+                synchronize_session=False,
+            )
+
+
+# --------------------------------------------------------
+# 🔁 FULL REBUILD
+# --------------------------------------------------------
+
+def _rollup_source():
+    key_columns = [getattr(Attendance, field) for field in ROLLUP_KEY_FIELDS]
+    sum_columns = [
+        func.coalesce(func.sum(getattr(Attendance, field)), 0).label(field)
+        for field in ROLLUP_SUM_FIELDS
+    ]
+    return select(
+        *key_columns,
+        *sum_columns,
+        func.count(Attendance.id).label("record_count"),
+        func.max(Attendance.week).label("last_week"),
+    ).group_by(*key_columns)
+
+
+def rebuild_attendance_rollups(periods=None, commit=True):
+    """
+    Recompute rollup rows from the attendance table.
+
+    Used to backfill after the table is created and to repair drift caused by
+    writes that bypass the controllers. `periods` limits the rebuild to those
+    (year, month) pairs, which is how bulk imports refresh their rollups in
+    two statements instead of one lookup per bucket. Returns the number of
+    rollup rows when committing.
+    """
+    source = _rollup_source()
+    stale = db.session.query(AttendanceRollup)
+
+    if periods:
+        periods = list(periods)
+        source = source.where(tuple_(Attendance.year, Attendance.month).in_(periods))
+        stale = stale.filter(tuple_(AttendanceRollup.year, AttendanceRollup.month).in_(periods))
+
+    stale.delete(synchronize_session=False)
+    db.session.execute(
+        insert(AttendanceRollup).from_select(
+            list(ROLLUP_KEY_FIELDS) + list(ROLLUP_VALUE_FIELDS),
+            source,
+        )
+    )
+    if not commit:
+        return None
+    db.session.commit()
+
+    return AttendanceRollup.query.count()
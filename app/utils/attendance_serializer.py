@@ -0,0 +1,75 @@
+from sqlalchemy import literal, select, union_all
+
+from app.extensions import db
+from app.models import State, Region, OldGroup, Group, District
+
+# level -> (model, attendance foreign key column)
+HIERARCHY_LEVELS = {
+    "state": (State, "state_id"),
+    "region": (Region, "region_id"),
+    "old_group": (OldGroup, "old_group_id"),
+    "group": (Group, "group_id"),
+    "district": (District, "district_id"),
+}
+
+
+def resolve_hierarchy_names(records, levels=("district",)):
+    """
+    Map the hierarchy ids referenced by `records` to names in ONE query.
+
+    Returns {level: {id: name}} for each requested level. Works for any
+    record type exposing the *_id columns (Attendance, YouthAttendance).
+    """
+    selects = []
+    for level in levels:
+        model, fk = HIERARCHY_LEVELS[level]
+        ids = {getattr(r, fk) for r in records if getattr(r, fk) is not None}
+        if ids:
+            selects.append(
+                select(literal(level).label("level"), model.id, model.name).where(model.id.in_(ids))
+            )
+
+    names = {level: {} for level in levels}
+    if not selects:
+        return names
+
+    statement = selects[0] if len(selects) == 1 else union_all(*selects)
+    for level, entity_id, name in db.session.execute(statement):
+        names[level][entity_id] = name
+
+    return names
+
+
+def serialize_attendance(records, include_names=False):
+    """
+    Serialize attendance records without a lazy hierarchy load per row.
+
+    `district_name` is always included (as in Attendance.to_dict); with
+    include_names=True the state/region/old_group/group names are added too.
+    """
+    levels = tuple(HIERARCHY_LEVELS) if include_names else ("district",)
+    names = resolve_hierarchy_names(records, levels)
+
+    data = []
+    for record in records:
+        item = record.to_dict(hierarchy_names=names)
+        if include_names:
+            for level in ("state", "region", "old_group", "group"):
+                fk = HIERARCHY_LEVELS[level][1]
+                item[f"{level}_name"] = names[level].get(getattr(record, fk))
+        data.append(item)
+
+    return data
+
+
+def iter_serialized_attendance(records, include_names=False, batch_size=500):
+    """Serialize a (streamed) iterable of records in batches of `batch_size`."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield from serialize_attendance(batch, include_names)
+            batch = []
+
+    if batch:
+        yield from serialize_attendance(batch, include_names)
@@ -0,0 +1,102 @@
+from collections import namedtuple
+from datetime import date, datetime
+import calendar
+import threading
+
+from flask import current_app, has_app_context
+
+
+# --------------------------------------------------------
+# 📅 CHURCH CALENDAR
+# --------------------------------------------------------
+
+WEEKDAYS = {name.lower(): index for index, name in enumerate(calendar.day_name)}
+
+MonthCalendar = namedtuple(
+    "MonthCalendar", ["year", "month", "month_name", "offset", "total_weeks"]
+)
+
+
+class ChurchCalendar:
+    """
+    Week-of-month arithmetic shared by the attendance monitor and the
+    scheduler, so both agree on "this week" and always use today's date.
+
+    The week rule comes from CHURCH_WEEK_START:
+      - "day" (default): fixed 7-day blocks from the 1st (days 1–7 are week 1,
+        8–14 week 2, ...), which is what attendance forms have always used.
+      - a weekday name ("sunday", "monday", ...): weeks start on that day, and
+        the days before the first one form week 1.
+
+    Per-month figures are memoized per (year, month, rule). When the current
+    month changes the cache is dropped, so a long-lived worker never holds
+    more than the month it is in (plus any months explicitly asked for).
+    """
+
+    def __init__(self, week_start=None):
+        self.week_start = week_start
+        self._months = {}
+        self._current_key = None
+        self._lock = threading.Lock()
+
+    def _rule(self):
+        if self.week_start:
+            return self.week_start.lower()
+        if has_app_context():
+            return current_app.config.get("CHURCH_WEEK_START", "day").lower()
+        return "day"
+
+    @staticmethod
+    def _build(year, month, rule):
+        first_day = date(year, month, 1)
+        days_in_month = calendar.monthrange(year, month)[1]
+
+        if rule == "day":
+            offset = 0
+        elif rule in WEEKDAYS:
+            offset = (first_day.weekday() - WEEKDAYS[rule]) % 7
+        else:
+            raise ValueError(f"Unknown CHURCH_WEEK_START rule: {rule!r}")
+
+        return MonthCalendar(
+            year=year,
+            month=month,
+            month_name=first_day.strftime("%B"),
+            offset=offset,
+            total_weeks=(days_in_month - 1 + offset) // 7 + 1,
+        )
+
+    def month(self, year, month):
+        key = (year, month, self._rule())
+        info = self._months.get(key)
+        if info is None:
+            with self._lock:
+                info = self._months.setdefault(key, self._build(*key))
+        return info
+
+    def week_of(self, day):
+        """Week of the month (1–6) that `day` falls in."""
+        info = self.month(day.year, day.month)
+        return (day.day - 1 + info.offset) // 7 + 1
+
+    def today(self):
+        """
+        (year, month_name, week_of_month, total_weeks_in_month) for today (UTC),
+        computed at call time.
+        """
+        today = datetime.utcnow().date()
+        if (today.year, today.month) != self._current_key:
+            # Month boundary: earlier months' entries are no longer needed
+            self.invalidate()
+            self._current_key = (today.year, today.month)
+
+        info = self.month(today.year, today.month)
+        return info.year, info.month_name, self.week_of(today), info.total_weeks
+
+    def invalidate(self):
+        with self._lock:
+            self._months = {}
+
+
+# Global instance
+church_calendar = ChurchCalendar()
@@ -0,0 +1,126 @@
+# app/utils/compression.py
+import gzip
+import logging
+import zlib
+
+from flask import request
+
+try:
+    import brotli  # optional: `pip install brotli` enables br
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/html",
+    "text/plain",
+    "text/csv",
+    "text/css",
+}
+
+
+def available_encodings():
+    """Encodings we can produce, most preferred first (ties in Accept-Encoding go to the first)."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+# --------------------------------------------------------
+# 🗜️ ENCODERS
+# --------------------------------------------------------
+
+def compress(data, encoding, config):
+    if encoding == "br":
+        return brotli.compress(data, quality=config["COMPRESSION_BROTLI_QUALITY"])
+    return gzip.compress(data, compresslevel=config["COMPRESSION_GZIP_LEVEL"], mtime=0)
+
+
+def _compressor(encoding, config):
+    if encoding == "br":
+        return brotli.Compressor(quality=config["COMPRESSION_BROTLI_QUALITY"])
+    return zlib.compressobj(config["COMPRESSION_GZIP_LEVEL"], zlib.DEFLATED, 31)  # 31 = gzip container
+
+
+def compress_stream(chunks, encoding, config):
+    """
+    Compress an iterable of byte chunks incrementally. Output is yielded as
+    the compressor produces it, so the body is never held in memory; the
+    source is closed when the stream ends or the client goes away.
+    """
+    compressor = _compressor(encoding, config)
+    try:
+        for chunk in chunks:
+            if encoding == "br":
+                data = compressor.process(chunk)
+            else:
+                data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish() if encoding == "br" else compressor.flush()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+# --------------------------------------------------------
+# 🌐 RESPONSE HOOK
+# --------------------------------------------------------
+
+def compress_response(response, config):
+    """
+    Compress `response` in place if the client accepts it and it is worth it:
+    a compressible type, not already encoded, and (when buffered) at least
+    COMPRESSION_MIN_SIZE bytes. Streamed responses are compressed chunk by
+    chunk whatever their size.
+    """
+    if (
+        response.status_code < 200 or response.status_code in (204, 304)
+        or response.direct_passthrough
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if encoding is None or request.method == "HEAD":
+        return response
+
+    if response.is_streamed:
+        source = response.response
+        response.response = compress_stream(response.iter_encoded(), encoding, config)
+        response.call_on_close(getattr(source, "close", lambda: None))
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < config["COMPRESSION_MIN_SIZE"]:
+            return response
+        compressed = compress(data, encoding, config)
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+
+    response.headers["Content-Encoding"] = encoding
+    # Same content, different bytes: a strong validator would be wrong now
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Register the response compression hook (COMPRESSION_ENABLED)."""
+    if not app.config.get("COMPRESSION_ENABLED", True):
+        return
+
+    config = {
+        "COMPRESSION_MIN_SIZE": app.config.get("COMPRESSION_MIN_SIZE", 1024),
+        "COMPRESSION_GZIP_LEVEL": app.config.get("COMPRESSION_GZIP_LEVEL", 6),
+        "COMPRESSION_BROTLI_QUALITY": app.config.get("COMPRESSION_BROTLI_QUALITY", 4),
+    }
+    app.after_request(lambda response: compress_response(response, config))
+    logger.info(f"Response compression enabled ({', '.join(available_encodings())})")
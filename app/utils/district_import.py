@@ -0,0 +1,164 @@
+import logging
+import time
+
+import pandas as pd
+from sqlalchemy import insert, select, update
+
+from app.extensions import db
+from app.models import District, Group
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ("district_name", "group_name")
+
+# Per-row errors echoed back to the client (the count is always complete)
+MAX_REPORTED_ERRORS = 500
+
+
+class DistrictImportError(ValueError):
+    """The upload as a whole is unusable (e.g. a required column is missing)."""
+
+
+def missing_district_columns(source):
+    """Required columns absent from the CSV header (reads the header only)."""
+    columns = pd.read_csv(source, nrows=0).columns
+    return [column for column in REQUIRED_COLUMNS if column not in columns]
+
+
+def _next_codes(stored):
+    """
+    First free sequential code per group: one past the highest numeric code
+    stored, or past the number of districts when the codes aren't numeric.
+    """
+    next_code = {}
+    for group_id, districts in stored.items():
+        numbers = [int(code) for _, code in districts.values() if str(code).isdigit()]
+        next_code[group_id] = max([len(districts), *numbers]) + 1
+    return next_code
+
+
+def import_districts_by_group_name(source, dry_run=False, progress=None):
+    """
+    Import districts from a CSV (path or file object) with `district_name`
+    and `group_name` columns.
+
+    The named groups and all of their districts are preloaded with two
+    queries, then every row is matched in memory: a district already stored under
+    its group (by name) keeps its code and gets its leader refreshed, a new one
+    gets the group's next sequential code. All inserts and updates go out as
+    two executemany statements in the current transaction; the caller commits.
+    With dry_run=True nothing is written. progress(percent, stage, **counts),
+    if given, is called between stages.
+
+    Returns {"total_rows", "valid_rows", "created", "updated", "skipped",
+    "missing_groups", "errors", "timings"}.
+    Raises DistrictImportError when a required column is missing.
+    """
+    progress = progress or (lambda percent, stage=None, **counts: None)
+    timings = {}
+    started = time.perf_counter()
+    progress(5, "reading")
+    df = pd.read_csv(source, dtype=str, keep_default_na=False)
+    missing_columns = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing_columns:
+        raise DistrictImportError(f"Missing column in CSV: {', '.join(missing_columns)}")
+
+    total_rows = len(df)
+    df = df.assign(
+        row=df.index + 2,  # CSV line (after the header)
+        district_name=df["district_name"].str.strip(),
+        group_name=df["group_name"].str.strip(),
+    )
+    df = df[(df["district_name"] != "") & (df["group_name"] != "")]
+    timings["read"] = time.perf_counter() - started
+    progress(20, "matching", rows=len(df))
+
+    # 1 query: the groups named in the file
+    started = time.perf_counter()
+    groups_by_name = {}
+    for group in db.session.execute(
+        select(Group.id, Group.name, Group.state_id, Group.region_id, Group.old_group_id)
+        .where(Group.name.in_(df["group_name"].unique().tolist()))
+        .order_by(Group.id)
+    ):
+        groups_by_name.setdefault(group.name, []).append(group)
+
+    # 1 query: every district already under those groups (name → (id, code))
+    group_ids = [group.id for matches in groups_by_name.values() for group in matches]
+    stored = {group_id: {} for group_id in group_ids}
+    for district in db.session.execute(
+        select(District.id, District.group_id, District.name, District.code)
+        .where(District.group_id.in_(group_ids))
+        .order_by(District.id)
+    ):
+        stored[district.group_id].setdefault(district.name, (district.id, district.code))
+    timings["preload"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    next_code = _next_codes(stored)
+    errors = []
+    error_count = 0
+    missing_groups = set()
+    new_districts = []
+    updated = []
+    seen = set()
+
+    def report(line, message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": line, "error": message})
+
+    for line, district_name, group_name in zip(df["row"], df["district_name"], df["group_name"]):
+        matches = groups_by_name.get(group_name)
+        if not matches:
+            missing_groups.add(group_name)
+            report(int(line), f"Group '{group_name}' not found in database")
+            continue
+        if len(matches) > 1:
+            report(int(line), f"Group name '{group_name}' matches {len(matches)} groups")
+            continue
+
+        group = matches[0]
+        if (group.id, district_name) in seen:
+            continue  # repeated line: the district is already in this import
+        seen.add((group.id, district_name))
+
+        existing = stored[group.id].get(district_name)
+        if existing:
+            updated.append({"id": existing[0], "leader": f"{district_name} Leader"})
+        else:
+            new_districts.append({
+                "name": district_name,
+                "code": str(next_code[group.id]),
+                "state_id": group.state_id,
+                "region_id": group.region_id,
+                "old_group_id": group.old_group_id,
+                "group_id": group.id,
+                "leader": f"{district_name} Leader",
+            })
+            next_code[group.id] += 1
+    timings["match"] = time.perf_counter() - started
+
+    if not dry_run:
+        progress(60, "writing", created=len(new_districts), updated=len(updated), skipped=error_count)
+        started = time.perf_counter()
+        if new_districts:
+            db.session.execute(insert(District), new_districts)  # executemany
+        if updated:
+            db.session.execute(update(District), updated)  # executemany by primary key
+        db.session.flush()
+        timings["write"] = time.perf_counter() - started
+
+    logger.info(f"District import: {len(new_districts)} created, {len(updated)} updated, {error_count} skipped")
+    return {
+        "total_rows": total_rows,
+        "valid_rows": len(df),
+        "created": len(new_districts),
+        "updated": len(updated),
+        "skipped": error_count,
+        "missing_groups": sorted(missing_groups),
+        "errors": errors,
+        "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
+        "status": "dry-run successful" if dry_run else "import completed",
+    }
@@ -1,11 +1,14 @@
 # app/utils/email_service.py
 
 import smtplib
+import queue
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import logging
-from pathlib import Path
 from flask import current_app
+from app.utils.email_templates import email_templates
 
 logger = logging.getLogger("email_service")
 
@@ -49,30 +52,193 @@ logger = logging.getLogger("email_service")
 #             logger.error(f"Failed to send email to {to_email}: {str(e)}", exc_info=True)
 #             return False
 
+# --------------------------------------------------------
+# 📬 POOLED SMTP TRANSPORT
+# --------------------------------------------------------
+
+class SMTPTransport:
+    """
+    Pool of connected, STARTTLS'd and logged-in SMTP sessions.
+
+    Sessions are borrowed for one message or a whole batch and returned to
+    the pool afterwards, so the TLS handshake and AUTH happen once per
+    session instead of once per mail. A session that errors is dropped and
+    the message is retried once on a fresh one.
+    """
+
+    # Idle sessions older than this get a NOOP before reuse (servers drop idle clients)
+    IDLE_CHECK_SECONDS = 30
+
+    def __init__(self, server, port, user=None, password=None, use_tls=True, pool_size=4, timeout=30):
+        self.server = server
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+
+    def _connect(self):
+        connection = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        if self.use_tls:
+            connection.starttls()
+        if self.user and self.password:
+            connection.login(self.user, self.password)
+        return connection
+
+    def _acquire(self):
+        while True:
+            try:
+                connection, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            if time.monotonic() - idle_since < self.IDLE_CHECK_SECONDS:
+                return connection
+            try:
+                if connection.noop()[0] == 250:
+                    return connection
+            except OSError:  # includes SMTPException
+                pass
+            self._discard(connection)
+
+    def release(self, connection):
+        """Return a borrowed session to the pool (or close it if the pool is full)."""
+        try:
+            self._idle.put_nowait((connection, time.monotonic()))
+        except queue.Full:
+            self._discard(connection)
+
+    @staticmethod
+    def _discard(connection):
+        try:
+            connection.quit()
+        except OSError:  # includes SMTPException
+            connection.close()
+
+    def send(self, sender, recipient, message, connection=None):
+        """
+        Send one message, reusing the borrowed `connection` when given
+        (batch mode) or borrowing one from the pool.
+
+        On success the (possibly replaced) connection is returned and stays
+        borrowed; on failure it has already been pooled or dropped.
+        """
+        for attempt in (1, 2):
+            if connection is None:
+                connection = self._acquire()
+            try:
+                connection.sendmail(sender, recipient, message)
+                return connection
+            except smtplib.SMTPRecipientsRefused:
+                # Bad address; smtplib has already RSET the session, keep it
+                self.release(connection)
+                raise
+            except smtplib.SMTPServerDisconnected:
+                # Stale or dropped session: reconnect and retry once
+                self._discard(connection)
+                connection = None
+                if attempt == 2:
+                    raise
+            except smtplib.SMTPException:
+                # Server rejected the message; don't trust the session state
+                self._discard(connection)
+                raise
+            except OSError:
+                # Socket-level failure (reset, timeout): reconnect and retry once
+                self._discard(connection)
+                connection = None
+                if attempt == 2:
+                    raise
+
+    def close(self):
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(connection)
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(config):
+    """Shared transport per SMTP configuration (one pool per process)."""
+    key = (
+        config.get("SMTP_SERVER"), config.get("SMTP_PORT", 587), config.get("EMAIL_USER"),
+        config.get("EMAIL_PASSWORD"), config.get("SMTP_USE_TLS", True),
+    )
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = _transports[key] = SMTPTransport(
+                server=key[0], port=key[1], user=key[2], password=key[3], use_tls=key[4],
+                pool_size=config.get("SMTP_POOL_SIZE", 4),
+                timeout=config.get("SMTP_TIMEOUT", 30),
+            )
+        return transport
+
+
+# --------------------------------------------------------
+# ✉️ EMAIL SERVICE
+# --------------------------------------------------------
+
 class EmailService:
     def __init__(self):
         pass  # DO NOT touch current_app here
 
+    def _transport(self):
+        return get_transport(current_app.config)
+
+    def _build_message(self, sender, to_email, subject, rendered):
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = sender
+        msg["To"] = to_email
+
+        # Least preferred part first: clients show the last one they support
+        msg.attach(MIMEText(rendered.text, "plain"))
+        msg.attach(MIMEText(rendered.html, "html"))
+        return msg.as_string()
+
+    @staticmethod
+    def _render_all(messages):
+        """
+        Render a batch with one render_many per template; returns the
+        RenderedEmail (or the exception) for each message, in order.
+        """
+        rendered = [None] * len(messages)
+        by_template = {}
+        for index, item in enumerate(messages):
+            by_template.setdefault(item["template_name"], []).append(index)
+
+        for template_name, indexes in by_template.items():
+            try:
+                results = email_templates.render_many(
+                    template_name, [messages[index].get("context", {}) for index in indexes]
+                )
+            except Exception:
+                # Find the offending message(s) without failing the others
+                results = []
+                for index in indexes:
+                    try:
+                        results.append(email_templates.render(template_name, messages[index].get("context", {})))
+                    except Exception as e:
+                        results.append(e)
+            for index, result in zip(indexes, results):
+                rendered[index] = result
+        return rendered
+
     def send_email(self, to_email, subject, template_name, context={}):
         try:
-            smtp_server = current_app.config.get("SMTP_SERVER")
-            smtp_port = current_app.config.get("SMTP_PORT", 587)
-            smtp_user = current_app.config.get("EMAIL_USER")
-            smtp_password = current_app.config.get("EMAIL_PASSWORD")
-
-            html_content = self._load_template(template_name, context)
+            transport = self._transport()
+            sender = current_app.config.get("EMAIL_USER")
+            rendered = email_templates.render(template_name, context)
+            message = self._build_message(sender, to_email, subject, rendered)
 
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = smtp_user
-            msg["To"] = to_email
-
-            msg.attach(MIMEText(html_content, "html"))
-
-            with smtplib.SMTP(smtp_server, smtp_port) as server:
-                server.starttls()
-                server.login(smtp_user, smtp_password)
-                server.sendmail(smtp_user, to_email, msg.as_string())
+            transport.release(transport.send(sender, to_email, message))
 
             return True
 
@@ -80,18 +246,44 @@ class EmailService:
             logger.error(f"Email send failed to {to_email}: {str(e)}")
             return False
 
-    def _load_template(self, template_name, context):
-        template_path = Path(f"app/email_templates/{template_name}.html")
-
-        if not template_path.exists():
-            raise FileNotFoundError(f"Email template '{template_name}' not found.")
-
-        content = template_path.read_text()
-
-        for key, value in context.items():
-            content = content.replace(f"{{{{{key}}}}}", str(value))
-
-        return content
+    def send_many(self, messages):
+        """
+        Send a batch over one pooled session.
+
+        `messages` is an iterable of dicts with the send_email arguments
+        (to_email, subject, template_name, context). Returns a list of
+        booleans in the same order; one failure does not stop the batch.
+        """
+        transport = self._transport()
+        sender = current_app.config.get("EMAIL_USER")
+        messages = list(messages)
+        results = []
+        connection = None
+
+        for item, rendered in zip(messages, self._render_all(messages)):
+            to_email = item["to_email"]
+            try:
+                if isinstance(rendered, Exception):
+                    raise rendered
+                message = self._build_message(sender, to_email, item["subject"], rendered)
+            except Exception as e:
+                logger.error(f"Email send failed to {to_email}: {str(e)}")
+                results.append(False)
+                continue
+
+            try:
+                connection = transport.send(sender, to_email, message, connection)
+                results.append(True)
+            except Exception as e:
+                connection = None  # send() already pooled or dropped it
+                logger.error(f"Email send failed to {to_email}: {str(e)}")
+                results.append(False)
+
+        if connection is not None:
+            transport.release(connection)
+
+        logger.info(f"Batch email: {sum(results)}/{len(results)} sent")
+        return results
 
 
 
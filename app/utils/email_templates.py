@@ -0,0 +1,107 @@
+# app/utils/email_templates.py
+from collections import namedtuple
+import html
+import logging
+from pathlib import Path
+import re
+import threading
+
+from flask import current_app, has_app_context
+from jinja2 import Environment, FileSystemLoader, TemplateNotFound, select_autoescape
+
+logger = logging.getLogger("email_service")
+
+# Next to this package, not relative to the working directory
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "email_templates"
+
+RenderedEmail = namedtuple("RenderedEmail", ["html", "text"])
+
+_SKIPPED_BLOCKS = re.compile(r"<(head|style|script)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_LINE_BREAKS = re.compile(r"<\s*(br|/p|/h[1-6]|/div|/li|/tr|/table)\b[^>]*>", re.IGNORECASE)
+_TAGS = re.compile(r"<[^>]+>")
+
+
+def html_to_text(source):
+    """
+    Plain-text version of an HTML template *source*: tags dropped, block ends
+    turned into line breaks, entities decoded. Jinja tags pass through
+    untouched, so the result is itself a template.
+    """
+    text = _SKIPPED_BLOCKS.sub("", source)
+    text = _LINE_BREAKS.sub("\n", text)
+    text = html.unescape(_TAGS.sub("", text))
+
+    lines = []
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return "\n".join(lines).strip() + "\n"
+
+
+class EmailTemplates:
+    """
+    Compiled email templates, loaded once per process.
+
+    `<name>.html` is the HTML part; the plain-text alternative is `<name>.txt`
+    when present, otherwise derived from the HTML once and compiled as well.
+    With auto_reload (EMAIL_TEMPLATES_AUTO_RELOAD, for development) a template
+    whose file mtime changed is recompiled on its next use.
+    """
+
+    def __init__(self, template_dir=TEMPLATE_DIR, auto_reload=None):
+        self.template_dir = Path(template_dir)
+        self.auto_reload = auto_reload
+        self._environment = None
+        self._text = {}  # name → (html template it was derived from, text template)
+        self._lock = threading.Lock()
+
+    def _env(self):
+        if self._environment is None:
+            with self._lock:
+                if self._environment is None:
+                    auto_reload = self.auto_reload
+                    if auto_reload is None:
+                        auto_reload = has_app_context() and current_app.config.get("EMAIL_TEMPLATES_AUTO_RELOAD", False)
+                    self._environment = Environment(
+                        loader=FileSystemLoader(str(self.template_dir)),
+                        # .html files escape context values; .txt and derived text do not
+                        autoescape=select_autoescape(["html"], default_for_string=False),
+                        auto_reload=bool(auto_reload),
+                    )
+        return self._environment
+
+    def _templates(self, name):
+        env = self._env()
+        try:
+            html_template = env.get_template(f"{name}.html")  # cached; mtime checked with auto_reload
+        except TemplateNotFound:
+            raise FileNotFoundError(f"Email template '{name}' not found.")
+
+        try:
+            return html_template, env.get_template(f"{name}.txt")
+        except TemplateNotFound:
+            pass
+
+        cached = self._text.get(name)
+        if cached is None or cached[0] is not html_template:
+            source, _, _ = env.loader.get_source(env, f"{name}.html")
+            cached = self._text[name] = (html_template, env.from_string(html_to_text(source)))
+        return html_template, cached[1]
+
+    def render(self, name, context):
+        """Render one message: RenderedEmail(html, text)."""
+        html_template, text_template = self._templates(name)
+        return RenderedEmail(html_template.render(context), text_template.render(context))
+
+    def render_many(self, name, contexts):
+        """Render one template for many contexts (a batch), looking it up only once."""
+        html_template, text_template = self._templates(name)
+        return [
+            RenderedEmail(html_template.render(context), text_template.render(context))
+            for context in contexts
+        ]
+
+
+# Global instance
+email_templates = EmailTemplates()
@@ -1,9 +1,18 @@
 # app/utils/excel_importer_enhanced.py
+import time
+from collections import namedtuple
 from datetime import datetime 
 # from datetime import now
+import numpy as np
 import pandas as pd
+from sqlalchemy import insert, select, update
+from werkzeug.security import generate_password_hash
 from app.extensions import db
 from app.models import State, Region, OldGroup, Group, District, User, Role
+from app.models.user import user_roles
+
+# Password given to every generated group admin account
+DEFAULT_GROUP_USER_PASSWORD = "12345678"
 
 def safe_strip(value):
     """Safely strip any value - converts to string first"""
@@ -11,9 +20,9 @@ def safe_strip(value):
         return ""
     return str(value).strip()
 
-def create_group_user(group_name, group, district=None):
+def group_user_email(group_name):
     """
-    Create a user for a group with COMPLETE hierarchy links
+    Login of a group's admin account.
     Username/email format: groupname.group (lowercase, no spaces, with .group suffix)
     Handles cases where 'group' is already in the name
     """
@@ -27,7 +36,14 @@ def create_group_user(group_name, group, district=None):
         clean_name = clean_name[:-5]  # Remove "group"
     
     # 🎯 ADD .group suffix (no domain)
-    email = f"{clean_name}.group"
+    return f"{clean_name}.group"
+
+def create_group_user(group_name, group, district=None):
+    """
+    Create a user for a group with COMPLETE hierarchy links
+    Username/email format: see group_user_email()
+    """
+    email = group_user_email(group_name)
     
     print(f"🔄 Creating user with email: '{email}' for group '{group_name}'")
     
@@ -43,7 +59,7 @@ def create_group_user(group_name, group, district=None):
             name=f"{group_name} Admin",
             phone=None
         )
-        user.set_password("12345678")  # Default password
+        user.set_password(DEFAULT_GROUP_USER_PASSWORD)  # Default password
     
     # 🎯 SET COMPLETE HIERARCHY LINKS - CRITICAL FOR ACCESS CONTROL
     user.state_id = group.state_id
@@ -85,395 +101,456 @@ def create_group_user(group_name, group, district=None):
 
 
 
-# def import_hierarchy_from_excel(file_path, state_name="Rivers Central", state_code="RIV-CEN", region_name="Port Harcourt", simulate=True):
-#     print("=== Starting ENHANCED hierarchy import ===")
-#     print(f"🎯 Mode: {'SIMULATION (dry-run)' if simulate else 'REAL IMPORT'}")
-    
-#     df = pd.read_excel(file_path, sheet_name=0, header=None)
-#     # df = pd.read_csv(file_path, header=None)
+# # --------------------------------------------------------
+# 📄 STAGE 1: PARSE (vectorized)
+# --------------------------------------------------------
+#
+# Sheet layout: an "... OLD GROUP" row, then a row of group names, then
+# district rows where every group owns a (code, name) column pair starting
+# at the even column at or before the group's own column. A section ends at
+# the next OLD GROUP row, a group-like row (more than 8 filled cells and no
+# numbers) or 3 empty rows in a row.
 
-#     print(f"Loaded Excel: {df.shape[0]} rows, {df.shape[1]} columns")
-    
-#     # State & Region setup (fake in sim)
-#     if not simulate:
-#         state = State.query.filter_by(name=state_name).first() or State(name=state_name, code=state_code, leader="State Leader")
-#         db.session.add(state) if state.id is None else None
-#         db.session.commit()
-        
-#         region = Region.query.filter_by(name=region_name, state_id=state.id).first() or \
-#                  Region(name=region_name, code="PH-RGN", leader="Region Leader", state_id=state.id)
-#         db.session.add(region) if region.id is None else None
-#         db.session.commit()
-#     else:
-#         state = type('FakeState', (), {'id': 999})()
-#         region = type('FakeRegion', (), {'id': 888})()
-#         print("[SIM] Fake IDs used")
-    
-#     old_groups_count = groups_count = districts_count = users_count = 0
-#     i = 0
-    
-#     while i < len(df):
-#         row_upper = df.iloc[i].astype(str).str.upper().str.strip()
-        
-#         if row_upper.str.contains('OLD GROUP').any():
-#             old_group_col = row_upper[row_upper.str.contains('OLD GROUP')].index[0]
-#             old_group_name = safe_strip(df.iloc[i, old_group_col])
-#             print(f"\n🎯 FOUND OLD GROUP: '{old_group_name}' (row {i})")
-#             old_groups_count += 1
-            
-#             if not simulate:
-#                 og = OldGroup(name=old_group_name, code=old_group_name.replace("OLD GROUP", "").strip()[:6].upper() or "OLDGRP",
-#                               state_id=state.id, region_id=region.id)
-#                 db.session.add(og)
-#                 db.session.commit()
-#                 og_id = og.id
-#             else:
-#                 og_id = 9999
-            
-#             i += 1  # Move to group row
-#             if i >= len(df): break
-            
-#             group_row = df.iloc[i]
-#             group_names, group_columns = [], []
-            
-#             for col in range(df.shape[1]):
-#                 name = safe_strip(group_row[col])
-#                 if name and not name.isdigit() and 'OLD GROUP' not in name.upper():
-#                     group_names.append(name)
-#                     group_columns.append(col)
-#                     print(f"  → Detected group: '{name}' (col {col})")
-            
-#             if not group_names:
-#                 print("  ⚠️ No groups found! Skipping...")
-#                 i += 1
-#                 continue
-            
-#             groups_count += len(group_names)
-#             group_objects = {}
-            
-#             for idx, g_name in enumerate(group_names):
-#                 col = group_columns[idx]
-#                 if not simulate:
-#                     group = Group(name=g_name, code=g_name[:6].upper() or "GRP",
-#                                   state_id=state.id, region_id=region.id, old_group_id=og_id,
-#                                   leader=f"{g_name} Leader")
-#                     db.session.add(group)
-#                     db.session.commit()
-#                     group_objects[col] = group
-#                     create_group_user(g_name, group)  # creates user & commits
-#                     users_count += 1
-#                 else:
-#                     print(f"  [SIM] Would create group '{g_name}' + user")
-#                     users_count += 1
-            
-#             # District collection
-#             i += 1
-#             districts_this_section = 0
-#             consec_empty = 0
-            
-#             while i < len(df):
-#                 dist_row = df.iloc[i]
-#                 dist_str = [safe_strip(c) for c in dist_row]
-#                 dist_upper = [s.upper() for s in dist_str]
-                
-#                 # Stop conditions
-#                 if any('OLD GROUP' in s for s in dist_upper):
-#                     print(f"  → End of section at row {i} (next OLD GROUP)")
-#                     i -= 1
-#                     break
-                
-#                 filled = sum(1 for x in dist_str if x)
-#                 has_num = any(c.isdigit() for c in dist_str if c)
-                
-#                 if filled > 8 and not has_num:
-#                     print(f"  → End of section at row {i} (new group-like row)")
-#                     i -= 1
-#                     break
-                
-#                 if all(x == '' for x in dist_str):
-#                     consec_empty += 1
-#                     if consec_empty >= 3:
-#                         print(f"  → End of section at row {i} (multiple empties)")
-#                         break
-#                     i += 1
-#                     continue
-#                 consec_empty = 0
-                
-#                 # Extract districts using strict alignment
-#                 for g_col in group_columns:
-#                     code_col = g_col if g_col % 2 == 0 else g_col - 1
-#                     name_col = code_col + 1
-                    
-#                     if name_col >= df.shape[1]: continue
-                    
-#                     code = safe_strip(dist_row[code_col])
-#                     name = safe_strip(dist_row[name_col])
-                    
-#                     if code.isdigit() and name and len(name) > 2:
-#                         districts_this_section += 1
-#                         districts_count += 1
-#                         print(f"      + District {code}: '{name}' (group col {g_col})")
-                        
-#                         if not simulate:
-#                             dist = District(name=name, code=code,
-#                                             state_id=state.id, region_id=region.id,
-#                                             old_group_id=og_id, group_id=group_objects[g_col].id,
-#                                             leader=f"{name} Leader")
-#                             db.session.add(dist)
-#                             db.session.commit()
-                
-#                 i += 1
-            
-#             print(f"  → Found {districts_this_section} districts in this section")
-#             continue
-        
-#         i += 1
-    
-#     if not simulate:
-#         db.session.commit()
-    
-#     print("\n" + "="*60)
-#     print(f"FINAL SUMMARY:")
-#     print(f"Old Groups : {old_groups_count}")
-#     print(f"Groups     : {groups_count}")
-#     print(f"Districts  : {districts_count}")
-#     print(f"Users      : {users_count}")
-#     print("="*60)
-    
-#     return {
-#         "old_groups": old_groups_count,
-#         "groups": groups_count,
-#         "districts": districts_count,
-#         "users": users_count,
-#         "status": "dry-run successful" if simulate else "import completed"
-#     }
+ParsedHierarchy = namedtuple("ParsedHierarchy", ["old_groups", "groups", "districts"])
 
 
+class HierarchyImportError(ValueError):
+    """The uploaded file can't be read as a hierarchy sheet."""
 
-def import_hierarchy_from_excel(file_path, state_name="Rivers Central", state_code="RIV-CEN", region_name="Port Harcourt", simulate=False, import_districts=False):
-    """
-    Import only Old Groups and Groups from Excel/CSV
-    Set import_districts=False to skip district import
-    """
-    print("=== Starting GROUPS-ONLY hierarchy import ===")
-    print(f"🎯 Mode: {'SIMULATION (dry-run)' if simulate else 'REAL IMPORT'}")
-    print(f"📋 Import Districts: {'YES' if import_districts else 'NO (groups only)'}")
-    
-    # Try to read as Excel first, then CSV
+
+def read_hierarchy_sheet(file_path):
+    """First sheet of an Excel workbook, or a CSV file, as a raw (headerless) frame."""
     try:
         df = pd.read_excel(file_path, sheet_name=0, header=None)
         print(f"Loaded Excel: {df.shape[0]} rows, {df.shape[1]} columns")
-    except:
+    except Exception:
         try:
             df = pd.read_csv(file_path, header=None, encoding='latin-1')
             print(f"Loaded CSV: {df.shape[0]} rows, {df.shape[1]} columns")
         except Exception as e:
-            print(f"Error reading file: {e}")
-            return {"error": f"Could not read file: {e}"}
-    
-    # State & Region setup
-    if not simulate:
-        state = State.query.filter_by(name=state_name).first() or State(name=state_name, code=state_code, leader="State Leader")
-        db.session.add(state) if state.id is None else None
-        db.session.commit()
-        
-        region = Region.query.filter_by(name=region_name, state_id=state.id).first() or \
-                 Region(name=region_name, code="PH-RGN", leader="Region Leader", state_id=state.id)
-        db.session.add(region) if region.id is None else None
-        db.session.commit()
-    else:
-        state = type('FakeState', (), {'id': 999})()
-        region = type('FakeRegion', (), {'id': 888})()
-        print("[SIM] Fake IDs used")
-    
-    old_groups_count = groups_count = districts_count = users_count = 0
-    i = 0
-    
-    # Store group mapping for export
-    group_mapping = []  # List of dicts with group info
-    
-    while i < len(df):
-        row_upper = df.iloc[i].astype(str).str.upper().str.strip()
-        
-        if row_upper.str.contains('OLD GROUP').any():
-            old_group_col = row_upper[row_upper.str.contains('OLD GROUP')].index[0]
-            old_group_name = safe_strip(df.iloc[i, old_group_col])
-            print(f"\n🎯 FOUND OLD GROUP: '{old_group_name}' (row {i})")
-            old_groups_count += 1
-            
-            if not simulate:
-                og = OldGroup(name=old_group_name, code=old_group_name.replace("OLD GROUP", "").strip()[:6].upper() or "OLDGRP",
-                              state_id=state.id, region_id=region.id)
-                db.session.add(og)
-                db.session.commit()
-                og_id = og.id
-                og_code = og.code
-            else:
-                og_id = 9999
-                og_code = old_group_name.replace("OLD GROUP", "").strip()[:6].upper() or "OLDGRP"
-            
-            i += 1  # Move to group row
-            if i >= len(df): break
-            
-            group_row = df.iloc[i]
-            group_names, group_columns = [], []
-            
-            for col in range(df.shape[1]):
-                name = safe_strip(group_row[col])
-                if name and not name.isdigit() and 'OLD GROUP' not in name.upper():
-                    group_names.append(name)
-                    group_columns.append(col)
-                    print(f"  → Detected group: '{name}' (col {col})")
-            
-            if not group_names:
-                print("  ⚠️ No groups found! Skipping...")
-                i += 1
-                continue
-            
-            groups_count += len(group_names)
-            group_objects = {}
-            
-            for idx, g_name in enumerate(group_names):
-                col = group_columns[idx]
-                if not simulate:
-                    group = Group(name=g_name, code=g_name[:6].upper() or "GRP",
-                                  state_id=state.id, region_id=region.id, old_group_id=og_id,
-                                  leader=f"{g_name} Leader")
-                    db.session.add(group)
-                    db.session.commit()
-                    group_objects[col] = group
-                    
-                    # Store mapping for export
-                    group_mapping.append({
-                        'old_group_name': old_group_name,
-                        'old_group_code': og_code,
-                        'group_name': g_name,
-                        'group_code': group.code,
-                        'group_id': group.id,
-                        'group_col': col,
-                        'old_group_id': og_id
-                    })
-                    
-                    create_group_user(g_name, group)  # creates user & commits
-                    users_count += 1
-                else:
-                    print(f"  [SIM] Would create group '{g_name}' + user")
-                    group_mapping.append({
-                        'old_group_name': old_group_name,
-                        'old_group_code': og_code,
-                        'group_name': g_name,
-                        'group_code': g_name[:6].upper() or "GRP",
-                        'group_id': f"SIM_{len(group_mapping)}",
-                        'group_col': col,
-                        'old_group_id': og_id
-                    })
-                    users_count += 1
-            
-            # SKIP DISTRICT IMPORT if import_districts is False
-            if not import_districts:
-                print(f"  ⏭️  Skipping districts for '{old_group_name}' (import_districts=False)")
-                # Skip to next OLD GROUP
-                i += 1
-                while i < len(df):
-                    row_str = ' '.join([str(df.iloc[i, c]) for c in range(df.shape[1]) if df.iloc[i, c]])
-                    if 'OLD GROUP' in row_str.upper():
-                        i -= 1
-                        break
-                    i += 1
-                continue
-            
-            # Original district import logic (only if import_districts=True)
-            i += 1
-            districts_this_section = 0
-            consec_empty = 0
-            
-            while i < len(df):
-                dist_row = df.iloc[i]
-                dist_str = [safe_strip(c) for c in dist_row]
-                dist_upper = [s.upper() for s in dist_str]
-                
-                # Stop conditions
-                if any('OLD GROUP' in s for s in dist_upper):
-                    print(f"  → End of section at row {i} (next OLD GROUP)")
-                    i -= 1
-                    break
-                
-                filled = sum(1 for x in dist_str if x)
-                has_num = any(c.isdigit() for c in dist_str if c)
-                
-                if filled > 8 and not has_num:
-                    print(f"  → End of section at row {i} (new group-like row)")
-                    i -= 1
-                    break
-                
-                if all(x == '' for x in dist_str):
-                    consec_empty += 1
-                    if consec_empty >= 3:
-                        print(f"  → End of section at row {i} (multiple empties)")
-                        break
-                    i += 1
-                    continue
-                consec_empty = 0
-                
-                # Extract districts using strict alignment
-                for g_col in group_columns:
-                    code_col = g_col if g_col % 2 == 0 else g_col - 1
-                    name_col = code_col + 1
-                    
-                    if name_col >= df.shape[1]: continue
-                    
-                    code = safe_strip(dist_row[code_col])
-                    name = safe_strip(dist_row[name_col])
-                    
-                    if code.isdigit() and name and len(name) > 2:
-                        districts_this_section += 1
-                        districts_count += 1
-                        print(f"      + District {code}: '{name}' (group col {g_col})")
-                        
-                        if not simulate:
-                            dist = District(name=name, code=code,
-                                            state_id=state.id, region_id=region.id,
-                                            old_group_id=og_id, group_id=group_objects[g_col].id,
-                                            leader=f"{name} Leader")
-                            db.session.add(dist)
-                            db.session.commit()
-                
-                i += 1
-            
-            if import_districts:
-                print(f"  → Found {districts_this_section} districts in this section")
+            raise HierarchyImportError(f"Could not read file: {e}")
+    return df
+
+
+def _normalize_cells(df):
+    """Stripped string frame: blanks → "", whole numbers → "3" (Excel reads them as 3.0)."""
+    def column(values):
+        numbers = pd.to_numeric(values, errors="coerce")
+        whole = numbers.notna() & np.isfinite(numbers) & (numbers % 1 == 0)
+        text = values.astype(str).str.strip().where(values.notna(), "")
+        text[whole] = numbers[whole].astype("int64").astype(str)
+        return text
+
+    return df.astype(object).apply(column).reset_index(drop=True)
+
+
+def parse_hierarchy_frame(df, import_districts=True):
+    """
+    Normalize a raw hierarchy sheet into three frames:
+      old_groups: section, name, code, row
+      groups:     section, old_group, name, code, column
+      districts:  section, old_group, group, code, name, row
+    Every cell is inspected with column-wise string operations; only the
+    OLD GROUP sections themselves are walked in Python.
+    """
+    text = _normalize_cells(df)
+    upper = text.apply(lambda values: values.str.upper())
+    old_group_cells = upper.apply(lambda values: values.str.contains("OLD GROUP", regex=False))
+    is_old_group_row = old_group_cells.any(axis=1).to_numpy()
+
+    # Sections start at OLD GROUP rows; the row right after one is always
+    # read as its group row, even if it mentions OLD GROUP itself
+    starts = []
+    for row in np.flatnonzero(is_old_group_row):
+        if row + 1 < len(text) and (not starts or row != starts[-1] + 1):
+            starts.append(int(row))
+    if not starts:
+        return ParsedHierarchy(
+            pd.DataFrame(columns=["section", "name", "row", "code"]),
+            pd.DataFrame(columns=["section", "column", "name", "old_group", "code"]),
+            pd.DataFrame(columns=["section", "old_group", "group", "code", "name", "row"]),
+        )
+
+    old_groups = pd.DataFrame({
+        "section": range(len(starts)),
+        "name": [text.iat[row, int(np.argmax(old_group_cells.iloc[row].to_numpy()))] for row in starts],
+        "row": starts,
+    })
+    old_groups["code"] = (
+        old_groups["name"].str.replace("OLD GROUP", "", regex=False).str.strip().str[:6].str.upper()
+        .replace("", "OLDGRP")
+    )
+
+    # Group names: every non-numeric cell of each section's group row
+    group_cells = text.iloc[[row + 1 for row in starts]].copy()
+    group_cells.index = range(len(starts))
+    groups = group_cells.stack().rename("name").rename_axis(["section", "column"]).reset_index()
+    groups = groups[
+        (groups["name"] != "")
+        & ~groups["name"].str.isdigit()
+        & ~groups["name"].str.upper().str.contains("OLD GROUP", regex=False)
+    ].reset_index(drop=True)
+    groups["old_group"] = groups["section"].map(old_groups["name"])
+    groups["code"] = groups["name"].str[:6].str.upper().replace("", "GRP")
+
+    districts = pd.DataFrame(columns=["section", "old_group", "group", "code", "name", "row"])
+    if import_districts and len(groups):
+        districts = _parse_districts(text, is_old_group_row, starts, groups, old_groups)
+
+    return ParsedHierarchy(old_groups, groups, districts)
+
+
+def _parse_districts(text, is_old_group_row, starts, groups, old_groups):
+    filled = (text != "").sum(axis=1)
+    has_number = text.apply(lambda values: values.str.isdigit()).any(axis=1)
+    empty = filled == 0
+    empty_run = empty.astype(int).groupby((~empty).cumsum()).cumsum()
+    stops = np.flatnonzero(is_old_group_row | ((filled > 8) & ~has_number).to_numpy() | (empty_run >= 3).to_numpy())
+
+    # Section owning each district row (-1 outside every section)
+    section_of_row = np.full(len(text), -1)
+    sections_with_groups = set(groups["section"])
+    for section, row in enumerate(starts):
+        if section not in sections_with_groups:
             continue
-        
-        i += 1
-    
-    if not simulate:
-        db.session.commit()
-    
+        first = row + 2
+        next_stop = np.searchsorted(stops, first)
+        end = stops[next_stop] if next_stop < len(stops) else len(text)
+        section_of_row[first:end] = section
+
+    groups = groups.assign(code_column=groups["column"] - groups["column"] % 2)
+    frames = []
+    for code_column in sorted(set(groups["code_column"])):
+        if code_column + 1 >= text.shape[1]:
+            continue
+        codes, names = text[code_column], text[code_column + 1]
+        valid = (section_of_row >= 0) & codes.str.isdigit() & (names.str.len() > 2)
+        frames.append(pd.DataFrame({
+            "section": section_of_row[valid.to_numpy()],
+            "code_column": code_column,
+            "code": codes[valid],
+            "name": names[valid],
+            "row": np.flatnonzero(valid.to_numpy()),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["section", "old_group", "group", "code", "name", "row"])
+
+    districts = pd.concat(frames, ignore_index=True).merge(
+        groups[["section", "code_column", "name"]].rename(columns={"name": "group"}),
+        on=["section", "code_column"],
+    )
+    districts["old_group"] = districts["section"].map(old_groups["name"])
+    return districts.sort_values(["row", "code_column"])[["section", "old_group", "group", "code", "name", "row"]]
+
+
+# --------------------------------------------------------
+# 🔍 STAGE 2: DIFF against the database
+# --------------------------------------------------------
+
+HierarchyPlan = namedtuple("HierarchyPlan", [
+    "state", "state_name", "state_code", "region", "region_name",
+    "old_groups", "groups", "districts", "users", "group_admin_role",
+])
+
+
+def _existing(model, columns, *criteria):
+    """Rows of `model` as a frame, oldest first, so duplicate names resolve to the original row."""
+    rows = db.session.execute(
+        select(*[getattr(model, name) for name in columns]).where(*criteria).order_by(model.id)
+    ).all()
+    return pd.DataFrame(rows, columns=columns)
+
+
+def _match(frame, existing, on):
+    """Left-join existing ids onto `frame` by name; `id` is NaN for rows still to create."""
+    existing = existing.drop_duplicates(on, keep="first")[[*on, "id"]]
+    return frame.merge(existing, on=on, how="left")
+
+
+def plan_hierarchy_import(parsed, state_name, state_code, region_name):
+    """
+    Match the parsed sheet against what is stored: old groups by name within
+    the region, groups by name within their old group, districts by name within
+    their group and group admin users by login. Four SELECTs in total.
+    """
+    state = State.query.filter_by(name=state_name).first()
+    region = Region.query.filter_by(name=region_name, state_id=state.id).first() if state else None
+
+    old_groups = parsed.old_groups.drop_duplicates("name", keep="first")
+    groups = parsed.groups.drop_duplicates(["old_group", "name"], keep="first")
+    districts = parsed.districts.drop_duplicates(["old_group", "group", "name"], keep="first")
+
+    stored_old_groups = _existing(OldGroup, ["id", "name"], OldGroup.region_id == region.id) if region \
+        else pd.DataFrame(columns=["id", "name"])
+    old_groups = _match(old_groups, stored_old_groups, ["name"])
+
+    stored_groups = _existing(Group, ["id", "name", "old_group_id"],
+                              Group.old_group_id.in_(old_groups["id"].dropna().astype(int).tolist()))
+    stored_groups = stored_groups.merge(
+        stored_old_groups.rename(columns={"id": "old_group_id", "name": "old_group"}), on="old_group_id"
+    )
+    groups = _match(groups, stored_groups, ["old_group", "name"])
+
+    stored_districts = _existing(District, ["id", "name", "code", "group_id"],
+                                 District.group_id.in_(groups["id"].dropna().astype(int).tolist()))
+    stored_districts = stored_districts.merge(
+        stored_groups[["id", "name", "old_group"]].rename(columns={"id": "group_id", "name": "group"}), on="group_id"
+    ).rename(columns={"code": "stored_code"})
+    districts = districts.merge(
+        stored_districts.drop_duplicates(["old_group", "group", "name"], keep="first")
+        [["old_group", "group", "name", "id", "stored_code"]],
+        on=["old_group", "group", "name"], how="left",
+    )
+
+    # One admin account per group; two groups with the same login share it (the last one wins)
+    users = groups[["old_group", "name"]].rename(columns={"name": "group"})
+    users["email"] = users["group"].map(group_user_email)
+    users = users.drop_duplicates("email", keep="last")
+    stored_users = _existing(User, ["id", "email"], User.email.in_(users["email"].tolist()))
+    users = users.merge(stored_users, on="email", how="left")
+
+    return HierarchyPlan(
+        state=state, state_name=state_name, state_code=state_code, region=region, region_name=region_name,
+        old_groups=old_groups, groups=groups, districts=districts, users=users,
+        group_admin_role=Role.query.filter_by(name="Group Admin").first(),
+    )
+
+
+def summarize_plan(plan):
+    """Counts of what the import would create, keep or change."""
+    new_districts = plan.districts["id"].isna()
+    return {
+        "created": {
+            "state": plan.state is None,
+            "region": plan.region is None,
+            "old_groups": int(plan.old_groups["id"].isna().sum()),
+            "groups": int(plan.groups["id"].isna().sum()),
+            "districts": int(new_districts.sum()),
+            "users": int(plan.users["id"].isna().sum()),
+        },
+        "existing": {
+            "old_groups": int(plan.old_groups["id"].notna().sum()),
+            "groups": int(plan.groups["id"].notna().sum()),
+            "districts": int((~new_districts).sum()),
+            "users": int(plan.users["id"].notna().sum()),
+        },
+        "updated": {
+            "district_codes": int((~new_districts & (plan.districts["stored_code"] != plan.districts["code"])).sum()),
+        },
+    }
+
+
+# --------------------------------------------------------
+# 💾 STAGE 3: WRITE (one transaction, caller commits)
+# --------------------------------------------------------
+
+def _ids_by_name(model, columns, *criteria):
+    return _existing(model, ["id", *columns], *criteria).drop_duplicates(columns, keep="first")
+
+
+def write_hierarchy_import(plan):
+    """
+    Apply a plan with bulk INSERT/UPDATE statements inside the current
+    transaction and return the groups with their database ids. Nothing is
+    committed here.
+    """
+    state = plan.state
+    if state is None:
+        state = State(name=plan.state_name, code=plan.state_code, leader="State Leader")
+        db.session.add(state)
+        db.session.flush()
+    region = plan.region
+    if region is None:
+        region = Region(name=plan.region_name, code="PH-RGN", leader="Region Leader", state_id=state.id)
+        db.session.add(region)
+        db.session.flush()
+
+    new_old_groups = plan.old_groups[plan.old_groups["id"].isna()]
+    if len(new_old_groups):
+        db.session.execute(insert(OldGroup), [
+            {"name": name, "code": code, "state_id": state.id, "region_id": region.id}
+            for name, code in zip(new_old_groups["name"], new_old_groups["code"])
+        ])
+    old_group_ids = _ids_by_name(OldGroup, ["name"], OldGroup.region_id == region.id)
+    old_group_ids = old_group_ids.rename(columns={"id": "old_group_id", "name": "old_group"})
+
+    groups = plan.groups.rename(columns={"id": "stored_id"}).merge(old_group_ids, on="old_group")
+    new_groups = groups[groups["stored_id"].isna()]
+    if len(new_groups):
+        db.session.execute(insert(Group), [
+            {"name": name, "code": code, "state_id": state.id, "region_id": region.id,
+             "old_group_id": int(old_group_id), "leader": f"{name} Leader"}
+            for name, code, old_group_id in zip(new_groups["name"], new_groups["code"], new_groups["old_group_id"])
+        ])
+    group_ids = _ids_by_name(Group, ["old_group_id", "name"],
+                             Group.old_group_id.in_(old_group_ids["old_group_id"].tolist()))
+    groups = groups.drop(columns="stored_id").merge(group_ids, on=["old_group_id", "name"])
+
+    _write_group_users(plan, groups, state, region)
+
+    districts = plan.districts.merge(
+        groups[["old_group", "name", "id", "old_group_id"]].rename(columns={"name": "group", "id": "group_id"}),
+        on=["old_group", "group"],
+    )
+    new_districts = districts[districts["id"].isna()]
+    if len(new_districts):
+        db.session.execute(insert(District), [
+            {"name": name, "code": code, "state_id": state.id, "region_id": region.id,
+             "old_group_id": int(old_group_id), "group_id": int(group_id), "leader": f"{name} Leader"}
+            for name, code, old_group_id, group_id in zip(
+                new_districts["name"], new_districts["code"], new_districts["old_group_id"], new_districts["group_id"])
+        ])
+    recoded = districts[districts["id"].notna() & (districts["stored_code"] != districts["code"])]
+    if len(recoded):
+        db.session.execute(update(District), [
+            {"id": int(district_id), "code": code} for district_id, code in zip(recoded["id"], recoded["code"])
+        ])
+
+    db.session.flush()
+    return groups
+
+
+def _write_group_users(plan, groups, state, region):
+    """Create or relink one Group Admin account per group, all in bulk."""
+    role = plan.group_admin_role
+    if role is None:
+        print(f"⚠️  Warning: Group Admin role not found! Creating it")
+        role = Role(name="Group Admin", description="Administrator for a specific group")
+        db.session.add(role)
+        db.session.flush()
+
+    users = plan.users.merge(
+        groups[["old_group", "name", "id", "old_group_id"]].rename(columns={"name": "group", "id": "group_id"}),
+        on=["old_group", "group"],
+    )
+    links = lambda user: {"state_id": state.id, "region_id": region.id, "old_group_id": int(user.old_group_id),
+                          "group_id": int(user.group_id), "district_id": None}
+
+    new_users = users[users["id"].isna()]
+    if len(new_users):
+        # Every account starts with the same default password: hash it once
+        password_hash = generate_password_hash(DEFAULT_GROUP_USER_PASSWORD)
+        db.session.execute(insert(User), [
+            {"email": user.email, "name": f"{user.group} Admin", "phone": None, "password_hash": password_hash,
+             **links(user)}
+            for user in new_users.itertuples()
+        ])
+    existing_users = users[users["id"].notna()]
+    if len(existing_users):
+        db.session.execute(update(User), [{"id": int(user.id), **links(user)} for user in existing_users.itertuples()])
+
+    user_ids = dict(db.session.execute(select(User.email, User.id).where(User.email.in_(users["email"].tolist()))).all())
+    has_role = set(db.session.scalars(
+        select(user_roles.c.user_id).where(user_roles.c.role_id == role.id, user_roles.c.user_id.in_(user_ids.values()))
+    ))
+    missing_role = [{"user_id": user_id, "role_id": role.id} for user_id in user_ids.values() if user_id not in has_role]
+    if missing_role:
+        db.session.execute(insert(user_roles), missing_role)
+
+
+# --------------------------------------------------------
+# 🚀 ENTRY POINT
+# --------------------------------------------------------
+
+def import_hierarchy_from_excel(file_path, state_name="Rivers Central", state_code="RIV-CEN", region_name="Port Harcourt", simulate=False, import_districts=False, progress=None):
+    """
+    Import Old Groups, Groups (+ one Group Admin user each) and optionally
+    Districts from an Excel/CSV hierarchy sheet.
+
+    parse → diff → write: the sheet is parsed into frames, compared with
+    what is already stored, and only the missing rows are bulk inserted, so
+    re-importing a sheet is a no-op. Nothing is committed: the caller
+    commits once (or rolls back). With simulate=True (dry run) nothing is
+    written and the report lists what would change.
+    Set import_districts=False to skip district import
+    progress(percent, stage, **counts), if given, is called between stages
+    (background jobs report it to pollers)
+    """
+    print("=== Starting hierarchy import ===")
+    print(f"🎯 Mode: {'SIMULATION (dry-run)' if simulate else 'REAL IMPORT'}")
+    print(f"📋 Import Districts: {'YES' if import_districts else 'NO (groups only)'}")
+
+    progress = progress or (lambda percent, stage=None, **counts: None)
+    timings = {}
+    started = time.perf_counter()
+    progress(5, "reading")
+    try:
+        df = read_hierarchy_sheet(file_path)
+    except HierarchyImportError as e:
+        print(f"Error reading file: {e}")
+        return {"error": str(e)}
+    parsed = parse_hierarchy_frame(df, import_districts=import_districts)
+    timings["parse"] = time.perf_counter() - started
+    progress(30, "diffing", old_groups=len(parsed.old_groups), groups=len(parsed.groups),
+             districts=len(parsed.districts))
+
+    started = time.perf_counter()
+    plan = plan_hierarchy_import(parsed, state_name, state_code, region_name)
+    report = summarize_plan(plan)
+    timings["diff"] = time.perf_counter() - started
+
+    old_groups_count = len(plan.old_groups)
+    groups_count = len(plan.groups)
+    districts_count = len(plan.districts)
+    users_count = len(plan.users)
+
+    if simulate:
+        group_mapping = [
+            {'old_group_name': group.old_group, 'old_group_code': code, 'group_name': group.name,
+             'group_code': group.code, 'group_id': None if pd.isna(group.id) else int(group.id),
+             'group_col': int(group.column)}
+            for group, code in zip(plan.groups.itertuples(),
+                                   plan.groups["old_group"].map(plan.old_groups.set_index("name")["code"]))
+        ]
+        report["preview"] = {
+            "old_groups": plan.old_groups.loc[plan.old_groups["id"].isna(), "name"].tolist(),
+            "groups": [f"{old_group} › {name}" for old_group, name in
+                       plan.groups.loc[plan.groups["id"].isna(), ["old_group", "name"]].itertuples(index=False)],
+        }
+    else:
+        progress(50, "writing")
+        started = time.perf_counter()
+        groups = write_hierarchy_import(plan)
+        timings["write"] = time.perf_counter() - started
+
+        group_mapping = [
+            {'old_group_name': group.old_group, 'old_group_code': group.old_group_code, 'group_name': group.name,
+             'group_code': group.code, 'group_id': int(group.id), 'group_col': int(group.column),
+             'old_group_id': int(group.old_group_id)}
+            for group in groups.assign(
+                old_group_code=groups["old_group"].map(plan.old_groups.set_index("name")["code"])
+            ).itertuples()
+        ]
+
     # Create export file with group mappings
+    export_filename = None
     if not simulate and group_mapping:
         export_filename = f"group_mappings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        export_df = pd.DataFrame(group_mapping)
-        export_df.to_csv(export_filename, index=False)
+        pd.DataFrame(group_mapping).to_csv(export_filename, index=False)
         print(f"\n📁 Group mappings exported to: {export_filename}")
         print(f"   Total groups mapped: {len(group_mapping)}")
-    
+
+    created, existing = report["created"], report["existing"]
     print("\n" + "="*60)
-    print(f"FINAL SUMMARY:")
-    print(f"Old Groups : {old_groups_count}")
-    print(f"Groups     : {groups_count}")
-    print(f"Districts  : {districts_count} {'(SKIPPED)' if not import_districts else ''}")
-    print(f"Users      : {users_count}")
+    print(f"{'DRY-RUN' if simulate else 'FINAL'} SUMMARY:          new / existing")
+    print(f"Old Groups : {created['old_groups']:>6} / {existing['old_groups']}")
+    print(f"Groups     : {created['groups']:>6} / {existing['groups']}")
+    print(f"Districts  : {created['districts']:>6} / {existing['districts']} {'(SKIPPED)' if not import_districts else ''}")
+    print(f"Users      : {created['users']:>6} / {existing['users']}")
+    print(f"Timings    : " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items()))
     print("="*60)
-    
+
     # Show expected vs actual
     if groups_count != 111:
         print(f"⚠️  WARNING: Expected 111 groups, got {groups_count}")
-    
+
     return {
         "old_groups": old_groups_count,
         "groups": groups_count,
         "districts": districts_count,
         "users": users_count,
+        **report,
+        "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
         "group_mappings": group_mapping if simulate else export_filename,
         "status": "dry-run successful" if simulate else "import completed"
     }
@@ -620,7 +697,7 @@ def import_districts_from_mapping(districts_file, groups_mapping_file):
 #             name=f"{group_name} Admin",
 #             phone=None
 #         )
-#         user.set_password("12345678")  # Default password
+#         user.set_password(DEFAULT_GROUP_USER_PASSWORD)  # Default password
     
 #     # 🎯 SET COMPLETE HIERARCHY LINKS - CRITICAL FOR ACCESS CONTROL
 #     user.state_id = group.state_id
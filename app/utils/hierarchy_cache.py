@@ -0,0 +1,250 @@
+from functools import wraps
+import hashlib
+import logging
+import threading
+
+from flask import current_app, g, has_request_context, make_response, request
+from sqlalchemy import select, update
+
+from app.extensions import db
+from app.models import State, Region, OldGroup, Group, District, HierarchyVersion
+from app.utils.access_control import get_current_principal, resolve_scope
+
+logger = logging.getLogger(__name__)
+
+HIERARCHY_MODELS = {
+    "state": State,
+    "region": Region,
+    "old_group": OldGroup,
+    "group": Group,
+    "district": District,
+}
+
+VERSION_ROW_ID = 1
+
+# Tree levels top-down: (level, key its nodes are listed under, parent id field)
+TREE_LEVELS = (
+    ("state", "states", None),
+    ("region", "regions", "state_id"),
+    ("old_group", "old_groups", "region_id"),
+    ("group", "groups", "old_group_id"),
+    ("district", "districts", "group_id"),
+)
+
+
+# --------------------------------------------------------
+# 🔢 VERSION COUNTER
+# --------------------------------------------------------
+
+def get_hierarchy_version():
+    """Current hierarchy version stored in the database (0 if never bumped)."""
+    return db.session.execute(
+        select(HierarchyVersion.version).where(HierarchyVersion.id == VERSION_ROW_ID)
+    ).scalar() or 0
+
+
+def bump_hierarchy_version():
+    """
+    Mark the hierarchy as changed. Call before committing any write to
+    states/regions/old_groups/groups/districts; the bump is part of the
+    caller's transaction, so it only becomes visible if the write does.
+    """
+    updated = db.session.execute(
+        update(HierarchyVersion)
+        .where(HierarchyVersion.id == VERSION_ROW_ID)
+        .values(version=HierarchyVersion.version + 1)
+    ).rowcount
+
+    if not updated:
+        db.session.add(HierarchyVersion(id=VERSION_ROW_ID, version=1))
+
+    if has_request_context():
+        g.pop("hierarchy_version", None)
+
+
+# --------------------------------------------------------
+# 📸 SNAPSHOT
+# --------------------------------------------------------
+
+class HierarchySnapshot:
+    """
+    Read-only copy of the whole hierarchy at one version.
+
+    Entities are stored as their `to_dict()` payloads, indexed by id and by
+    every parent id they carry (state_id, region_id, old_group_id, group_id).
+    Accessors return fresh dicts so callers can't mutate the shared snapshot.
+    """
+
+    def __init__(self, version, records):
+        self.version = version
+        self._by_id = {}
+        self._children = {}
+
+        for level, items in records.items():
+            self._by_id[level] = {item["id"]: item for item in items}
+            for item in items:
+                for field, value in item.items():
+                    if field.endswith("_id") and value is not None:
+                        self._children.setdefault((level, field, value), []).append(item["id"])
+
+        self._children = {key: tuple(ids) for key, ids in self._children.items()}
+
+    def get(self, level, entity_id):
+        item = self._by_id[level].get(entity_id)
+        return dict(item) if item else None
+
+    def name(self, level, entity_id):
+        item = self._by_id[level].get(entity_id)
+        return item["name"] if item else None
+
+    def all(self, level):
+        return [dict(item) for item in self._by_id[level].values()]
+
+    def ids(self, level):
+        return list(self._by_id[level])
+
+    def child_ids(self, level, parent_field, parent_id):
+        """Ids of `level` entities whose `parent_field` equals `parent_id`."""
+        return list(self._children.get((level, parent_field, parent_id), ()))
+
+    def children(self, level, parent_field, parent_id):
+        by_id = self._by_id[level]
+        return [dict(by_id[i]) for i in self._children.get((level, parent_field, parent_id), ())]
+
+    def in_scope(self, level, scope=None):
+        """
+        `level` entities inside a (scope_level, scope_id) subtree, mirroring
+        access_control.build_scope_predicate; scope=None means everything.
+        """
+        if scope is None:
+            return self.all(level)
+
+        scope_level, scope_id = scope
+        if level == scope_level:
+            item = self.get(level, scope_id)
+            return [item] if item else []
+        return self.children(level, f"{scope_level}_id", scope_id)
+
+    def tree(self, level, entity_ids, depth=None):
+        """
+        Nested {id, name, code} nodes for `entity_ids` of `level`, each with
+        its children listed under the next level's key (e.g. "regions"),
+        `depth` levels in all (None = down to districts).
+        """
+        index = [name for name, _, _ in TREE_LEVELS].index(level)
+        last = len(TREE_LEVELS) if depth is None else min(index + depth, len(TREE_LEVELS))
+        return self._nodes(index, last, entity_ids)
+
+    def _nodes(self, index, last, entity_ids):
+        level = TREE_LEVELS[index][0]
+        by_id = self._by_id[level]
+        child = TREE_LEVELS[index + 1] if index + 1 < last else None
+
+        nodes = []
+        for entity_id in entity_ids:
+            item = by_id.get(entity_id)
+            if item is None:
+                continue
+            node = {"id": entity_id, "name": item["name"], "code": item["code"]}
+            if child is not None:
+                child_level, child_key, parent_field = child
+                child_ids = self._children.get((child_level, parent_field, entity_id), ())
+                node[child_key] = self._nodes(index + 1, last, child_ids)
+            nodes.append(node)
+        return nodes
+
+
+# --------------------------------------------------------
+# 🗄️ CACHE
+# --------------------------------------------------------
+
+class HierarchyCache:
+    """
+    Process-wide hierarchy snapshot, rebuilt lazily when the DB version moves.
+
+    The version row is read at most once per request (kept on flask.g), so a
+    request that touches the hierarchy several times pays one tiny SELECT and
+    every worker picks up writes made by any other worker.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        """The DB hierarchy version, read at most once per request."""
+        if has_request_context():
+            if "hierarchy_version" not in g:
+                g.hierarchy_version = get_hierarchy_version()
+            return g.hierarchy_version
+        return get_hierarchy_version()
+
+    def get(self):
+        version = self.current_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._build(version)
+                self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self):
+        self._snapshot = None
+
+    @staticmethod
+    def _build(version):
+        records = {
+            level: [entity.to_dict() for entity in model.query.order_by(model.id).all()]
+            for level, model in HIERARCHY_MODELS.items()
+        }
+        logger.info(f"Hierarchy cache rebuilt at version {version}")
+        return HierarchySnapshot(version, records)
+
+
+# Global instance
+hierarchy_cache = HierarchyCache()
+
+
+# --------------------------------------------------------
+# 🏷️ CONDITIONAL GET
+# --------------------------------------------------------
+
+def hierarchy_etag(scoped=True):
+    """
+    Conditional GET for views that only read the hierarchy.
+
+    The strong ETag hashes the hierarchy version, the endpoint and its
+    arguments and, when `scoped`, the caller's resolved scope (two admins
+    of different states never share one). A request whose If-None-Match
+    matches gets 304 before the view runs: no rows are loaded and no JSON
+    is serialized. Responses carry `Cache-Control: private, max-age=N`
+    (HIERARCHY_CACHE_MAX_AGE, 0 = always revalidate).
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorated(*args, **kwargs):
+            scope = resolve_scope(get_current_principal()) if scoped else None
+            key = repr((
+                hierarchy_cache.current_version(), request.endpoint,
+                sorted(kwargs.items()), request.query_string, scope,
+            ))
+            etag = hashlib.sha256(key.encode()).hexdigest()[:32]
+
+            # Weak comparison (RFC 9110): compressed responses carry W/"<etag>"
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.cache_control.private = True
+            response.cache_control.max_age = current_app.config.get("HIERARCHY_CACHE_MAX_AGE", 0)
+            return response
+        return decorated
+    return wrapper
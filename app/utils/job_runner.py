@@ -0,0 +1,143 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import logging
+import threading
+
+from flask import current_app
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+# kind → handler(job: JobContext, **params) -> dict
+_handlers = {}
+
+
+def job_handler(kind):
+    """
+    Register a background job handler. It is called with a JobContext and the
+    job's params, runs inside an app context with its own session, and returns
+    a JSON-serializable result; optional "counts" and "errors" keys are copied
+    to the job row. The runner commits the handler's writes together with the
+    job's completion, or rolls both back if the handler raises.
+    """
+    def register(fn):
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+class JobContext:
+    """What a handler gets to report progress on its job."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.counts = {}
+
+    def progress(self, percent, stage=None, **counts):
+        """
+        Record progress on a separate connection, so pollers see it while the
+        handler's own transaction is still open. Best effort: on SQLite the
+        write waits behind the handler's lock, so report before writing.
+        """
+        self.counts.update(counts)
+        values = {"progress": percent, "heartbeat_at": datetime.utcnow()}
+        if stage:
+            values["stage"] = stage
+        if counts:
+            values["counts"] = dict(self.counts)
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(update(BackgroundJob).where(BackgroundJob.id == self.job_id).values(**values))
+        except SQLAlchemyError as e:
+            logger.warning(f"Job {self.job_id}: could not record progress: {e}")
+
+
+class JobRunner:
+    """
+    In-process thread pool running registered handlers off the request path.
+    State lives in the background_jobs table, so any worker process can
+    report on a job; the pool itself is per process and created on first use.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self, app):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=app.config.get("JOB_WORKERS", 2), thread_name_prefix="background-job"
+                )
+            return self._executor
+
+    def submit(self, kind, params, created_by=None):
+        """Record a queued job, start it on the pool and return it (committed)."""
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = BackgroundJob(kind=kind, params=params, status="queued", progress=0.0, created_by=created_by)
+        db.session.add(job)
+        db.session.commit()
+
+        app = current_app._get_current_object()
+        self._pool(app).submit(self._run, app, job.id)
+        return job
+
+    def _run(self, app, job_id):
+        with app.app_context():
+            job = db.session.get(BackgroundJob, job_id)
+            job.status = "running"
+            job.started_at = job.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+            context = JobContext(job_id)
+
+            try:
+                result = _handlers[job.kind](context, **job.params) or {}
+                job = db.session.get(BackgroundJob, job_id)
+                job.status = "completed"
+                job.stage = "done"
+                job.progress = 100.0
+                job.counts = {**context.counts, **result.get("counts", {})}
+                job.error_rows = result.get("errors", [])
+                job.result = result
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                logger.info(f"Job {job_id} ({job.kind}) completed")
+            except Exception as e:
+                db.session.rollback()
+                logger.exception(f"Job {job_id} failed")
+                job = db.session.get(BackgroundJob, job_id)
+                job.status = "failed"
+                job.error = str(e)
+                job.counts = context.counts
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+
+
+def get_job(job_id):
+    """
+    Load a job for a status request. A job whose worker went away (deploy,
+    crash) would stay queued/running forever, so one that hasn't reported
+    for JOB_STALE_SECONDS is marked failed here.
+    """
+    job = db.session.get(BackgroundJob, job_id)
+    if job is None or job.status not in ("queued", "running"):
+        return job
+
+    stale_after = timedelta(seconds=current_app.config.get("JOB_STALE_SECONDS", 3600))
+    last_seen = job.heartbeat_at or job.created_at
+    if last_seen and datetime.utcnow() - last_seen > stale_after:
+        job.status = "failed"
+        job.error = "The worker running this job stopped before it finished"
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    return job
+
+
+# Global instance
+job_runner = JobRunner()
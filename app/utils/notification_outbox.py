@@ -0,0 +1,285 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import logging
+
+from flask import current_app
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models import NotificationJob, NotificationOutbox
+from app.controllers.reminder_controller import (
+    REMINDER_MODELS, collect_manual_reminders, collect_targeted_reminders,
+)
+from app.utils.email_service import EmailService
+from app.utils.whatsapp_service import WhatsAppService, whatsapp_dispatcher
+
+logger = logging.getLogger("notification_outbox")
+
+email_service = EmailService()
+
+
+# --------------------------------------------------------
+# 📥 ENQUEUE (request handlers)
+# --------------------------------------------------------
+
+def enqueue_reminder_job(entity_type, entity_id=None, methods=('email', 'whatsapp'), created_by=None):
+    """
+    Record a reminder request and return the queued NotificationJob.
+    Recipients are resolved and messages sent later by the outbox worker.
+    """
+    job = NotificationJob(
+        kind="manual" if entity_id is None else "targeted",
+        entity_type=entity_type,
+        entity_id=entity_id,
+        methods=list(methods),
+        created_by=created_by,
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+# --------------------------------------------------------
+# 🗂️ PLAN: job → one outbox row per recipient and channel
+# --------------------------------------------------------
+
+def _outbox_rows(job, pending):
+    rows = []
+    for entity, user, week in pending:
+        name = user.name or user.email
+        if 'email' in job.methods and user.email:
+            rows.append(NotificationOutbox(
+                job_id=job.id, channel="email", recipient=user.email,
+                recipient_name=name, entity_name=entity.name,
+                payload=dict(
+                    to_email=user.email,
+                    subject="Attendance Reminder",
+                    template_name="attendance_overdue",
+                    context={"name": name, "week": week},
+                ),
+            ))
+        if 'whatsapp' in job.methods and user.phone:
+            rows.append(NotificationOutbox(
+                job_id=job.id, channel="whatsapp", recipient=user.phone,
+                recipient_name=name, entity_name=entity.name,
+                payload=dict(
+                    to_phone=user.phone,
+                    message=WhatsAppService.attendance_reminder_text(name, week),
+                ),
+            ))
+    return rows
+
+
+def _claim_job(job_id, **values):
+    """
+    Move a job out of `queued` if it is still there. The conditional UPDATE
+    row-locks the job on PostgreSQL, so of two workers racing for it one
+    updates it and the other (after waiting) matches nothing.
+    """
+    result = db.session.execute(
+        update(NotificationJob)
+        .where(NotificationJob.id == job_id, NotificationJob.status == "queued")
+        .values(**values)
+    )
+    return result.rowcount == 1
+
+
+def plan_job(job):
+    """
+    Expand a queued job into outbox rows (one transaction). Returns False
+    when another worker claimed the job first; if planning fails the claim
+    is rolled back with it.
+    """
+    if not _claim_job(job.id, status="running", started_at=datetime.utcnow()):
+        db.session.rollback()
+        return False
+
+    if job.kind == "targeted":
+        entity = REMINDER_MODELS[job.entity_type].query.get(job.entity_id)
+        if entity is None:
+            raise ValueError("Entity not found")
+        pending = collect_targeted_reminders(job.entity_type, entity)
+    else:
+        pending = collect_manual_reminders(job.entity_type)
+        if pending is None:
+            raise ValueError("Invalid entity_type")
+
+    rows = _outbox_rows(job, pending)
+    db.session.add_all(rows)
+    job.total = len(rows)
+    if not rows:
+        job.status = "completed"
+        job.finished_at = datetime.utcnow()
+    db.session.commit()
+    logger.info(f"🗂️ Reminder job {job.id}: {len(rows)} messages queued")
+    return True
+
+
+def plan_queued_jobs():
+    """Plan every queued job this worker manages to claim. Returns how many it planned."""
+    planned = 0
+    job_ids = db.session.scalars(
+        select(NotificationJob.id).where(NotificationJob.status == "queued").order_by(NotificationJob.id)
+    ).all()
+    for job_id in job_ids:
+        job = db.session.get(NotificationJob, job_id)
+        try:
+            if plan_job(job):
+                planned += 1
+        except Exception as e:
+            db.session.rollback()
+            _claim_job(job_id, status="failed", error=str(e), finished_at=datetime.utcnow())
+            db.session.commit()
+            logger.error(f"❌ Reminder job {job_id} could not be planned", exc_info=True)
+    return planned
+
+
+# --------------------------------------------------------
+# 📤 DRAIN: claim due rows, deliver, record outcomes
+# --------------------------------------------------------
+
+def claim_due_messages(limit):
+    """
+    Lease up to `limit` due rows to this worker. Rows stay `sending` until
+    the lease runs out, so another worker (or the next pass after a crash)
+    only picks them up again once it has expired. On PostgreSQL concurrent
+    workers skip each other's locked rows instead of blocking.
+    """
+    config = current_app.config
+    now = datetime.utcnow()
+
+    query = NotificationOutbox.query.filter(
+        NotificationOutbox.status.in_(("pending", "sending")),
+        NotificationOutbox.next_attempt_at <= now,
+    ).order_by(NotificationOutbox.id).limit(limit)
+    if db.engine.dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+
+    claimed = []
+    lease_until = now + timedelta(seconds=config.get("OUTBOX_LEASE_SECONDS", 600))
+    for row in query.all():
+        row.status = "sending"
+        row.attempts += 1
+        row.next_attempt_at = lease_until
+        # Plain tuples: the rows expire on commit
+        claimed.append((row.id, row.job_id, row.channel, row.payload, row.attempts))
+    db.session.commit()
+    return claimed
+
+
+def _send_emails(app, payloads):
+    """Split the batch over the SMTP pool so each pooled session sends its share concurrently."""
+    if not payloads:
+        return []
+    workers = max(1, min(app.config.get("SMTP_POOL_SIZE", 4), len(payloads)))
+    size = -(-len(payloads) // workers)
+    chunks = [payloads[i:i + size] for i in range(0, len(payloads), size)]
+
+    def run(chunk):
+        with app.app_context():
+            return email_service.send_many(chunk)
+
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        return [sent for results in pool.map(run, chunks) for sent in results]
+
+
+def deliver(claimed):
+    """Send claimed messages; emails and WhatsApp go out concurrently. Returns {row_id: bool}."""
+    emails = [(row_id, payload) for row_id, _, channel, payload, _ in claimed if channel == "email"]
+    whatsapps = [(row_id, payload) for row_id, _, channel, payload, _ in claimed if channel == "whatsapp"]
+    app = current_app._get_current_object()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        email_future = pool.submit(_send_emails, app, [payload for _, payload in emails])
+        whatsapp_results = whatsapp_dispatcher.send_many(
+            (payload["to_phone"], payload["message"]) for _, payload in whatsapps
+        )
+        email_results = email_future.result()
+
+    outcomes = dict(zip((row_id for row_id, _ in emails), email_results))
+    outcomes.update(zip((row_id for row_id, _ in whatsapps), whatsapp_results))
+    return outcomes
+
+
+def record_outcomes(claimed, outcomes):
+    """Mark rows sent, reschedule failures with exponential backoff, or give up after max attempts."""
+    config = current_app.config
+    max_attempts = config.get("OUTBOX_MAX_ATTEMPTS", 5)
+    retry_seconds = config.get("OUTBOX_RETRY_SECONDS", 60)
+    now = datetime.utcnow()
+
+    changes = []
+    for row_id, _, channel, _, attempts in claimed:
+        if outcomes.get(row_id):
+            changes.append({"id": row_id, "status": "sent", "sent_at": now, "last_error": None})
+            continue
+
+        error = "Email delivery failed" if channel == "email" else "WhatsApp delivery failed"
+        if attempts >= max_attempts:
+            changes.append({"id": row_id, "status": "failed", "last_error": error})
+        else:
+            changes.append({
+                "id": row_id, "status": "pending", "last_error": error,
+                "next_attempt_at": now + timedelta(seconds=retry_seconds * 2 ** (attempts - 1)),
+            })
+
+    if changes:
+        db.session.execute(update(NotificationOutbox), changes)
+    refresh_jobs({job_id for _, job_id, _, _, _ in claimed})
+    db.session.commit()
+
+
+def refresh_jobs(job_ids):
+    """Recount sent/failed per job and close the jobs with nothing left to send."""
+    if not job_ids:
+        return
+    counts = {}
+    for job_id, status, count in db.session.query(
+        NotificationOutbox.job_id, NotificationOutbox.status, func.count(NotificationOutbox.id)
+    ).filter(NotificationOutbox.job_id.in_(job_ids)).group_by(
+        NotificationOutbox.job_id, NotificationOutbox.status
+    ):
+        counts.setdefault(job_id, {})[status] = count
+
+    for job in NotificationJob.query.filter(NotificationJob.id.in_(job_ids)):
+        by_status = counts.get(job.id, {})
+        job.sent = by_status.get("sent", 0)
+        job.failed = by_status.get("failed", 0)
+        if not by_status.get("pending") and not by_status.get("sending"):
+            job.status = "completed"
+            job.finished_at = datetime.utcnow()
+
+
+def process_notification_queue(max_batches=None):
+    """
+    One worker pass: plan queued jobs, then drain due outbox rows batch by
+    batch until none are left (or `max_batches` were sent). Returns a small
+    summary for logs and the CLI.
+    """
+    batch_size = current_app.config.get("OUTBOX_BATCH_SIZE", 200)
+    stats = {"jobs_planned": plan_queued_jobs(), "sent": 0, "failed": 0, "batches": 0}
+
+    while max_batches is None or stats["batches"] < max_batches:
+        claimed = claim_due_messages(batch_size)
+        if not claimed:
+            break
+        outcomes = deliver(claimed)
+        record_outcomes(claimed, outcomes)
+
+        sent = sum(1 for ok in outcomes.values() if ok)
+        stats["sent"] += sent
+        stats["failed"] += len(claimed) - sent
+        stats["batches"] += 1
+
+    if stats["jobs_planned"] or stats["batches"]:
+        logger.info(f"📤 Notification outbox: {stats}")
+    return stats
+
+
+def run_outbox_with_context(app):
+    with app.app_context():
+        try:
+            process_notification_queue()
+        except Exception:
+            db.session.rollback()
+            logger.error("❌ Notification outbox pass failed", exc_info=True)
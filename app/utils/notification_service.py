@@ -1,5 +1,5 @@
 from app.utils.email_service import EmailService
-from app.utils.whatsapp_service import whatsapp_service
+from app.utils.whatsapp_service import whatsapp_service, whatsapp_dispatcher
 import os
 
 class NotificationService:
@@ -33,29 +33,84 @@ class NotificationService:
         if 'email' in methods and user.email:
             try:
                 # Use the email_service instance with send_email method
-                self.email_service.send_email(
-                    to_email=user.email,
-                    subject="Attendance Reminder",
-                    template_name="attendance_overdue",
-                    context=context
+                results['email_sent'] = self.email_service.send_email(
+                    **self._reminder_email(user, context)
                 )
-                results['email_sent'] = True
             except Exception as e:
                 results['email_error'] = str(e)
         
+        self._send_whatsapp(user, context, week, methods, results)
+        return results
+
+    def send_attendance_reminders(self, reminders, methods=['email', 'whatsapp']):
+        """
+        Batch version of send_attendance_reminder for a list of (user, week).
+        Emails go out over one pooled SMTP session and WhatsApp messages
+        through the rate-limited dispatcher; returns one results dict per
+        reminder, in order.
+        """
+        all_results = []
+        emails = []
+        email_slots = []
+        whatsapps = []
+        whatsapp_slots = []
+
+        for user, week in reminders:
+            results = {
+                'email_sent': False,
+                'whatsapp_sent': False,
+                'email_error': None,
+                'whatsapp_error': None
+            }
+            context = {
+                "name": user.name or user.email,
+                "week": week
+            }
+            if 'email' in methods and user.email:
+                emails.append(self._reminder_email(user, context))
+                email_slots.append(results)
+
+            if 'whatsapp' in methods and user.phone:
+                whatsapps.append((user.phone, context["name"], week))
+                whatsapp_slots.append(results)
+
+            all_results.append(results)
+
+        if emails:
+            for results, sent in zip(email_slots, self.email_service.send_many(emails)):
+                results['email_sent'] = sent
+                if not sent:
+                    results['email_error'] = "Email delivery failed"
+
+        if whatsapps:
+            for results, sent in zip(whatsapp_slots, whatsapp_dispatcher.send_attendance_reminders(whatsapps)):
+                results['whatsapp_sent'] = sent
+                if not sent:
+                    results['whatsapp_error'] = "WhatsApp delivery failed"
+
+        return all_results
+
+    @staticmethod
+    def _reminder_email(user, context):
+        return dict(
+            to_email=user.email,
+            subject="Attendance Reminder",
+            template_name="attendance_overdue",
+            context=context
+        )
+
+    @staticmethod
+    def _send_whatsapp(user, context, week, methods, results):
         # Send WhatsApp
         if 'whatsapp' in methods and user.phone:
             try:
-                whatsapp_service.send_attendance_reminder(
+                results['whatsapp_sent'] = whatsapp_service.send_attendance_reminder(
                     to_phone=user.phone,
                     name=context["name"],
                     week=week
                 )
-                results['whatsapp_sent'] = True
             except Exception as e:
                 results['whatsapp_error'] = str(e)
-        
-        return results
 
 # Global instance
 notification_service = NotificationService()
\ No newline at end of file
@@ -0,0 +1,132 @@
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+
+
+# --------------------------------------------------------
+# 🔑 NATURAL KEYS
+# --------------------------------------------------------
+
+def natural_key_expressions(model, natural_key):
+    """
+    Index expressions for a (column, null_value) key spec, matching the
+    unique indexes declared next to the models (ATTENDANCE_NATURAL_KEY, ...).
+
+    The NULL replacement is rendered inline: ON CONFLICT has to repeat the
+    index expressions verbatim, and a bound parameter wouldn't match.
+    """
+    return [
+        getattr(model, column) if null_value is None
+        else func.coalesce(getattr(model, column), literal_column(repr(null_value)))
+        for column, null_value in natural_key
+    ]
+
+
+def natural_key_value(values, natural_key):
+    """Hashable key of a value dict, with NULLs mapped like the index does."""
+    return tuple(
+        values.get(column) if values.get(column) is not None else null_value
+        for column, null_value in natural_key
+    )
+
+
+def natural_key_filter(model, values, natural_key):
+    """WHERE clause selecting the row a value dict would collide with."""
+    return [
+        expression == natural_key_value(values, natural_key)[i]
+        for i, expression in enumerate(natural_key_expressions(model, natural_key))
+    ]
+
+
+class NaturalKeyConflictError(ValueError):
+    """An update would give a row the natural key another row already has."""
+
+    def __init__(self, existing_id):
+        super().__init__(f"Another record (ID {existing_id}) already exists for this entity and period")
+        self.existing_id = existing_id
+
+
+def find_natural_key_conflict(model, obj, natural_key):
+    """
+    Id of another row holding `obj`'s (possibly just modified) natural key,
+    or None. Runs without autoflush, so the pending change itself can't hit
+    the unique index before it is checked.
+    """
+    values = {column: getattr(obj, column) for column, _ in natural_key}
+    with db.session.no_autoflush:
+        return db.session.query(model.id).filter(
+            *natural_key_filter(model, values, natural_key), model.id != obj.id
+        ).limit(1).scalar()
+
+
+def dedupe_by_natural_key(rows, natural_key):
+    """
+    Keep the last row per natural key. A single ON CONFLICT statement may not
+    touch the same row twice (PostgreSQL rejects it), and within one upload
+    the later line is the correction.
+    """
+    latest = {}
+    for values in rows:
+        latest[natural_key_value(values, natural_key)] = values
+    return list(latest.values())
+
+
+# --------------------------------------------------------
+# ⬆️ UPSERT
+# --------------------------------------------------------
+
+def _dialect_insert(bind):
+    dialect = bind.dialect
+    if dialect.name == "postgresql":
+        return postgresql.insert
+    # Native UPSERT arrived in SQLite 3.24
+    if dialect.name == "sqlite" and (dialect.server_version_info or (0,)) >= (3, 24):
+        return sqlite.insert
+    return None
+
+
+def upsert_rows(model, rows, natural_key, update_columns):
+    """
+    INSERT `rows` (value dicts), updating `update_columns` of rows that
+    already exist under the same natural key.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and SQLite, and a
+    select-then-write emulation elsewhere. Rows are deduplicated by key
+    first; the caller commits. Returns the number of rows written.
+    """
+    rows = dedupe_by_natural_key(rows, natural_key)
+    if not rows:
+        return 0
+
+    insert = _dialect_insert(db.session.get_bind(mapper=model.__mapper__))
+    if insert is None:
+        _emulated_upsert(model, rows, natural_key, update_columns)
+        return len(rows)
+
+    statement = insert(model)
+    statement = statement.on_conflict_do_update(
+        index_elements=natural_key_expressions(model, natural_key),
+        set_={column: statement.excluded[column] for column in update_columns},
+    )
+    db.session.execute(statement, rows)  # executemany
+    return len(rows)
+
+
+def _emulated_upsert(model, rows, natural_key, update_columns):
+    for values in rows:
+        existing = model.query.filter(*natural_key_filter(model, values, natural_key)).with_for_update().first()
+        if existing is None:
+            db.session.add(model(**values))
+        else:
+            for column in update_columns:
+                setattr(existing, column, values.get(column))
+    db.session.flush()
+
+
+def upsert_one(model, values, natural_key, update_columns):
+    """Upsert a single submission and return the stored ORM object."""
+    upsert_rows(model, [values], natural_key, update_columns)
+    return model.query.filter(
+        *natural_key_filter(model, values, natural_key)
+    ).execution_options(populate_existing=True).one()
@@ -1,6 +1,12 @@
 import requests
 import os
 import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from urllib3.exceptions import ConnectTimeoutError
 
 logger = logging.getLogger("whatsapp_service")
 logger.setLevel(logging.INFO)
@@ -10,10 +16,17 @@ file_handler.setLevel(logging.INFO)
 logger.addHandler(file_handler)
 
 class WhatsAppService:
+    # Transient statuses worth retrying (rate limited / Meta-side errors)
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
     def __init__(self):
         self.phone_number_id = os.getenv("WHATSAPP_PHONE_NUMBER_ID")
         self.token = os.getenv("WHATSAPP_TOKEN")
         self.api_version = os.getenv("WHATSAPP_API_VERSION", "v17.0")
+        self.api_url = os.getenv("WHATSAPP_API_URL", "https://graph.facebook.com")
+        self.max_retries = int(os.getenv("WHATSAPP_MAX_RETRIES", 3))
+        self.backoff_base = float(os.getenv("WHATSAPP_BACKOFF_BASE", 0.5))
+        self.max_retry_after = float(os.getenv("WHATSAPP_MAX_RETRY_AFTER", 30))  # Longest Retry-After we sleep
 
         if not self.phone_number_id or not self.token:
             raise ValueError(
@@ -22,10 +35,45 @@ class WhatsAppService:
             )
 
         self.base_url = (
-            f"https://graph.facebook.com/{self.api_version}/"
+            f"{self.api_url}/{self.api_version}/"
             f"{self.phone_number_id}/messages"
         )
 
+        # One keep-alive session for every call (sized for the dispatcher's workers)
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json"
+        })
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _retry_delay(self, attempt, response=None):
+        """
+        Retry-After when the API sends one (capped at WHATSAPP_MAX_RETRY_AFTER,
+        so a long rate-limit window can't park a worker), else exponential
+        backoff with jitter.
+        """
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.max_retry_after)
+        return self.backoff_base * (2 ** attempt) * (0.5 + random.random())
+
+    @staticmethod
+    def _never_sent(error):
+        """
+        True when the request failed before reaching the API (connect timeout,
+        refused connection, DNS failure), so sending it again can't deliver
+        the message twice. Read timeouts and dropped connections are not
+        retried: Meta may already have accepted the message.
+        """
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, ConnectTimeoutError)  # includes NewConnectionError
+
     def send_message(self, to_phone: str, message: str) -> bool:
         """
         Send WhatsApp text message using Meta WhatsApp Cloud API
@@ -33,11 +81,6 @@ class WhatsAppService:
         to_phone must be in E.164 format WITHOUT '+'.
         Example: 2348012345678
         """
-        headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json"
-        }
-
         payload = {
             "messaging_product": "whatsapp",
             "to": to_phone,
@@ -48,13 +91,28 @@ class WhatsAppService:
             }
         }
 
-        try:
-            response = requests.post(
-                self.base_url,
-                json=payload,
-                headers=headers,
-                timeout=15
-            )
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(
+                    self.base_url,
+                    json=payload,
+                    timeout=15
+                )
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if self._never_sent(error) and attempt < self.max_retries:
+                    time.sleep(self._retry_delay(attempt))
+                    continue
+                logger.error(
+                    f"WhatsApp request failed to {to_phone}",
+                    exc_info=True
+                )
+                return False
+            except requests.RequestException:
+                logger.error(
+                    f"WhatsApp request failed to {to_phone}",
+                    exc_info=True
+                )
+                return False
 
             if response.status_code in (200, 201):
                 data = response.json()
@@ -68,6 +126,15 @@ class WhatsAppService:
                 )
                 return True
 
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._retry_delay(attempt, response)
+                logger.warning(
+                    f"WhatsApp API status={response.status_code} to={to_phone}, "
+                    f"retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+                continue
+
             logger.error(
                 "WhatsApp API error "
                 f"status={response.status_code} "
@@ -75,15 +142,11 @@ class WhatsAppService:
             )
             return False
 
-        except requests.RequestException as e:
-            logger.error(
-                f"WhatsApp request failed to {to_phone}",
-                exc_info=True
-            )
-            return False
+        return False
 
-    def send_attendance_reminder(self, to_phone: str, name: str, week: int) -> bool:
-        message = (
+    @staticmethod
+    def attendance_reminder_text(name, week):
+        return (
             f"Hello {name},\n\n"
             "📊 *Attendance Reminder*\n\n"
             f"This is a reminder to submit your attendance for *week {week}*.\n\n"
@@ -91,9 +154,79 @@ class WhatsAppService:
             "Thank you."
         )
 
-        return self.send_message(to_phone, message)
+    def send_attendance_reminder(self, to_phone: str, name: str, week: int) -> bool:
+        return self.send_message(to_phone, self.attendance_reminder_text(name, week))
+
+
+# --------------------------------------------------------
+# 🚦 RATE-LIMITED DISPATCHER
+# --------------------------------------------------------
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class WhatsAppDispatcher:
+    """
+    Fan a batch of messages out over a bounded worker pool, throttled by a
+    token bucket to the sending number's Cloud API throughput (80 msg/s by
+    default; raise WHATSAPP_RATE_PER_SECOND if Meta upgraded the number).
+    Each send keeps WhatsAppService's own retry (429/5xx, unsent requests).
+    """
+
+    def __init__(self, service, workers=None, rate_per_second=None):
+        self.service = service
+        self.workers = workers or int(os.getenv("WHATSAPP_WORKERS", 16))
+        self.bucket = TokenBucket(rate_per_second or float(os.getenv("WHATSAPP_RATE_PER_SECOND", 80)))
+
+    def _send(self, to_phone, message):
+        self.bucket.acquire()
+        return self.service.send_message(to_phone, message)
+
+    def send_many(self, messages):
+        """
+        `messages` is an iterable of (to_phone, text). Returns one bool per
+        message, in order.
+        """
+        messages = list(messages)
+        if not messages:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(messages))) as pool:
+            results = list(pool.map(lambda item: self._send(*item), messages))
+
+        logger.info(f"WhatsApp batch: {sum(results)}/{len(results)} sent")
+        return results
+
+    def send_attendance_reminders(self, reminders):
+        """`reminders` is an iterable of (to_phone, name, week)."""
+        return self.send_many(
+            (to_phone, self.service.attendance_reminder_text(name, week))
+            for to_phone, name, week in reminders
+        )
+
 
 whatsapp_service = WhatsAppService()
+whatsapp_dispatcher = WhatsAppDispatcher(whatsapp_service)
 
 
 # import requests
@@ -0,0 +1,179 @@
+# benchmarks/common.py
+"""
+Shared helpers for the benchmark scripts in this folder.
+
+The scripts run against their own database (SQLite by default, or any
+SQLAlchemy URL passed with --database-url) and never touch the app's
+configured DATABASE_URL.
+"""
+import os
+import random
+import statistics
+import time
+
+# The app package builds its WhatsApp client at import time
+os.environ.setdefault("WHATSAPP_PHONE_NUMBER_ID", "benchmark")
+os.environ.setdefault("WHATSAPP_TOKEN", "benchmark")
+
+from flask import Flask
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models import State, Region, OldGroup, Group, District, Attendance, YouthAttendance
+
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+]
+SERVICE_TYPES = ["Sunday Worship Service", "Bible Study", "Revival"]
+
+
+def make_app(database_url):
+    """Minimal Flask app bound to the benchmark database (no scheduler, no routes)."""
+    app = Flask("benchmark")
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def reset_schema():
+    db.drop_all()
+    db.create_all()
+
+
+def seed_hierarchy(states=4, regions_per_state=5, old_groups_per_region=4,
+                   groups_per_old_group=4, districts_per_group=5):
+    """
+    Insert a synthetic State → Region → OldGroup → Group → District tree.
+    Returns a dict of id lists per level plus the district rows as tuples
+    (id, state_id, region_id, old_group_id, group_id).
+    """
+    rows = {"states": [], "regions": [], "old_groups": [], "groups": [], "districts": []}
+    ids = {"state": 0, "region": 0, "old_group": 0, "group": 0, "district": 0}
+
+    def next_id(level):
+        ids[level] += 1
+        return ids[level]
+
+    for _ in range(states):
+        state_id = next_id("state")
+        rows["states"].append({"id": state_id, "name": f"State {state_id}", "code": f"S{state_id}"})
+        for _ in range(regions_per_state):
+            region_id = next_id("region")
+            rows["regions"].append({"id": region_id, "name": f"Region {region_id}", "code": f"R{region_id}",
+                                    "state_id": state_id})
+            for _ in range(old_groups_per_region):
+                old_group_id = next_id("old_group")
+                rows["old_groups"].append({"id": old_group_id, "name": f"Old Group {old_group_id}",
+                                           "code": f"OG{old_group_id}", "state_id": state_id,
+                                           "region_id": region_id,
+                                           "leader_email": f"og{old_group_id}@example.com"})
+                for _ in range(groups_per_old_group):
+                    group_id = next_id("group")
+                    rows["groups"].append({"id": group_id, "name": f"Group {group_id}", "code": f"G{group_id}",
+                                           "state_id": state_id, "region_id": region_id,
+                                           "old_group_id": old_group_id,
+                                           "leader_email": f"g{group_id}@example.com"})
+                    for _ in range(districts_per_group):
+                        district_id = next_id("district")
+                        rows["districts"].append({"id": district_id, "name": f"District {district_id}",
+                                                  "code": f"D{district_id}", "state_id": state_id,
+                                                  "region_id": region_id, "old_group_id": old_group_id,
+                                                  "group_id": group_id,
+                                                  "leader_email": f"d{district_id}@example.com"})
+
+    for model, key in ((State, "states"), (Region, "regions"), (OldGroup, "old_groups"),
+                       (Group, "groups"), (District, "districts")):
+        db.session.execute(insert(model), rows[key])
+    db.session.commit()
+
+    return {
+        "state_ids": [r["id"] for r in rows["states"]],
+        "region_ids": [r["id"] for r in rows["regions"]],
+        "old_group_ids": [r["id"] for r in rows["old_groups"]],
+        "group_ids": [r["id"] for r in rows["groups"]],
+        "district_ids": [r["id"] for r in rows["districts"]],
+        "districts": [(r["id"], r["state_id"], r["region_id"], r["old_group_id"], r["group_id"])
+                      for r in rows["districts"]],
+    }
+
+
+def seed_attendance(hierarchy, rows, years=(2024, 2025, 2026), chunk_size=20000, seed=42):
+    """
+    Insert `rows` synthetic attendance records spread across the hierarchy and
+    periods, at most one per district/period/service (the natural key).
+    """
+    rng = random.Random(seed)
+    districts = hierarchy["districts"]
+    seen = set()
+    inserted = 0
+    while inserted < rows:
+        batch = []
+        while len(batch) < min(chunk_size, rows - inserted):
+            district_id, state_id, region_id, old_group_id, group_id = rng.choice(districts)
+            key = (district_id, rng.choice(years), rng.choice(MONTHS), rng.randint(1, 5), rng.choice(SERVICE_TYPES))
+            if key in seen:
+                continue
+            seen.add(key)
+            batch.append({
+                "service_type": key[4],
+                "state_id": state_id, "region_id": region_id, "old_group_id": old_group_id,
+                "group_id": group_id, "district_id": district_id,
+                "year": key[1], "month": key[2], "week": key[3],
+                "men": rng.randint(0, 80), "women": rng.randint(0, 80),
+                "youth_boys": rng.randint(0, 30), "youth_girls": rng.randint(0, 30),
+                "children_boys": rng.randint(0, 30), "children_girls": rng.randint(0, 30),
+                "new_comers": rng.randint(0, 5), "tithe_offering": rng.randint(0, 50000),
+            })
+        db.session.execute(insert(Attendance), batch)
+        db.session.commit()
+        inserted += len(batch)
+    return inserted
+
+
+def seed_youth_attendance(hierarchy, rows, years=(2024, 2025, 2026), chunk_size=20000, seed=7):
+    """Insert `rows` synthetic weekly youth attendance records, one per district and week."""
+    rng = random.Random(seed)
+    districts = hierarchy["districts"]
+    seen = set()
+    inserted = 0
+    while inserted < rows:
+        batch = []
+        while len(batch) < min(chunk_size, rows - inserted):
+            district_id, state_id, region_id, old_group_id, group_id = rng.choice(districts)
+            key = (district_id, rng.choice(years), rng.choice(MONTHS), rng.randint(1, 5))
+            if key in seen:
+                continue
+            seen.add(key)
+            batch.append({
+                "attendance_type": "weekly",
+                "state_id": state_id, "region_id": region_id, "old_group_id": old_group_id,
+                "group_id": group_id, "district_id": district_id,
+                "year": key[1], "month": key[2], "week": key[3],
+                "member_boys": rng.randint(0, 30), "member_girls": rng.randint(0, 30),
+                "visitor_boys": rng.randint(0, 10), "visitor_girls": rng.randint(0, 10),
+            })
+        db.session.execute(insert(YouthAttendance), batch)
+        db.session.commit()
+        inserted += len(batch)
+    return inserted
+
+
+def time_call(fn, repeat=5):
+    """Run fn `repeat` times and return the median wall time in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    line = "  ".join(str(h).ljust(w) for h, w in zip(headers, widths))
+    print(line)
+    print("-" * len(line))
+    for r in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(r, widths)))
@@ -0,0 +1,65 @@
+# benchmarks/email_templates.py
+"""
+Rendering cost of a reminder batch: the previous EmailService._load_template
+(read the file from a cwd-relative path and str.replace every context key,
+once per recipient) against the compiled templates, both one render() per
+recipient and one render_many() for the batch. The compiled paths also
+build the plain-text alternative.
+
+No database or SMTP server is involved.
+
+Usage (from the repository root):
+    python -m benchmarks.email_templates --recipients 5000
+"""
+import argparse
+from pathlib import Path
+
+from benchmarks.common import print_table, time_call
+
+from app.utils.email_templates import EmailTemplates
+
+
+def legacy_load_template(template_name, context):
+    """The previous EmailService._load_template, verbatim."""
+    template_path = Path(f"app/email_templates/{template_name}.html")
+
+    if not template_path.exists():
+        raise FileNotFoundError(f"Email template '{template_name}' not found.")
+
+    content = template_path.read_text()
+
+    for key, value in context.items():
+        content = content.replace(f"{{{{{key}}}}}", str(value))
+
+    return content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipients", type=int, default=5000)
+    parser.add_argument("--template", default="attendance_overdue")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    contexts = [{"name": f"Leader {i}", "week": "3, 4"} for i in range(args.recipients)]
+    templates = EmailTemplates(auto_reload=False)
+    templates.render(args.template, contexts[0])  # compile outside the timings
+
+    timings = [
+        ("read + str.replace per recipient (before)",
+         time_call(lambda: [legacy_load_template(args.template, c) for c in contexts], args.repeat)),
+        ("render() per recipient",
+         time_call(lambda: [templates.render(args.template, c) for c in contexts], args.repeat)),
+        ("render_many()",
+         time_call(lambda: templates.render_many(args.template, contexts), args.repeat)),
+    ]
+
+    print(f"{args.recipients} recipients of '{args.template}', median of {args.repeat}")
+    print_table(
+        ["renderer", "total (ms)", "per message (µs)"],
+        [(name, f"{ms:.1f}", f"{ms * 1000 / args.recipients:.1f}") for name, ms in timings],
+    )
+
+
+if __name__ == "__main__":
+    main()
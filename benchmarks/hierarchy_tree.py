@@ -0,0 +1,100 @@
+# benchmarks/hierarchy_tree.py
+"""
+Filling the cascading hierarchy dropdowns: the by_* cascade
+(/regions/by_state → /oldgroups/by_region → /groups/by_oldgroup →
+/districts/by_group) against one GET /hierarchy/tree.
+
+Requests go through the Flask test client, so the timings are server time
+plus in-process dispatch. --rtt-ms adds a network round-trip per request to
+the "with rtt" column (the cascade's requests are sequential: each needs
+the previous answer).
+
+Usage (from the repository root):
+    python -m benchmarks.hierarchy_tree --states 6 --rtt-ms 80
+"""
+import argparse
+import os
+import tempfile
+
+from flask_jwt_extended import create_access_token
+
+from benchmarks.common import make_app, reset_schema, seed_hierarchy, time_call, print_table
+from app.extensions import jwt, CustomJSONProvider
+from app.routes.hierarchy_routes import hierarchy_bp
+from app.utils.access_control import CLAIMS_VERSION
+from app.utils.hierarchy_cache import hierarchy_cache
+
+
+def get(client, path, headers=None):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200, (path, response.status_code)
+    return response.get_json()
+
+
+def cascade(client, state_ids, full):
+    """Walk the by_* endpoints; `full` expands every node, else the first branch only."""
+    requests = 0
+    frontier = [("/hierarchy/regions/by_state/{}", state_ids[:len(state_ids) if full else 1])]
+    next_paths = [
+        "/hierarchy/oldgroups/by_region/{}",
+        "/hierarchy/groups/by_oldgroup/{}",
+        "/hierarchy/districts/by_group/{}",
+        None,
+    ]
+    for next_path in next_paths:
+        path, parent_ids = frontier.pop()
+        child_ids = []
+        for parent_id in parent_ids:
+            child_ids.extend(item["id"] for item in get(client, path.format(parent_id)))
+            requests += 1
+        if next_path:
+            frontier.append((next_path, child_ids if full else child_ids[:1]))
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None,
+                        help="SQLAlchemy URL (default: a SQLite file in the temp directory)")
+    parser.add_argument("--states", type=int, default=6)
+    parser.add_argument("--rtt-ms", type=float, default=50.0, help="network round-trip added per request")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    database_url = args.database_url or "sqlite:///" + os.path.join(tempfile.gettempdir(), "benchmark_hierarchy_tree.db")
+    app = make_app(database_url)
+    app.json = CustomJSONProvider(app)
+    app.config["JWT_SECRET_KEY"] = "benchmark-secret-key-of-sufficient-length"
+    jwt.init_app(app)
+    app.register_blueprint(hierarchy_bp, url_prefix="/hierarchy")
+
+    with app.app_context():
+        reset_schema()
+        hierarchy = seed_hierarchy(states=args.states)
+        hierarchy_cache.invalidate()
+        claims = {"roles": ["Super Admin"], "claims_v": CLAIMS_VERSION}
+        headers = {"Authorization": "Bearer " + create_access_token(identity="1", additional_claims=claims)}
+
+    client = app.test_client()
+    state_ids = hierarchy["state_ids"]
+
+    counts = {
+        "branch": cascade(client, state_ids, full=False),
+        "full": cascade(client, state_ids, full=True),
+    }
+    rows = []
+    for name, requests, fn in [
+        ("by_* cascade, one branch (before)", counts["branch"], lambda: cascade(client, state_ids, full=False)),
+        ("by_* cascade, whole tree (before)", counts["full"], lambda: cascade(client, state_ids, full=True)),
+        ("GET /hierarchy/tree", 1, lambda: get(client, "/hierarchy/tree", headers)),
+        ("GET /hierarchy/tree?depth=2", 1, lambda: get(client, "/hierarchy/tree?depth=2", headers)),
+    ]:
+        ms = time_call(fn, args.repeat)
+        rows.append((name, requests, f"{ms:.1f}", f"{ms + requests * args.rtt_ms:.0f}"))
+
+    print(f"{len(hierarchy['district_ids'])} districts in {args.states} states, median of {args.repeat}")
+    print_table(["client", "requests", "server (ms)", f"with {args.rtt_ms:g}ms rtt"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/response_compression.py
+"""
+CPU cost against bytes saved when compressing large JSON responses, for
+payloads shaped like the ones mobile clients pull on national scopes:
+an attendance listing (with names), the /dashboard/hierarchy lists and
+the /hierarchy/tree. Encodings are those of app.utils.compression (br is
+included when the optional `brotli` package is installed).
+
+"transfer" is the time the body needs on a --link-kbps connection, so
+compress + transfer can be compared with sending the identity encoding.
+
+Usage (from the repository root):
+    python -m benchmarks.response_compression --attendance 20000 --link-kbps 1000
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.common import make_app, reset_schema, seed_hierarchy, seed_attendance, time_call, print_table
+from app.extensions import db
+from app.models import Attendance, Region, District
+from app.utils.attendance_serializer import serialize_attendance
+from app.utils.compression import available_encodings, compress
+from app.utils.hierarchy_cache import hierarchy_cache
+
+
+def payloads(attendance_rows):
+    attendance = Attendance.query.order_by(Attendance.id).limit(attendance_rows).all()
+    snapshot = hierarchy_cache.get()
+    return {
+        "attendance listing": serialize_attendance(attendance, include_names=True),
+        "/dashboard/hierarchy": {
+            "regions": [r.to_dict() for r in Region.query.all()],
+            "districts": [d.to_dict() for d in District.query.all()],
+        },
+        "/hierarchy/tree": {"states": snapshot.tree("state", snapshot.ids("state"))},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None,
+                        help="SQLAlchemy URL (default: a SQLite file in the temp directory)")
+    parser.add_argument("--attendance", type=int, default=20000, help="rows in the attendance listing")
+    parser.add_argument("--link-kbps", type=float, default=1000.0, help="client bandwidth for the transfer column")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    database_url = args.database_url or "sqlite:///" + os.path.join(tempfile.gettempdir(), "benchmark_compression.db")
+    app = make_app(database_url)
+
+    settings = [("identity", None)]
+    for encoding in available_encodings():
+        if encoding == "br":
+            settings += [(f"br q{q}", {"COMPRESSION_BROTLI_QUALITY": q}) for q in (1, 4, 11)]
+        else:
+            settings += [(f"gzip {level}", {"COMPRESSION_GZIP_LEVEL": level}) for level in (1, 6, 9)]
+
+    with app.app_context():
+        reset_schema()
+        hierarchy = seed_hierarchy(states=12, regions_per_state=6, old_groups_per_region=5,
+                                   groups_per_old_group=4, districts_per_group=6)
+        seed_attendance(hierarchy, args.attendance)
+        bodies = {name: json.dumps(payload).encode() for name, payload in payloads(args.attendance).items()}
+
+    rows = []
+    for name, body in bodies.items():
+        for label, config in settings:
+            if config is None:
+                ms, size = 0.0, len(body)
+            else:
+                encoding = label.split()[0]
+                ms = time_call(lambda: compress(body, encoding, config), args.repeat)
+                size = len(compress(body, encoding, config))
+            transfer_ms = size * 8 / args.link_kbps
+            rows.append((name, label, f"{size / 1024:,.0f}", f"{len(body) / size:.1f}x",
+                         f"{ms:.1f}", f"{transfer_ms:,.0f}", f"{ms + transfer_ms:,.0f}"))
+
+    print(f"link {args.link_kbps:g} kbps; encodings available: {', '.join(available_encodings())}")
+    print_table(["payload", "encoding", "KiB", "ratio", "compress (ms)", "transfer (ms)", "total (ms)"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/scope_predicates.py
+"""
+Per-request overhead of hierarchy access scoping: the old string-matching
+restrict_by_access (renders the query SQL to guess the model) against the
+compiled scope-predicate engine in app.utils.access_control.
+
+Only query construction is timed; nothing is executed against the database.
+One simulated "request" scopes all five hierarchy lists, the way
+/hierarchy/test-all-roles and the dashboard do.
+
+Usage (from the repository root):
+    python -m benchmarks.scope_predicates --requests 2000
+"""
+import argparse
+
+from flask import g
+
+from benchmarks.common import make_app, time_call, print_table
+from app.models import State, Region, OldGroup, Group, District, User
+from app.models.user import Role
+from app.utils.access_control import restrict_by_access
+
+MODELS = (State, Region, OldGroup, Group, District)
+
+
+def legacy_restrict_by_access(query, user):
+    """
+    The previous hierarchy_routes implementation, minus the debug prints and
+    with its always-true admin check fixed so the string matching actually runs.
+    """
+    if not user or not user.roles:
+        return query.filter_by(id=None)
+
+    role_names = [r.name.lower() for r in user.roles]
+    query_str = str(query).lower()
+
+    if "super admin" in role_names:
+        return query
+
+    if "state admin" in role_names and user.state_id:
+        if "from groups" in query_str:
+            return query.filter(Group.state_id == user.state_id)
+        elif "from districts" in query_str:
+            return query.filter(District.state_id == user.state_id)
+        elif "from regions" in query_str:
+            return query.filter(Region.state_id == user.state_id)
+        elif "from old_groups" in query_str:
+            return query.filter(OldGroup.state_id == user.state_id)
+        elif "from states" in query_str:
+            return query.filter(State.id == user.state_id)
+
+    elif "region admin" in role_names and user.region_id:
+        if "from groups" in query_str:
+            return query.filter(Group.region_id == user.region_id)
+        elif "from districts" in query_str:
+            return query.filter(District.region_id == user.region_id)
+        elif "from old_groups" in query_str:
+            return query.filter(OldGroup.region_id == user.region_id)
+        elif "from regions" in query_str:
+            return query.filter(Region.id == user.region_id)
+
+    elif "group admin" in role_names and user.group_id:
+        if "from groups" in query_str:
+            return query.filter(Group.id == user.group_id)
+        elif "from districts" in query_str:
+            return query.filter(District.group_id == user.group_id)
+
+    return query.filter_by(id=None)
+
+
+def make_users():
+    """Transient users, one per role; ids are set so per-request caching applies."""
+    def user(uid, role, **scope):
+        u = User(id=uid, email=f"{uid}@bench", name=role, **scope)
+        u.roles.append(Role(name=role))
+        return u
+
+    return [
+        user(1, "Super Admin"),
+        user(2, "State Admin", state_id=1),
+        user(3, "Region Admin", state_id=1, region_id=2),
+        user(4, "Group Admin", state_id=1, region_id=2, group_id=3),
+    ]
+
+
+def simulate_requests(app, restrict, user, requests):
+    """Scope every hierarchy list `requests` times, each in a fresh request context."""
+    def run():
+        for _ in range(requests):
+            with app.test_request_context():
+                for model in MODELS:
+                    restrict(model.query, user)
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="simulated requests per measurement")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app("sqlite://")
+    with app.app_context():
+        rows = []
+        for user in make_users():
+            role = user.roles[0].name
+            before = time_call(simulate_requests(app, legacy_restrict_by_access, user, args.requests), args.repeat)
+            after = time_call(simulate_requests(app, restrict_by_access, user, args.requests), args.repeat)
+            per_before = before * 1000 / args.requests
+            per_after = after * 1000 / args.requests
+            rows.append((role, f"{per_before:.1f}", f"{per_after:.1f}",
+                         f"{per_before / per_after:.1f}x" if per_after else "-"))
+
+        print(f"{args.requests:,} requests x {len(MODELS)} scoped queries each")
+        print_table(["role", "before (us/request)", "after (us/request)", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# benchmarks/smtp_pool.py
+"""
+Messages/sec for reminder emails: a new SMTP connection + login per message
+(the previous EmailService.send_email) against the pooled transport, both
+through send_email and the batched send_many.
+
+Runs against a local SMTP stand-in started in-process, so no mail leaves
+the machine. --rtt-ms adds a delay before every server reply and
+--handshake-ms one on connect (what TLS costs a real server); with both at
+zero only the protocol overhead is measured. To point it at another
+stand-in instead (e.g. `python -m aiosmtpd -n -l localhost:8025`), pass
+--server/--port.
+
+Usage (from the repository root):
+    python -m benchmarks.smtp_pool --messages 500 --rtt-ms 5 --handshake-ms 40
+"""
+import argparse
+import base64
+import smtplib
+import socketserver
+import threading
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from benchmarks.common import print_table
+from benchmarks.email_templates import legacy_load_template
+from flask import Flask
+
+from app.utils.email_service import EmailService, get_transport
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough ESMTP (EHLO, AUTH, MAIL, RCPT, DATA, NOOP, RSET, QUIT) to accept and drop mail."""
+
+    def reply(self, line):
+        if self.server.rtt:
+            time.sleep(self.server.rtt)
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        if self.server.handshake:
+            time.sleep(self.server.handshake)
+        self.reply("220 sink ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+
+            if command.startswith(("EHLO", "HELO")):
+                self.wfile.write(b"250-sink\r\n250-AUTH PLAIN LOGIN\r\n")
+                self.reply("250 8BITMIME")
+            elif command.startswith("AUTH"):
+                self.reply("235 Authentication successful")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.server.received += 1
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:  # MAIL, RCPT, NOOP, RSET
+                self.reply("250 OK")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port, rtt, handshake):
+        super().__init__(("127.0.0.1", port), SMTPSinkHandler)
+        self.rtt = rtt
+        self.handshake = handshake
+        self.received = 0
+
+
+def legacy_send_email(config, to_email, message):
+    """The previous send_email transport: connect, (STARTTLS), login, send, quit."""
+    with smtplib.SMTP(config["SMTP_SERVER"], config["SMTP_PORT"]) as server:
+        if config["SMTP_USE_TLS"]:
+            server.starttls()
+        server.login(config["EMAIL_USER"], config["EMAIL_PASSWORD"])
+        server.sendmail(config["EMAIL_USER"], to_email, message)
+
+
+def build_batch(count):
+    return [
+        dict(to_email=f"leader{i}@example.com", subject="Attendance Reminder",
+             template_name="attendance_overdue", context={"name": f"Leader {i}", "week": 3})
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="simulated delay before each server reply")
+    parser.add_argument("--handshake-ms", type=float, default=0.0, help="simulated TLS cost per new connection")
+    parser.add_argument("--server", default=None, help="use an external stand-in instead of the built-in sink")
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    sink = None
+    if args.server is None:
+        sink = SMTPSink(args.port, args.rtt_ms / 1000, args.handshake_ms / 1000)
+        threading.Thread(target=sink.serve_forever, daemon=True).start()
+
+    app = Flask("benchmark")
+    app.config.update(
+        SMTP_SERVER=args.server or "127.0.0.1", SMTP_PORT=args.port, SMTP_USE_TLS=False,
+        EMAIL_USER="bench@example.com", EMAIL_PASSWORD="secret", SMTP_POOL_SIZE=4, SMTP_TIMEOUT=10,
+    )
+
+    service = EmailService()
+    batch = build_batch(args.messages)
+
+    with app.app_context():
+        rows = []
+
+        def run(name, fn):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            rows.append((name, f"{elapsed * 1000:.0f}", f"{args.messages / elapsed:.0f}"))
+
+        def legacy():
+            for item in batch:
+                msg = MIMEMultipart("alternative")
+                msg["Subject"] = item["subject"]
+                msg["From"] = app.config["EMAIL_USER"]
+                msg["To"] = item["to_email"]
+                msg.attach(MIMEText(legacy_load_template(item["template_name"], item["context"]), "html"))
+                legacy_send_email(app.config, item["to_email"], msg.as_string())
+
+        def pooled():
+            for item in batch:
+                service.send_email(**item)
+
+        def batched():
+            results = service.send_many(batch)
+            assert all(results), f"{results.count(False)} messages failed"
+
+        run("connection per message (before)", legacy)
+        run("pooled send_email", pooled)
+        run("send_many", batched)
+        get_transport(app.config).close()
+
+    print(f"{args.messages} messages, rtt {args.rtt_ms}ms, handshake {args.handshake_ms}ms")
+    print_table(["transport", "total (ms)", "messages/sec"], rows)
+    if sink is not None:
+        print(f"sink received {sink.received} messages")
+        sink.shutdown()
+
+
+if __name__ == "__main__":
+    main()
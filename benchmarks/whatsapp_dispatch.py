@@ -0,0 +1,137 @@
+# benchmarks/whatsapp_dispatch.py
+"""
+WhatsApp reminders to N leaders: one blocking requests.post per recipient
+(the previous send_message) against WhatsAppDispatcher (keep-alive session,
+worker pool, token bucket, 429/5xx retry).
+
+A local HTTP stub stands in for the Cloud API. It answers after
+--latency-ms and rejects --error-rate of requests with 429 (Retry-After: 0)
+or 503, so the retry path is exercised too. Nothing is sent to Meta.
+
+Usage (from the repository root):
+    python -m benchmarks.whatsapp_dispatch --leaders 2000 --latency-ms 150
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import benchmarks.common  # noqa: F401  (WhatsApp env defaults)
+import requests
+
+from benchmarks.common import print_table
+
+
+class CloudAPIStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like graph.facebook.com
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.latency)
+
+        with self.server.lock:
+            self.server.requests += 1
+            roll = self.server.rng.random()
+
+        if roll < self.server.error_rate / 2:
+            self.respond(429, {"error": {"message": "rate limited"}}, {"Retry-After": "0"})
+        elif roll < self.server.error_rate:
+            self.respond(503, {"error": {"message": "unavailable"}})
+        else:
+            to = json.loads(body)["to"]
+            with self.server.lock:
+                self.server.delivered.add(to)
+            self.respond(200, {"messages": [{"id": f"wamid.{to}"}]})
+
+    def respond(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_stub(port, latency, error_rate):
+    server = ThreadingHTTPServer(("127.0.0.1", port), CloudAPIStub)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_rate = error_rate
+    server.rng = random.Random(3)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.delivered = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def legacy_send(service, to_phone, message):
+    """The previous send_message: a fresh connection per call, no retry."""
+    response = requests.post(
+        service.base_url,
+        json={"messaging_product": "whatsapp", "to": to_phone, "type": "text",
+              "text": {"preview_url": False, "body": message}},
+        headers={"Authorization": f"Bearer {service.token}", "Content-Type": "application/json"},
+        timeout=15,
+    )
+    return response.status_code in (200, 201)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leaders", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="stub response time per request")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="share of 429/503 responses")
+    parser.add_argument("--rate", type=float, default=80.0, help="token bucket messages/sec")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--legacy-sample", type=int, default=100,
+                        help="recipients to time sequentially (extrapolated to --leaders)")
+    parser.add_argument("--port", type=int, default=8090)
+    args = parser.parse_args()
+
+    stub = start_stub(args.port, args.latency_ms / 1000, args.error_rate)
+    os.environ["WHATSAPP_API_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ["WHATSAPP_BACKOFF_BASE"] = "0.05"
+
+    from app.utils.whatsapp_service import WhatsAppService, WhatsAppDispatcher
+
+    service = WhatsAppService()
+    messages = [(f"23480{i:08d}", WhatsAppService.attendance_reminder_text(f"Leader {i}", 3))
+                for i in range(args.leaders)]
+
+    sample = messages[:args.legacy_sample]
+    start = time.perf_counter()
+    legacy_ok = sum(legacy_send(service, phone, text) for phone, text in sample)
+    legacy_elapsed = (time.perf_counter() - start) * len(messages) / len(sample)
+
+    stub.delivered.clear()
+    dispatcher = WhatsAppDispatcher(service, workers=args.workers, rate_per_second=args.rate)
+    start = time.perf_counter()
+    results = dispatcher.send_many(messages)
+    dispatch_elapsed = time.perf_counter() - start
+
+    print(f"{args.leaders} leaders, stub latency {args.latency_ms}ms, error rate {args.error_rate:.0%}, "
+          f"bucket {args.rate}/s, {args.workers} workers")
+    print_table(
+        ["sender", "total (s)", "messages/sec", "delivered"],
+        [
+            ("sequential requests.post (before, extrapolated)", f"{legacy_elapsed:.1f}",
+             f"{len(messages) / legacy_elapsed:.1f}", f"{legacy_ok}/{len(sample)} (no retry)"),
+            ("WhatsAppDispatcher", f"{dispatch_elapsed:.1f}",
+             f"{len(messages) / dispatch_elapsed:.1f}", f"{sum(results)}/{len(results)}"),
+        ],
+    )
+    print(f"stub saw {stub.requests} requests, {len(stub.delivered)} distinct recipients delivered by the dispatcher")
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
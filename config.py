@@ -31,6 +31,43 @@ class Config:
     EMAIL_USER = os.environ.get("EMAIL_USER")
     EMAIL_PASSWORD = os.environ.get("EMAIL_PASSWORD")
     SUPPORT_EMAIL = os.environ.get("SUPPORT_EMAIL")
+    SMTP_USE_TLS = os.environ.get("SMTP_USE_TLS", "true").lower() == "true"
+    SMTP_POOL_SIZE = int(os.environ.get("SMTP_POOL_SIZE", 4))     # Authenticated sessions kept open
+    SMTP_TIMEOUT = int(os.environ.get("SMTP_TIMEOUT", 30))
+
+    # Week-of-month rule: "day" (days 1-7 = week 1, ...) or a weekday name such as "sunday"
+    CHURCH_WEEK_START = os.environ.get("CHURCH_WEEK_START", "day")
+
+    # Background scheduler: one leader across all workers (app/tasks/leader.py)
+    SCHEDULER_ENABLED = os.environ.get("SCHEDULER_ENABLED", "true").lower() == "true"
+    SCHEDULER_LEASE_SECONDS = int(os.environ.get("SCHEDULER_LEASE_SECONDS", 60))        # Failover time if the leader dies
+    SCHEDULER_HEARTBEAT_SECONDS = int(os.environ.get("SCHEDULER_HEARTBEAT_SECONDS", 15))
+
+    # Reminder outbox worker (app/utils/notification_outbox.py)
+    OUTBOX_POLL_SECONDS = int(os.environ.get("OUTBOX_POLL_SECONDS", 15))
+    OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 200))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 5))
+    OUTBOX_RETRY_SECONDS = int(os.environ.get("OUTBOX_RETRY_SECONDS", 60))   # Doubled after every failed attempt
+    OUTBOX_LEASE_SECONDS = int(os.environ.get("OUTBOX_LEASE_SECONDS", 600))  # A crashed worker's claim expires after this
+
+    # Admin background jobs (app/utils/job_runner.py)
+    JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))                  # Threads per process running imports
+    JOB_STALE_SECONDS = int(os.environ.get("JOB_STALE_SECONDS", 3600))   # A running job silent this long is marked failed
+
+    # Hierarchy list ETags (app/utils/hierarchy_cache.py)
+    HIERARCHY_CACHE_MAX_AGE = int(os.environ.get("HIERARCHY_CACHE_MAX_AGE", 0))  # Seconds browsers may reuse a list unchecked
+
+    # Dashboard summary (app/controllers/dashboard_controller.py)
+    DASHBOARD_CACHE_SECONDS = int(os.environ.get("DASHBOARD_CACHE_SECONDS", 30))  # Per-scope result cache (figures lag writes up to this); 0 disables
+
+    # Response compression (app/utils/compression.py); br needs the optional `brotli` package
+    COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))              # Smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", 4))     # 11 is far too slow per request
+
+    # Email templates (app/utils/email_templates.py)
+    EMAIL_TEMPLATES_AUTO_RELOAD = os.environ.get("EMAIL_TEMPLATES_AUTO_RELOAD", "false").lower() == "true"  # Recompile edited templates (dev)
 
     WHATSAPP_PHONE_NUMBER_ID = os.getenv('WHATSAPP_PHONE_NUMBER_ID', '808921198974802')
     WHATSAPP_TOKEN = os.getenv('WHATSAPP_TOKEN')
@@ -52,189 +52,66 @@ def fix_duplicate_abuja_group():
         return False
 
 
-def import_districts_by_group_name(csv_file='districts_with_group_ids.csv'):
+def import_districts_by_group_name(csv_file='districts_with_group_ids.csv', dry_run=False):
     """
     Import districts using group NAMES instead of IDs
+    (thin wrapper around app.utils.district_import; also `flask import-districts`)
     """
     print("🚀 Importing Districts by Group Name")
     print("====================================")
     
-    # Check if file exists
     if not os.path.exists(csv_file):
         print(f"❌ File not found: {csv_file}")
-        print("Looking for file in current directory...")
-        files = [f for f in os.listdir('.') if f.endswith('.csv')]
-        if files:
-            print(f"Found CSV files: {files}")
-            csv_file = files[0]  # Use first CSV file
-            print(f"Using: {csv_file}")
-        else:
-            print("❌ No CSV files found in current directory")
-            return False
+        return False
     
     print(f"📁 Using file: {csv_file}")
     
     try:
         # Import your Flask app components
         from app import create_app, db
-        from app.models import District, Group, OldGroup
+        from app.utils.district_import import import_districts_by_group_name as run_import
         
         # Create app context
         app = create_app()
         
         with app.app_context():
-            # Read the CSV file
-            df = pd.read_csv(csv_file)
-            print(f"Loaded CSV: {len(df)} rows, {len(df.columns)} columns")
-            print(f"Columns: {list(df.columns)}")
-            
-            # Check required columns - we only need district_name and group_name now
-            required_columns = ['district_name', 'group_name']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                print(f"❌ Missing required columns: {missing_columns}")
-                print("Available columns:", list(df.columns))
-                return False
-            
-            # Show preview
-            print(f"\n📋 First 5 rows of CSV:")
-            print(df.head().to_string())
-            
-            # Filter out empty rows
-            initial_count = len(df)
-            df = df[df['district_name'].notna() & (df['district_name'] != '')]
-            df = df[df['group_name'].notna() & (df['group_name'] != '')]
-            filtered_count = len(df)
-            
-            print(f"\n🔍 Found {filtered_count} valid districts (from {initial_count} total rows)")
-            
-            # Group districts by group for reporting
-            districts_by_group = df.groupby(['group_name']).size().reset_index()
-            districts_by_group.columns = ['group_name', 'district_count']
-            
-            print(f"\n📊 Districts by Group (first 10):")
-            print(districts_by_group.head(10).to_string(index=False))
-            
-            # Get unique group names from CSV
-            unique_groups_csv = df['group_name'].unique()
-            print(f"\n📋 Found {len(unique_groups_csv)} unique groups in CSV")
-            
-            # Check which groups exist in database
-            groups_in_db = Group.query.filter(Group.name.in_(unique_groups_csv)).all()
-            group_names_in_db = {group.name: group for group in groups_in_db}
-            
-            print(f"✅ Found {len(groups_in_db)}/{len(unique_groups_csv)} groups in database")
-            
-            # Check for missing groups
-            missing_groups = set(unique_groups_csv) - set(group_names_in_db.keys())
-            if missing_groups:
-                print(f"\n⚠️  WARNING: {len(missing_groups)} groups not found in database:")
-                for group_name in list(missing_groups)[:10]:  # Show first 10
-                    print(f"   - {group_name}")
-                if len(missing_groups) > 10:
-                    print(f"   ... and {len(missing_groups) - 10} more")
-            
-            # Ask for confirmation
-            total_districts = filtered_count
-            confirm = input(f"\nReady to import {total_districts} districts? (yes/no): ").strip().lower()
-            
-            if confirm != 'yes':
-                print("Import cancelled.")
-                return False
-            
-            imported_count = 0
-            skipped_count = 0
-            errors = []
-            
-            print(f"\n⏳ Importing {total_districts} districts...")
-            
-            # Process each district
-            for index, row in df.iterrows():
-                try:
-                    group_name = str(row['group_name']).strip()
-                    district_name = str(row['district_name']).strip()
-                    
-                    if not district_name or not group_name:
-                        errors.append(f"Row {index}: Empty district or group name")
-                        skipped_count += 1
-                        continue
-                    
-                    # Get the group by NAME instead of ID
-                    group = group_names_in_db.get(group_name)
-                    if not group:
-                        errors.append(f"Row {index}: Group '{group_name}' not found in database")
-                        skipped_count += 1
-                        continue
-                    
-                    # Generate district code (sequential number for this group)
-                    # Count how many districts this group already has
-                    existing_districts_count = District.query.filter_by(group_id=group.id).count()
-                    district_code = str(existing_districts_count + 1)
-                    
-                    # Check if district already exists for this group
-                    existing_district = District.query.filter_by(
-                        group_id=group.id,
-                        name=district_name
-                    ).first()
-                    
-                    if existing_district:
-                        # Update existing district
-                        existing_district.code = district_code
-                        existing_district.leader = f"{district_name} Leader"
-                        # print(f"  ↺ Updated: '{district_name}' (Group: {group.name})")
-                    else:
-                        # Create new district
-                        district = District(
-                            name=district_name,
-                            code=district_code,
-                            state_id=group.state_id,
-                            region_id=group.region_id,
-                            old_group_id=group.old_group_id,
-                            group_id=group.id,
-                            leader=f"{district_name} Leader"
-                        )
-                        db.session.add(district)
-                        # print(f"  + Added: '{district_name}' (Group: {group.name})")
-                    
-                    imported_count += 1
-                    
-                    # Progress indicator
-                    if imported_count % 50 == 0:
-                        print(f"  → Processed {imported_count}/{total_districts} districts...")
-                        db.session.commit()  # Commit every 50 records
-                    
-                except Exception as e:
-                    errors.append(f"Row {index}: Error '{row.get('district_name', 'N/A')}' - {str(e)}")
-                    skipped_count += 1
-                    continue
-            
-            # Final commit
-            db.session.commit()
+            result = run_import(csv_file, dry_run=dry_run)
+            if dry_run:
+                db.session.rollback()
+            else:
+                from app.utils.hierarchy_cache import bump_hierarchy_version
+                bump_hierarchy_version()
+                db.session.commit()
             
             print(f"\n{'='*60}")
-            print("✅ IMPORT COMPLETE!")
+            print("✅ DRY RUN COMPLETE (nothing written)" if dry_run else "✅ IMPORT COMPLETE!")
             print(f"{'='*60}")
             print(f"📊 Summary:")
-            print(f"   Total in CSV: {initial_count}")
-            print(f"   Valid districts: {filtered_count}")
-            print(f"   Successfully imported: {imported_count}")
-            print(f"   Skipped/Errors: {skipped_count}")
-            
+            print(f"   Total in CSV: {result['total_rows']}")
+            print(f"   Valid districts: {result['valid_rows']}")
+            print(f"   Created: {result['created']}")
+            print(f"   Updated: {result['updated']}")
+            print(f"   Skipped/Errors: {result['skipped']}")
+            print(f"   Timings: " + ", ".join(f"{stage} {seconds}s" for stage, seconds in result['timings'].items()))
+            
+            errors = [f"Row {error['row']}: {error['error']}" for error in result['errors']]
             if errors:
-                print(f"\n⚠️  Errors encountered ({len(errors)}):")
+                print(f"\n⚠️  Errors encountered ({result['skipped']}):")
                 for i, error in enumerate(errors[:5]):  # Show first 5 errors
                     print(f"   {i+1}. {error}")
-                if len(errors) > 5:
-                    print(f"   ... and {len(errors) - 5} more errors")
+                if result['skipped'] > 5:
+                    print(f"   ... and {result['skipped'] - 5} more errors")
             
-            # Generate detailed report
-            generate_import_report_by_name(imported_count, skipped_count, errors, csv_file)
-            
-            # Verify import
-            verify_import()
-            
-            return True
+            if dry_run:
+                return True
+        
+        # Generate detailed report
+        generate_import_report_by_name(result['created'] + result['updated'], result['skipped'], errors, csv_file)
+        
+        # Verify import
+        verify_import()
+        
+        return True
             
     except Exception as e:
         print(f"❌ Error importing districts: {e}")
@@ -435,43 +312,27 @@ def main():
     print("🚀 DISTRICT IMPORT BY GROUP NAME")
     print("="*60)
     
+    # python import_districts_with_mapping.py [FILE] [--dry-run]
+    args = [arg for arg in sys.argv[1:] if arg != '--dry-run']
+    dry_run = '--dry-run' in sys.argv[1:]
+    
     # STEP 1: Fix duplicate groups before import
-    print("\n1. Checking and fixing duplicate groups...")
-    check_and_fix_duplicate_groups()
+    if dry_run:
+        print("\n1. Skipping duplicate group fix (dry run)")
+    else:
+        print("\n1. Checking and fixing duplicate groups...")
+        check_and_fix_duplicate_groups()
     
     # STEP 2: Create clean file without IDs (optional)
     print("\n2. Creating clean districts file...")
     clean_file = create_clean_districts_file()
     
-    # Use either the original or clean file
-    csv_file = clean_file if clean_file else 'districts_with_group_ids.csv'
+    # Use either the original or clean file; an explicit file on the command line wins
+    csv_file = args[0] if args else (clean_file if clean_file else 'districts_with_group_ids.csv')
     
-    # Check if file exists
     if not os.path.exists(csv_file):
-        print(f"\n⚠️  File '{csv_file}' not found.")
-        print("Looking for CSV files in current directory...")
-        
-        csv_files = [f for f in os.listdir('.') if f.endswith('.csv')]
-        
-        if csv_files:
-            print(f"\nFound CSV files:")
-            for i, file in enumerate(csv_files, 1):
-                print(f"  {i}. {file}")
-            
-            choice = input(f"\nSelect file (1-{len(csv_files)}) or enter custom path: ").strip()
-            
-            if choice.isdigit() and 1 <= int(choice) <= len(csv_files):
-                csv_file = csv_files[int(choice)-1]
-            elif choice:
-                csv_file = choice
-        else:
-            print("❌ No CSV files found in current directory.")
-            custom_file = input("Enter full path to CSV file: ").strip()
-            if custom_file and os.path.exists(custom_file):
-                csv_file = custom_file
-            else:
-                print("❌ File not found. Exiting.")
-                return
+        print(f"\n❌ File '{csv_file}' not found. Pass the CSV path as the first argument.")
+        return
     
     print(f"\n3. Importing districts from: {csv_file}")
     
@@ -489,7 +350,7 @@ def main():
     
     # Run import
     print(f"\n{'='*60}")
-    success = import_districts_by_group_name(csv_file)
+    success = import_districts_by_group_name(csv_file, dry_run=dry_run)
     
     if success:
         print("\n🎉 District import completed successfully!")
@@ -0,0 +1,48 @@
+"""Add composite indexes for attendance and youth_attendance query patterns
+
+Revision ID: 0108bf80889b
+Revises: ef0ec5d09073
+Create Date: 2026-10-17 10:03:18.774120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0108bf80889b'
+down_revision = 'ef0ec5d09073'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.create_index('ix_attendance_state_period', ['state_id', 'year', 'month', 'week'], unique=False)
+        batch_op.create_index('ix_attendance_region_period', ['region_id', 'year', 'month', 'week'], unique=False)
+        batch_op.create_index('ix_attendance_old_group_period', ['old_group_id', 'year', 'month', 'week'], unique=False)
+        batch_op.create_index('ix_attendance_group_period', ['group_id', 'year', 'month', 'week'], unique=False)
+        batch_op.create_index('ix_attendance_district_period', ['district_id', 'year', 'month', 'week'], unique=False)
+        batch_op.create_index('ix_attendance_period', ['year', 'month', 'week'], unique=False)
+
+    with op.batch_alter_table('youth_attendance', schema=None) as batch_op:
+        batch_op.create_index('ix_youth_attendance_state_period', ['state_id', 'year', 'month', 'week'], unique=False)
+        batch_op.create_index('ix_youth_attendance_region_period', ['region_id', 'year', 'month', 'week'], unique=False)
+        batch_op.create_index('ix_youth_attendance_district_period', ['district_id', 'year', 'month', 'week'], unique=False)
+        batch_op.create_index('ix_youth_attendance_type_period', ['attendance_type', 'year', 'month', 'week'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('youth_attendance', schema=None) as batch_op:
+        batch_op.drop_index('ix_youth_attendance_type_period')
+        batch_op.drop_index('ix_youth_attendance_district_period')
+        batch_op.drop_index('ix_youth_attendance_region_period')
+        batch_op.drop_index('ix_youth_attendance_state_period')
+
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.drop_index('ix_attendance_period')
+        batch_op.drop_index('ix_attendance_district_period')
+        batch_op.drop_index('ix_attendance_group_period')
+        batch_op.drop_index('ix_attendance_old_group_period')
+        batch_op.drop_index('ix_attendance_region_period')
+        batch_op.drop_index('ix_attendance_state_period')
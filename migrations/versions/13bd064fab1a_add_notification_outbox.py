@@ -0,0 +1,72 @@
+"""Add notification_jobs and notification_outbox for queued reminders
+
+Revision ID: 13bd064fab1a
+Revises: ce1982c6728b
+Create Date: 2026-10-17 12:04:41.207316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '13bd064fab1a'
+down_revision = 'ce1982c6728b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('entity_type', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=True),
+    sa.Column('methods', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('sent', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notification_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_notification_jobs_status'), ['status'], unique=False)
+
+    op.create_table('notification_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('channel', sa.String(length=20), nullable=False),
+    sa.Column('recipient', sa.String(length=255), nullable=False),
+    sa.Column('recipient_name', sa.String(length=255), nullable=True),
+    sa.Column('entity_name', sa.String(length=255), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['notification_jobs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_notification_outbox_job_id'), ['job_id'], unique=False)
+        batch_op.create_index('ix_notification_outbox_due', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_outbox_due')
+        batch_op.drop_index(batch_op.f('ix_notification_outbox_job_id'))
+
+    op.drop_table('notification_outbox')
+    with op.batch_alter_table('notification_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_notification_jobs_status'))
+
+    op.drop_table('notification_jobs')
@@ -0,0 +1,31 @@
+"""Add scheduler_leases for single-leader background scheduling
+
+Revision ID: 24ec62059a1d
+Revises: 13bd064fab1a
+Create Date: 2026-10-17 13:02:18.554920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '24ec62059a1d'
+down_revision = '13bd064fab1a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scheduler_leases',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('holder', sa.String(length=120), nullable=True),
+    sa.Column('acquired_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('scheduler_leases')
@@ -0,0 +1,74 @@
+"""Add natural unique keys to attendance and youth_attendance
+
+Revision ID: 552ac761c9b9
+Revises: 24ec62059a1d
+Create Date: 2026-10-17 14:10:52.601183
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '552ac761c9b9'
+down_revision = '24ec62059a1d'
+branch_labels = None
+depends_on = None
+
+
+ATTENDANCE_KEY = (
+    "state_id", "region_id", "COALESCE(old_group_id, 0)", "COALESCE(group_id, 0)",
+    "COALESCE(district_id, 0)", "year", "month", "week", "service_type",
+)
+
+YOUTH_ATTENDANCE_KEY = (
+    "attendance_type", "state_id", "region_id", "district_id",
+    "COALESCE(old_group_id, 0)", "COALESCE(group_id, 0)",
+    "COALESCE(year, 0)", "COALESCE(month, '')", "COALESCE(week, 0)", "COALESCE(period, '')",
+)
+
+
+def upgrade():
+    # Existing duplicates: keep the latest submission per key
+    op.execute(f"""
+        DELETE FROM attendance WHERE id NOT IN (
+            SELECT MAX(id) FROM attendance GROUP BY {', '.join(ATTENDANCE_KEY)}
+        )
+    """)
+    op.execute(f"""
+        DELETE FROM youth_attendance WHERE id NOT IN (
+            SELECT MAX(id) FROM youth_attendance GROUP BY {', '.join(YOUTH_ATTENDANCE_KEY)}
+        )
+    """)
+
+    op.create_index('uq_attendance_submission', 'attendance',
+                    [sa.text(expression) for expression in ATTENDANCE_KEY], unique=True)
+    op.create_index('uq_youth_attendance_submission', 'youth_attendance',
+                    [sa.text(expression) for expression in YOUTH_ATTENDANCE_KEY], unique=True)
+
+    # Rollups counted the removed duplicates; rebuild them from what is left
+    op.execute("DELETE FROM attendance_rollups")
+    op.execute("""
+        INSERT INTO attendance_rollups (
+            state_id, region_id, old_group_id, group_id, district_id,
+            year, month, week, service_type,
+            men, women, youth_boys, youth_girls, children_boys, children_girls,
+            new_comers, tithe_offering, record_count, updated_at
+        )
+        SELECT
+            state_id, region_id, old_group_id, group_id, district_id,
+            year, month, week, service_type,
+            COALESCE(SUM(men), 0), COALESCE(SUM(women), 0),
+            COALESCE(SUM(youth_boys), 0), COALESCE(SUM(youth_girls), 0),
+            COALESCE(SUM(children_boys), 0), COALESCE(SUM(children_girls), 0),
+            COALESCE(SUM(new_comers), 0), COALESCE(SUM(tithe_offering), 0),
+            COUNT(id), CURRENT_TIMESTAMP
+        FROM attendance
+        GROUP BY state_id, region_id, old_group_id, group_id, district_id,
+                 year, month, week, service_type
+    """)
+
+
+def downgrade():
+    op.drop_index('uq_youth_attendance_submission', table_name='youth_attendance')
+    op.drop_index('uq_attendance_submission', table_name='attendance')
@@ -0,0 +1,32 @@
+"""Add hierarchy_version counter for hierarchy cache invalidation
+
+Revision ID: ce1982c6728b
+Revises: 0108bf80889b
+Create Date: 2026-10-17 11:20:05.318842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ce1982c6728b'
+down_revision = '0108bf80889b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('hierarchy_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Single counter row; bumped on every hierarchy write
+    op.execute("INSERT INTO hierarchy_version (id, version, updated_at) VALUES (1, 0, CURRENT_TIMESTAMP)")
+
+
+def downgrade():
+    op.drop_table('hierarchy_version')
@@ -0,0 +1,121 @@
+"""Roll attendance up per hierarchy position and month
+
+Revision ID: db7cda9fef41
+Revises: a31813f46640
+Create Date: 2026-10-17 16:21:07.318542
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'db7cda9fef41'
+down_revision = 'a31813f46640'
+branch_labels = None
+depends_on = None
+
+
+ROLLUP_KEY = (
+    "state_id", "region_id", "COALESCE(old_group_id, 0)", "COALESCE(group_id, 0)",
+    "COALESCE(district_id, 0)", "year", "month",
+)
+
+SUMS = """
+    COALESCE(SUM(men), 0), COALESCE(SUM(women), 0),
+    COALESCE(SUM(youth_boys), 0), COALESCE(SUM(youth_girls), 0),
+    COALESCE(SUM(children_boys), 0), COALESCE(SUM(children_girls), 0),
+    COALESCE(SUM(new_comers), 0), COALESCE(SUM(tithe_offering), 0),
+    COUNT(id)
+"""
+
+
+def _create_rollups(period_columns):
+    op.create_table('attendance_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('state_id', sa.Integer(), nullable=False),
+    sa.Column('region_id', sa.Integer(), nullable=False),
+    sa.Column('old_group_id', sa.Integer(), nullable=True),
+    sa.Column('group_id', sa.Integer(), nullable=True),
+    sa.Column('district_id', sa.Integer(), nullable=True),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=20), nullable=False),
+    *period_columns,
+    sa.Column('men', sa.Integer(), nullable=False),
+    sa.Column('women', sa.Integer(), nullable=False),
+    sa.Column('youth_boys', sa.Integer(), nullable=False),
+    sa.Column('youth_girls', sa.Integer(), nullable=False),
+    sa.Column('children_boys', sa.Integer(), nullable=False),
+    sa.Column('children_girls', sa.Integer(), nullable=False),
+    sa.Column('new_comers', sa.Integer(), nullable=False),
+    sa.Column('tithe_offering', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('record_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['district_id'], ['districts.id'], ),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ),
+    sa.ForeignKeyConstraint(['old_group_id'], ['old_groups.id'], ),
+    sa.ForeignKeyConstraint(['region_id'], ['regions.id'], ),
+    sa.ForeignKeyConstraint(['state_id'], ['states.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def upgrade():
+    # The old buckets were keyed like attendance itself (1:1 with it), and the
+    # plain unique constraint let concurrent writers insert a bucket twice
+    # (NULL district/group never collide). Rebuild at month grain, with the
+    # key COALESCEd in a unique index that ON CONFLICT can target.
+    with op.batch_alter_table('attendance_rollups', schema=None) as batch_op:
+        batch_op.drop_index('ix_attendance_rollups_period')
+    op.drop_table('attendance_rollups')
+
+    _create_rollups([sa.Column('last_week', sa.Integer(), nullable=False)])
+    op.create_index('uq_attendance_rollups_key', 'attendance_rollups',
+                    [sa.text(expression) for expression in ROLLUP_KEY], unique=True)
+    op.create_index('ix_attendance_rollups_period', 'attendance_rollups', ['year', 'month'], unique=False)
+
+    op.execute(f"""
+        INSERT INTO attendance_rollups (
+            state_id, region_id, old_group_id, group_id, district_id, year, month,
+            men, women, youth_boys, youth_girls, children_boys, children_girls,
+            new_comers, tithe_offering, record_count, last_week, updated_at
+        )
+        SELECT
+            state_id, region_id, old_group_id, group_id, district_id, year, month,
+            {SUMS}, MAX(week), CURRENT_TIMESTAMP
+        FROM attendance
+        GROUP BY state_id, region_id, old_group_id, group_id, district_id, year, month
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_attendance_rollups_period', table_name='attendance_rollups')
+    op.drop_index('uq_attendance_rollups_key', table_name='attendance_rollups')
+    op.drop_table('attendance_rollups')
+
+    _create_rollups([
+        sa.Column('week', sa.Integer(), nullable=False),
+        sa.Column('service_type', sa.String(length=50), nullable=False),
+    ])
+    with op.batch_alter_table('attendance_rollups', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_attendance_rollups_key', [
+            'state_id', 'region_id', 'old_group_id', 'group_id', 'district_id',
+            'year', 'month', 'week', 'service_type',
+        ])
+        batch_op.create_index('ix_attendance_rollups_period', ['year', 'month', 'week'], unique=False)
+
+    op.execute(f"""
+        INSERT INTO attendance_rollups (
+            state_id, region_id, old_group_id, group_id, district_id,
+            year, month, week, service_type,
+            men, women, youth_boys, youth_girls, children_boys, children_girls,
+            new_comers, tithe_offering, record_count, updated_at
+        )
+        SELECT
+            state_id, region_id, old_group_id, group_id, district_id,
+            year, month, week, service_type,
+            {SUMS}, CURRENT_TIMESTAMP
+        FROM attendance
+        GROUP BY state_id, region_id, old_group_id, group_id, district_id,
+                 year, month, week, service_type
+    """)
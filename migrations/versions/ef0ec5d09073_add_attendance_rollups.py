@@ -0,0 +1,78 @@
+"""Add attendance_rollups table
+
+Revision ID: ef0ec5d09073
+Revises: ca6deaaf27ce
+Create Date: 2026-10-17 09:12:41.520317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ef0ec5d09073'
+down_revision = 'ca6deaaf27ce'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('attendance_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('state_id', sa.Integer(), nullable=False),
+    sa.Column('region_id', sa.Integer(), nullable=False),
+    sa.Column('old_group_id', sa.Integer(), nullable=True),
+    sa.Column('group_id', sa.Integer(), nullable=True),
+    sa.Column('district_id', sa.Integer(), nullable=True),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=20), nullable=False),
+    sa.Column('week', sa.Integer(), nullable=False),
+    sa.Column('service_type', sa.String(length=50), nullable=False),
+    sa.Column('men', sa.Integer(), nullable=False),
+    sa.Column('women', sa.Integer(), nullable=False),
+    sa.Column('youth_boys', sa.Integer(), nullable=False),
+    sa.Column('youth_girls', sa.Integer(), nullable=False),
+    sa.Column('children_boys', sa.Integer(), nullable=False),
+    sa.Column('children_girls', sa.Integer(), nullable=False),
+    sa.Column('new_comers', sa.Integer(), nullable=False),
+    sa.Column('tithe_offering', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('record_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['district_id'], ['districts.id'], ),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ),
+    sa.ForeignKeyConstraint(['old_group_id'], ['old_groups.id'], ),
+    sa.ForeignKeyConstraint(['region_id'], ['regions.id'], ),
+    sa.ForeignKeyConstraint(['state_id'], ['states.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('state_id', 'region_id', 'old_group_id', 'group_id', 'district_id', 'year', 'month', 'week', 'service_type', name='uq_attendance_rollups_key')
+    )
+    with op.batch_alter_table('attendance_rollups', schema=None) as batch_op:
+        batch_op.create_index('ix_attendance_rollups_period', ['year', 'month', 'week'], unique=False)
+
+    # Backfill from the existing attendance history
+    op.execute("""
+        INSERT INTO attendance_rollups (
+            state_id, region_id, old_group_id, group_id, district_id,
+            year, month, week, service_type,
+            men, women, youth_boys, youth_girls, children_boys, children_girls,
+            new_comers, tithe_offering, record_count, updated_at
+        )
+        SELECT
+            state_id, region_id, old_group_id, group_id, district_id,
+            year, month, week, service_type,
+            COALESCE(SUM(men), 0), COALESCE(SUM(women), 0),
+            COALESCE(SUM(youth_boys), 0), COALESCE(SUM(youth_girls), 0),
+            COALESCE(SUM(children_boys), 0), COALESCE(SUM(children_girls), 0),
+            COALESCE(SUM(new_comers), 0), COALESCE(SUM(tithe_offering), 0),
+            COUNT(id), CURRENT_TIMESTAMP
+        FROM attendance
+        GROUP BY state_id, region_id, old_group_id, group_id, district_id,
+                 year, month, week, service_type
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('attendance_rollups', schema=None) as batch_op:
+        batch_op.drop_index('ix_attendance_rollups_period')
+
+    op.drop_table('attendance_rollups')
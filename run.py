@@ -56,6 +56,83 @@ def bootstrap_roles():
     for role in Role.query.all():
         print(f"  - {role.name}: {role.description}")
 
+@app.cli.command("rebuild-rollups")
+@with_appcontext
+def rebuild_rollups():
+    """Recompute attendance rollups from the raw attendance table."""
+    from app.utils.attendance_rollup import rebuild_attendance_rollups
+
+    count = rebuild_attendance_rollups()
+    print(f"Attendance rollups rebuilt: {count} rows")
+
+@app.cli.command("drain-notifications")
+@click.option("--loop", is_flag=True, help="Keep polling instead of exiting once the outbox is empty.")
+@with_appcontext
+def drain_notifications(loop):
+    """Send queued reminder notifications from the outbox."""
+    import time
+    from app.utils.notification_outbox import process_notification_queue
+
+    while True:
+        stats = process_notification_queue()
+        print(f"Notification outbox: {stats['jobs_planned']} jobs planned, "
+              f"{stats['sent']} sent, {stats['failed']} failed attempts")
+        if not loop:
+            break
+        time.sleep(app.config.get("OUTBOX_POLL_SECONDS", 15))
+
+@app.cli.command("import-hierarchy")
+@click.argument("file_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--state-name", default="Rivers Central")
+@click.option("--state-code", default="RIV-CEN")
+@click.option("--region-name", default="Port Harcourt")
+@click.option("--districts/--no-districts", default=False, help="Also import the districts under each group.")
+@click.option("--dry-run", is_flag=True, help="Report what would change without writing anything.")
+@with_appcontext
+def import_hierarchy(file_path, state_name, state_code, region_name, districts, dry_run):
+    """Import old groups, groups (with admin users) and districts from an Excel/CSV sheet."""
+    from app.utils.excel_importer_new import import_hierarchy_from_excel
+    from app.utils.hierarchy_cache import bump_hierarchy_version
+
+    result = import_hierarchy_from_excel(file_path, state_name, state_code, region_name,
+                                         simulate=dry_run, import_districts=districts)
+    if "error" in result:
+        raise click.ClickException(result["error"])
+    if dry_run:
+        db.session.rollback()
+        for name in result["preview"]["old_groups"]:
+            print(f"  + old group {name}")
+        for name in result["preview"]["groups"]:
+            print(f"  + group {name}")
+        return
+    bump_hierarchy_version()
+    db.session.commit()
+
+@app.cli.command("import-districts")
+@click.argument("csv_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--dry-run", is_flag=True, help="Report what would change without writing anything.")
+@with_appcontext
+def import_districts(csv_file, dry_run):
+    """Import districts from a CSV with district_name and group_name columns."""
+    from app.utils.district_import import DistrictImportError, import_districts_by_group_name
+    from app.utils.hierarchy_cache import bump_hierarchy_version
+
+    try:
+        result = import_districts_by_group_name(csv_file, dry_run=dry_run)
+    except DistrictImportError as e:
+        raise click.ClickException(str(e))
+    if dry_run:
+        db.session.rollback()
+    else:
+        bump_hierarchy_version()
+        db.session.commit()
+
+    print(f"Districts {'(dry run) ' if dry_run else ''}from {result['valid_rows']} rows: "
+          f"{result['created']} created, {result['updated']} updated, {result['skipped']} skipped")
+    print("Timings: " + ", ".join(f"{stage} {seconds}s" for stage, seconds in result["timings"].items()))
+    for error in result["errors"][:10]:
+        print(f"  row {error['row']}: {error['error']}")
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port)
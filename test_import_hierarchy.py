@@ -1,4 +1,5 @@
 # import_groups_only.py
+import time
 import requests
 
 BASE_URL = "http://127.0.0.1:5000"
@@ -23,8 +24,20 @@ def import_groups_only():
                                        "import_districts": "false"  # This is key!
                                    })
             
-        if response.status_code == 200:
-            result = response.json()
+        if response.status_code == 202:
+            # The import runs as a background job: poll it until it finishes
+            job_url = f"{BASE_URL}{response.json()['status_url']}"
+            job = requests.get(job_url).json()
+            while job['status'] in ('queued', 'running'):
+                print(f"⏳ {job['stage'] or job['status']} {job['progress']}%")
+                time.sleep(1)
+                job = requests.get(job_url).json()
+            
+            if job['status'] != 'completed':
+                print(f"❌ Import failed: {job['error']}")
+                return
+            
+            result = {'result': job['result']}
             print("✅ SUCCESS! Groups imported (districts skipped)")
             print(f"Old Groups: {result['result'].get('old_groups', 0)}")
             print(f"Groups: {result['result'].get('groups', 0)}")
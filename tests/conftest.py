@@ -0,0 +1,180 @@
+# tests/conftest.py
+"""
+Shared fixtures: the real app (create_app) on a throwaway SQLite file,
+a schema reset per test, a small seeded hierarchy and JWT headers.
+"""
+import os
+from contextlib import contextmanager
+
+# Read at import time by config.Config and the WhatsApp client
+os.environ.setdefault("WHATSAPP_PHONE_NUMBER_ID", "test")
+os.environ.setdefault("WHATSAPP_TOKEN", "test")
+os.environ["SCHEDULER_ENABLED"] = "false"
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from config import Config
+from app import create_app, setup_roles_on_startup
+from app.extensions import db
+from app.models import State, Region, OldGroup, Group, District, User
+from app.models.user import Role
+from app.utils.access_control import user_claims
+from app.utils.hierarchy_cache import hierarchy_cache
+
+
+@pytest.fixture(autouse=True)
+def _no_log_files(monkeypatch):
+    """Keep test runs out of logs/whatsapp.log (records still reach caplog)."""
+    from app.utils.whatsapp_service import logger
+    monkeypatch.setattr(logger, "handlers", [])
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    database_url = "sqlite:///" + str(tmp_path_factory.mktemp("db") / "test.db")
+
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ENGINE_OPTIONS = {}  # pool sizing options are PostgreSQL-only
+        SCHEDULER_ENABLED = False
+        DASHBOARD_CACHE_SECONDS = 0  # tests that exercise the cache turn it on
+        JWT_SECRET_KEY = "test-secret-key-of-sufficient-length"
+
+    # create_app reads the roles table, so the schema has to exist first
+    bootstrap = Flask("bootstrap")
+    bootstrap.config.update(SQLALCHEMY_DATABASE_URI=database_url, SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(bootstrap)
+    with bootstrap.app_context():
+        db.create_all()
+
+    return create_app(TestConfig)
+
+
+@pytest.fixture
+def database(app):
+    """A fresh schema (roles included) inside an app context."""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        setup_roles_on_startup(app)
+        hierarchy_cache.invalidate()
+        yield db
+        db.session.remove()
+
+
+class IsolatedClient(FlaskClient):
+    """
+    Runs every request in its own app context, as in production. Otherwise
+    requests reuse the context the `database` fixture holds open, and
+    flask.g (e.g. the cached principal) leaks from one request to the next.
+    """
+
+    def open(self, *args, **kwargs):
+        with self.application.app_context():
+            return super().open(*args, **kwargs)
+
+
+@pytest.fixture
+def client(app, database):
+    app.test_client_class = IsolatedClient
+    return app.test_client()
+
+
+@pytest.fixture
+def hierarchy(database):
+    """
+    Two states: S1 → R1 → OG1 → G1 → D1 (plus D2 under G1) and S2 → R2.
+    Returns the ids by name.
+    """
+    s1 = State(name="S1", code="S1")
+    s2 = State(name="S2", code="S2")
+    db.session.add_all([s1, s2])
+    db.session.flush()
+    r1 = Region(name="R1", code="R1", state_id=s1.id)
+    r2 = Region(name="R2", code="R2", state_id=s2.id)
+    db.session.add_all([r1, r2])
+    db.session.flush()
+    og1 = OldGroup(name="OG1", code="OG1", state_id=s1.id, region_id=r1.id)
+    db.session.add(og1)
+    db.session.flush()
+    g1 = Group(name="G1", code="G1", state_id=s1.id, region_id=r1.id, old_group_id=og1.id)
+    db.session.add(g1)
+    db.session.flush()
+    d1 = District(name="D1", code="D1", state_id=s1.id, region_id=r1.id, old_group_id=og1.id, group_id=g1.id)
+    d2 = District(name="D2", code="D2", state_id=s1.id, region_id=r1.id, old_group_id=og1.id, group_id=g1.id)
+    db.session.add_all([d1, d2])
+    db.session.commit()
+    return {
+        "S1": s1.id, "S2": s2.id, "R1": r1.id, "R2": r2.id,
+        "OG1": og1.id, "G1": g1.id, "D1": d1.id, "D2": d2.id,
+    }
+
+
+@pytest.fixture
+def make_user(database):
+    def make(role_name, email=None, **hierarchy_ids):
+        user = User(email=email or f"{role_name.lower().replace(' ', '_')}@example.com", name=role_name,
+                    **hierarchy_ids)
+        user.set_password("password")
+        user.roles.append(Role.query.filter_by(name=role_name).one())
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def auth_headers(database):
+    """Bearer headers for a user, with the claims the login route issues."""
+    def headers(user):
+        token = create_access_token(identity=str(user.id), additional_claims=user_claims(user))
+        return {"Authorization": f"Bearer {token}"}
+    return headers
+
+
+@pytest.fixture
+def attendance_data(hierarchy):
+    """Build a submission for D1 (or the given ids), overriding any field."""
+    def make(**overrides):
+        data = {
+            "service_type": "Sunday Worship Service",
+            "state_id": hierarchy["S1"], "region_id": hierarchy["R1"],
+            "old_group_id": hierarchy["OG1"], "group_id": hierarchy["G1"],
+            "district_id": hierarchy["D1"],
+            "year": 2026, "month": "May", "week": 1,
+            "men": 10, "women": 12, "youth_boys": 3, "youth_girls": 4,
+            "children_boys": 5, "children_girls": 6,
+            "new_comers": 1, "tithe_offering": 100,
+        }
+        data.update(overrides)
+        return data
+    return make
+
+
+@pytest.fixture
+def count_statements(database):
+    """
+    Context manager collecting the SQL statements executed inside it:
+
+        with count_statements() as statements:
+            ...
+        assert len(statements) == 1
+    """
+    @contextmanager
+    def counting():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+    return counting
@@ -0,0 +1,96 @@
+import pytest
+
+from app.extensions import db
+from app.models import Role, State, Region, District, Group
+from app.models.hierarchy import OldGroup
+from app.utils.access_control import restrict_by_access
+
+MODELS = {"states": State, "regions": Region, "old_groups": OldGroup, "groups": Group, "districts": District}
+
+S1_TREE = {
+    "states": ["S1"],
+    "regions": ["R1", "R3"],
+    "old_groups": ["OG1", "OG2"],
+    "groups": ["G1", "G3", "G4"],
+    "districts": ["D1", "D2", "D3", "D4"],
+}
+NOTHING = {name: [] for name in MODELS}
+
+# role, the user column holding its scope, the entity it is scoped to -> names visible per model
+VISIBLE = [
+    ("Super Admin", None, None, {
+        "states": ["S1", "S2"],
+        "regions": ["R1", "R2", "R3"],
+        "old_groups": ["OG1", "OG2"],
+        "groups": ["G1", "G3", "G4"],
+        "districts": ["D1", "D2", "D3", "D4"],
+    }),
+    ("State Admin", "state_id", "S1", S1_TREE),
+    ("Region Admin", "region_id", "R1", {**S1_TREE, "states": [], "regions": ["R1"]}),
+    ("Old Group Admin", "old_group_id", "OG1", {
+        **NOTHING, "old_groups": ["OG1"], "groups": ["G1", "G3"], "districts": ["D1", "D2", "D3"],
+    }),
+    ("Group Admin", "group_id", "G1", {**NOTHING, "groups": ["G1"], "districts": ["D1", "D2"]}),
+    ("District Admin", "district_id", "D1", {**NOTHING, "districts": ["D1"]}),
+    ("Viewer", None, None, NOTHING),
+    ("State Admin", None, None, NOTHING),  # admin role without its scope id
+]
+
+
+@pytest.fixture
+def tree(hierarchy):
+    """
+    The shared hierarchy plus siblings each scope must tell apart:
+    G3 (with D3) next to G1 under OG1, OG2 → G4 → D4 under R1, and an empty R3 in S1.
+    """
+    ids = dict(hierarchy)
+    s1, r1, og1 = ids["S1"], ids["R1"], ids["OG1"]
+
+    r3 = Region(name="R3", code="R3", state_id=s1)
+    og2 = OldGroup(name="OG2", code="OG2", state_id=s1, region_id=r1)
+    db.session.add_all([r3, og2])
+    db.session.flush()
+    g3 = Group(name="G3", code="G3", state_id=s1, region_id=r1, old_group_id=og1)
+    g4 = Group(name="G4", code="G4", state_id=s1, region_id=r1, old_group_id=og2.id)
+    db.session.add_all([g3, g4])
+    db.session.flush()
+    db.session.add_all([
+        District(name="D3", code="D3", state_id=s1, region_id=r1, old_group_id=og1, group_id=g3.id),
+        District(name="D4", code="D4", state_id=s1, region_id=r1, old_group_id=og2.id, group_id=g4.id),
+        Role(name="Old Group Admin", description="Administrator for a specific old group"),
+    ])
+    db.session.commit()
+    return {entity.name: entity.id for model in MODELS.values() for entity in model.query}
+
+
+def visible(user, model):
+    return sorted(entity.name for entity in restrict_by_access(model.query, user))
+
+
+@pytest.mark.parametrize("role, column, entity, expected", VISIBLE,
+                         ids=[f"{role}-{entity or 'unscoped'}" for role, _, entity, _ in VISIBLE])
+def test_visible_rows_per_role(tree, make_user, role, column, entity, expected):
+    user = make_user(role, **({column: tree[entity]} if column else {}))
+
+    assert {name: visible(user, model) for name, model in MODELS.items()} == expected
+
+
+def test_highest_admin_role_sets_the_scope(tree, make_user):
+    user = make_user("Group Admin", state_id=tree["S1"], group_id=tree["G1"])
+    user.roles.append(Role.query.filter_by(name="State Admin").one())
+    db.session.commit()
+
+    assert visible(user, District) == S1_TREE["districts"]
+
+
+@pytest.mark.parametrize("role, column, entity, expected", [
+    ("Super Admin", None, None, ["D1", "D2", "D3", "D4"]),
+    ("Group Admin", "group_id", "G1", ["D1", "D2"]),
+    ("Viewer", None, None, []),
+])
+def test_district_listing_is_scoped(client, tree, make_user, auth_headers, role, column, entity, expected):
+    user = make_user(role, **({column: tree[entity]} if column else {}))
+
+    response = client.get("/hierarchy/districts", headers=auth_headers(user))
+    assert response.status_code == 200
+    assert sorted(d["name"] for d in response.get_json()) == expected
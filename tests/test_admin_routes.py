@@ -0,0 +1,57 @@
+import io
+import os
+
+import pytest
+
+from app.models import BackgroundJob
+from app.utils.job_runner import job_runner
+
+DISTRICTS_CSV = b"district_name,group_name\nD9,G1\n"
+
+
+class IdlePool:
+    """Accepts submissions without running them: these tests only look at the queued row."""
+
+    def submit(self, fn, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def idle_pool(database, monkeypatch):
+    monkeypatch.setattr(job_runner, "_pool", lambda app: IdlePool())
+    yield
+    for job in BackgroundJob.query.all():
+        os.unlink(job.params["file_path"])
+
+
+def upload(client, path, headers=None, name="districts.csv", body=DISTRICTS_CSV):
+    return client.post(path, headers=headers or {}, data={"file": (io.BytesIO(body), name)},
+                       content_type="multipart/form-data")
+
+
+@pytest.mark.parametrize("path", ["/admin/import-districts", "/admin/import-hierarchy"])
+def test_imports_require_a_super_admin(client, make_user, auth_headers, hierarchy, path):
+    assert upload(client, path).status_code == 401
+
+    state_admin = auth_headers(make_user("State Admin", state_id=hierarchy["S1"]))
+    assert upload(client, path, state_admin).status_code == 403
+    assert BackgroundJob.query.count() == 0
+
+    super_admin = auth_headers(make_user("Super Admin"))
+    assert upload(client, path, super_admin).status_code == 202
+    assert BackgroundJob.query.count() == 1
+
+
+def test_job_status_requires_a_super_admin(client, make_user, auth_headers, hierarchy):
+    super_admin = make_user("Super Admin")
+    response = upload(client, "/admin/import-districts", auth_headers(super_admin))
+    status_url = response.get_json()["status_url"]
+    assert BackgroundJob.query.one().created_by == super_admin.id
+
+    assert client.get(status_url).status_code == 401
+    state_admin = auth_headers(make_user("State Admin", state_id=hierarchy["S1"]))
+    assert client.get(status_url, headers=state_admin).status_code == 403
+
+    response = client.get(status_url, headers=auth_headers(super_admin))
+    assert response.status_code == 200
+    assert response.get_json()["created_by"] == super_admin.id
@@ -0,0 +1,67 @@
+import io
+
+import pytest
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models import Attendance, AttendanceRollup
+from app.utils.attendance_import import AttendanceImportError, import_attendance_csv
+
+HEADER = ("service_type,state_id,region_id,old_group_id,group_id,district_id,"
+          "month,week,year,men,women,youth_boys,youth_girls,children_boys,children_girls")
+
+
+def csv_for(hierarchy, *rows):
+    """rows: (district key or None, week, men); a None district is a group-level row."""
+    lines = [HEADER]
+    for district, week, men in rows:
+        district_id = hierarchy[district] if district else ""
+        lines.append(f"Sunday Worship Service,{hierarchy['S1']},{hierarchy['R1']},{hierarchy['OG1']},"
+                     f"{hierarchy['G1']},{district_id},May,{week},2026,{men},1,1,1,1,1")
+    return io.StringIO("\n".join(lines) + "\n")
+
+
+def stored_rows():
+    return Attendance.query.count()
+
+
+@pytest.mark.parametrize("chunk_size", [2, 5000])
+def test_imported_counts_distinct_submissions(hierarchy, chunk_size):
+    upload = csv_for(
+        hierarchy,
+        ("D1", 1, 10),
+        ("D1", 1, 11),    # repeated in the same chunk
+        ("D2", 1, 20),
+        ("D1", 1, 12),    # repeated in a later chunk when chunk_size=2
+        (None, 1, 30),
+        (None, 1, 31),    # group-level repeat (district NULL)
+    )
+
+    result = import_attendance_csv(upload, chunk_size=chunk_size)
+    db.session.commit()
+
+    assert result["imported"] == stored_rows() == 3
+    assert result["error_count"] == 0
+    assert db.session.query(func.sum(AttendanceRollup.record_count)).scalar() == 3
+    # The later line wins
+    assert Attendance.query.filter_by(district_id=hierarchy["D1"]).one().men == 12
+
+
+def test_reimport_counts_replaced_rows_and_skips_bad_ones(hierarchy):
+    import_attendance_csv(csv_for(hierarchy, ("D1", 1, 10), ("D2", 1, 20)))
+    db.session.commit()
+
+    upload = csv_for(hierarchy, ("D1", 1, 15), ("D2", 2, 20))
+    upload = io.StringIO(upload.getvalue() + "Sunday Worship Service,999,1,,,,May,1,2026,1,1,1,1,1,1\n")
+    result = import_attendance_csv(upload)
+    db.session.commit()
+
+    assert result["imported"] == 2
+    assert result["error_count"] == 1
+    assert result["errors"] == [{"row": 4, "error": "State with ID 999 does not exist"}]
+    assert stored_rows() == 3
+
+
+def test_missing_column_rejects_the_upload(hierarchy):
+    with pytest.raises(AttendanceImportError):
+        import_attendance_csv(io.StringIO("service_type,state_id\nSunday,1\n"))
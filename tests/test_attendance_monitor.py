@@ -0,0 +1,71 @@
+import random
+
+import pytest
+from sqlalchemy import func
+
+from app.controllers.attendance_controller import create_attendance
+from app.controllers.attendance_monitor_controller import MONITOR_LEVELS, get_last_weeks_by_level
+from app.extensions import db
+from app.models import Attendance, State, Region, OldGroup, Group, District
+
+LEVEL_MODELS = {"state": State, "region": Region, "old_group": OldGroup, "group": Group, "district": District}
+
+
+@pytest.fixture
+def seeded(attendance_data, hierarchy):
+    """Random submissions at district, group, old group and region level over two months."""
+    positions = [
+        {},  # D1
+        {"district_id": hierarchy["D2"]},
+        {"district_id": None},
+        {"district_id": None, "group_id": None},
+        {"state_id": hierarchy["S2"], "region_id": hierarchy["R2"],
+         "old_group_id": None, "group_id": None, "district_id": None},
+    ]
+    rng = random.Random(7)
+    for _ in range(60):
+        create_attendance(attendance_data(
+            **rng.choice(positions),
+            month=rng.choice(("May", "June")),
+            week=rng.randint(1, 5),
+            service_type=rng.choice(("Sunday Worship Service", "Bible Study", "Revival")),
+        ))
+    return hierarchy
+
+
+def per_entity_last_weeks(year, month, state_id=None):
+    """The per-entity lookup: one MAX(week) over raw attendance for each entity."""
+    last_weeks = {level: {} for level in MONITOR_LEVELS}
+    for level, model in LEVEL_MODELS.items():
+        for entity in model.query.all():
+            if state_id is not None and (entity.id if level == "state" else entity.state_id) != state_id:
+                continue
+            week = db.session.query(func.max(Attendance.week)).filter(
+                Attendance.year == year,
+                Attendance.month == month,
+                getattr(Attendance, f"{level}_id") == entity.id,
+            ).scalar()
+            if week is not None:
+                last_weeks[level][entity.id] = week
+    return last_weeks
+
+
+@pytest.mark.parametrize("month", ["May", "June", "July"])
+def test_matches_the_per_entity_query(seeded, month):
+    assert get_last_weeks_by_level(2026, month) == per_entity_last_weeks(2026, month)
+
+
+def test_scoped_result_matches_the_per_entity_query_within_the_scope(seeded):
+    scoped = get_last_weeks_by_level(2026, "May", scope=("state", seeded["S1"]))
+    assert scoped == per_entity_last_weeks(2026, "May", state_id=seeded["S1"])
+    assert seeded["S2"] not in scoped["state"]
+
+
+def test_group_takes_the_max_over_its_districts(attendance_data, hierarchy):
+    create_attendance(attendance_data(week=4))
+    create_attendance(attendance_data(week=2, district_id=hierarchy["D2"]))
+
+    last_weeks = get_last_weeks_by_level(2026, "May")
+    assert last_weeks["district"] == {hierarchy["D1"]: 4, hierarchy["D2"]: 2}
+    assert last_weeks["group"] == {hierarchy["G1"]: 4}
+    assert last_weeks["state"] == {hierarchy["S1"]: 4}
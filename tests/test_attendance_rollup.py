@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.controllers.attendance_controller import create_attendance, delete_attendance, update_attendance
+from app.extensions import db
+from app.models import AttendanceRollup
+from app.utils.attendance_rollup import rebuild_attendance_rollups
+
+
+def rollups():
+    return sorted(
+        (row.to_dict() for row in AttendanceRollup.query.all()),
+        key=lambda row: (row["year"], row["month"], row["district_id"] or 0, row["group_id"] or 0),
+    )
+
+
+def test_bucket_is_one_row_per_position_and_month(attendance_data):
+    create_attendance(attendance_data(week=1, men=10))
+    create_attendance(attendance_data(week=3, men=20))
+    create_attendance(attendance_data(week=3, men=5, service_type="Bible Study"))
+
+    (bucket,) = rollups()
+    assert bucket["month"] == "May"
+    assert bucket["record_count"] == 3
+    assert bucket["men"] == 35
+    assert bucket["last_week"] == 3
+
+
+def test_resubmission_replaces_its_counts(attendance_data):
+    create_attendance(attendance_data(men=10))
+    create_attendance(attendance_data(men=40))
+
+    (bucket,) = rollups()
+    assert bucket["record_count"] == 1
+    assert bucket["men"] == 40
+
+
+def test_group_level_submissions_share_one_bucket(attendance_data):
+    # district_id NULL: a plain unique constraint would let these duplicate
+    create_attendance(attendance_data(district_id=None, week=1))
+    create_attendance(attendance_data(district_id=None, week=2))
+
+    (bucket,) = rollups()
+    assert bucket["district_id"] is None
+    assert bucket["record_count"] == 2
+    assert bucket["last_week"] == 2
+
+
+def test_unique_index_rejects_a_second_bucket_with_null_levels(attendance_data, hierarchy):
+    create_attendance(attendance_data(district_id=None, group_id=None, old_group_id=None))
+    db.session.add(AttendanceRollup(state_id=hierarchy["S1"], region_id=hierarchy["R1"], year=2026, month="May"))
+    with pytest.raises(IntegrityError):
+        db.session.flush()
+    db.session.rollback()
+
+
+def test_update_and_delete_refresh_both_buckets(attendance_data):
+    first = create_attendance(attendance_data(week=1))
+    create_attendance(attendance_data(week=4, men=7))
+
+    update_attendance(first.id, {"month": "June"})
+    by_month = {row["month"]: row for row in rollups()}
+    assert by_month["May"]["record_count"] == 1
+    assert by_month["May"]["men"] == 7
+    assert by_month["June"]["record_count"] == 1
+    assert by_month["June"]["last_week"] == 1
+
+    delete_attendance(first.id)
+    assert [row["month"] for row in rollups()] == ["May"]
+
+
+def test_deleting_the_latest_week_lowers_last_week(attendance_data):
+    create_attendance(attendance_data(week=1))
+    latest = create_attendance(attendance_data(week=4))
+
+    delete_attendance(latest.id)
+    (bucket,) = rollups()
+    assert bucket["last_week"] == 1
+
+
+def test_incremental_maintenance_matches_a_rebuild(attendance_data, hierarchy):
+    create_attendance(attendance_data(week=1))
+    create_attendance(attendance_data(week=2, district_id=hierarchy["D2"]))
+    create_attendance(attendance_data(week=2, district_id=None))
+    create_attendance(attendance_data(week=5, month="June", service_type="Revival"))
+    incremental = rollups()
+
+    rebuild_attendance_rollups()
+    assert rollups() == incremental
@@ -0,0 +1,55 @@
+import pytest
+
+from app.controllers.attendance_controller import create_attendance
+from app.extensions import db
+from app.models import Attendance
+from app.utils.attendance_serializer import serialize_attendance
+
+SERVICES = ("Sunday Worship Service", "Bible Study", "Revival")
+
+
+def seed(attendance_data, hierarchy, rows):
+    districts = (hierarchy["D1"], hierarchy["D2"], None)  # None: a group-level submission
+    for i in range(rows):
+        create_attendance(attendance_data(
+            district_id=districts[i % 3], service_type=SERVICES[i // 3 % 3], week=i // 9 + 1,
+        ))
+    db.session.expire_all()  # no relationship left loaded from the inserts
+
+
+@pytest.mark.parametrize("include_names", [False, True])
+def test_statement_count_does_not_grow_with_the_page(attendance_data, hierarchy, count_statements, include_names):
+    counts = {}
+    for rows in (1, 18):
+        Attendance.query.delete()
+        seed(attendance_data, hierarchy, rows)
+        records = Attendance.query.order_by(Attendance.id).all()
+        assert len(records) == rows
+
+        with count_statements() as statements:
+            data = serialize_attendance(records, include_names)
+        counts[rows] = len(statements)
+
+        assert {item["district_name"] for item in data} <= {"D1", "D2", None}
+        if include_names:
+            assert {item["group_name"] for item in data} == {"G1"}
+
+    assert counts[1] == counts[18] == 1
+
+
+def test_list_route_statement_count_does_not_grow(client, attendance_data, hierarchy, make_user, auth_headers,
+                                                  count_statements):
+    headers = auth_headers(make_user("Super Admin"))
+    counts = {}
+    for rows in (1, 18):
+        Attendance.query.delete()
+        seed(attendance_data, hierarchy, rows)
+        db.session.commit()
+
+        with count_statements() as statements:
+            response = client.get("/attendance/attendance?include_names=true", headers=headers)
+        assert response.status_code == 200
+        assert len(response.get_json()) == rows
+        counts[rows] = len(statements)
+
+    assert counts[1] == counts[18]
@@ -0,0 +1,84 @@
+import pytest
+
+from app.controllers.attendance_controller import create_attendance, update_attendance
+from app.controllers.youth_attendance_controller import create_youth_attendance
+from app.extensions import db
+from app.models import Attendance, AttendanceRollup, YouthAttendance
+from app.utils.upsert import NaturalKeyConflictError
+
+
+@pytest.fixture
+def headers(make_user, auth_headers):
+    return auth_headers(make_user("Super Admin"))
+
+
+def rollup_totals():
+    return {(row.month, row.district_id): (row.record_count, row.men) for row in AttendanceRollup.query.all()}
+
+
+def test_moving_a_record_onto_another_returns_409(client, headers, attendance_data):
+    first = create_attendance(attendance_data(week=1, men=10))
+    second = create_attendance(attendance_data(week=2, men=20))
+    first_id, second_id = first.id, second.id
+    before = rollup_totals()
+
+    response = client.put(f"/attendance/attendance/{first_id}", json={"week": 2, "men": 99}, headers=headers)
+
+    assert response.status_code == 409
+    assert response.get_json()["existing_id"] == second_id
+    db.session.expire_all()
+    assert db.session.get(Attendance, first_id).week == 1
+    assert db.session.get(Attendance, first_id).men == 10
+    assert rollup_totals() == before
+
+
+def test_group_level_collision_is_detected(attendance_data):
+    # district_id NULL on both: only the COALESCEd key makes them collide
+    first = create_attendance(attendance_data(district_id=None, week=1))
+    second = create_attendance(attendance_data(district_id=None, week=3))
+
+    with pytest.raises(NaturalKeyConflictError) as raised:
+        update_attendance(first.id, {"week": 3})
+    assert raised.value.existing_id == second.id
+
+
+def test_update_refreshes_the_old_and_new_buckets(client, headers, attendance_data):
+    first = create_attendance(attendance_data(week=1, men=10))
+    create_attendance(attendance_data(week=2, men=20))
+
+    response = client.put(f"/attendance/attendance/{first.id}", json={"month": "June", "men": 5}, headers=headers)
+
+    assert response.status_code == 200
+    district_id = response.get_json()["district_id"]
+    assert rollup_totals() == {("May", district_id): (1, 20), ("June", district_id): (1, 5)}
+
+
+def test_updating_a_record_onto_its_own_key_is_not_a_conflict(client, headers, attendance_data):
+    record = create_attendance(attendance_data(week=1, men=10))
+
+    response = client.put(f"/attendance/attendance/{record.id}", json={"week": 1, "men": 11}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()["men"] == 11
+
+
+def test_missing_record_returns_404(client, headers, hierarchy):
+    assert client.put("/attendance/attendance/999", json={"men": 1}, headers=headers).status_code == 404
+
+
+def test_youth_attendance_collision_returns_409(client, headers, hierarchy):
+    def youth(week):
+        return create_youth_attendance({
+            "attendance_type": "weekly", "state_id": hierarchy["S1"], "region_id": hierarchy["R1"],
+            "district_id": hierarchy["D1"], "year": 2026, "month": "May", "week": week,
+            "member_boys": 1, "member_girls": 1, "visitor_boys": 0, "visitor_girls": 0,
+        })
+    first, second = youth(1), youth(2)
+    first_id, second_id = first.id, second.id
+
+    response = client.put(f"/youth-attendance/youth-attendance/{first_id}", json={"week": 2}, headers=headers)
+
+    assert response.status_code == 409
+    assert response.get_json()["existing_id"] == second_id
+    db.session.expire_all()
+    assert db.session.get(YouthAttendance, first_id).week == 1
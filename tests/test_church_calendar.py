@@ -0,0 +1,103 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.utils import church_calendar as module
+from app.utils.church_calendar import ChurchCalendar
+
+
+def frozen_utcnow(monkeypatch, instant):
+    """Make datetime.utcnow() in the calendar module return `instant` (an aware datetime) in UTC."""
+    utc = instant.astimezone(timezone.utc).replace(tzinfo=None)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return utc
+
+    monkeypatch.setattr(module, "datetime", FrozenDatetime)
+
+
+@pytest.mark.parametrize("day, week", [
+    (date(2026, 1, 1), 1),
+    (date(2026, 1, 7), 1),
+    (date(2026, 1, 8), 2),
+    (date(2026, 1, 31), 5),
+    (date(2026, 2, 1), 1),
+    (date(2026, 2, 28), 4),
+    (date(2024, 2, 29), 5),   # leap day
+    (date(2026, 12, 31), 5),
+    (date(2027, 1, 1), 1),
+])
+def test_day_rule_counts_seven_day_blocks_from_the_first(day, week):
+    assert ChurchCalendar("day").week_of(day) == week
+
+
+@pytest.mark.parametrize("day, week", [
+    (date(2026, 1, 1), 1),    # Thursday: week 1 runs until the first Sunday
+    (date(2026, 1, 3), 1),
+    (date(2026, 1, 4), 2),    # first Sunday
+    (date(2026, 1, 31), 5),
+    (date(2026, 2, 1), 1),    # month starting on a Sunday
+    (date(2026, 2, 8), 2),
+    (date(2026, 8, 1), 1),    # Saturday: a one-day week 1
+    (date(2026, 8, 2), 2),
+    (date(2026, 8, 31), 6),
+    (date(2026, 12, 31), 5),
+    (date(2027, 1, 3), 2),    # year boundary: Jan 1 2027 is a Friday
+])
+def test_sunday_rule_starts_weeks_on_sunday(day, week):
+    assert ChurchCalendar("sunday").week_of(day) == week
+
+
+@pytest.mark.parametrize("rule, year, month, total_weeks", [
+    ("day", 2026, 2, 4),
+    ("day", 2024, 2, 5),
+    ("day", 2026, 1, 5),
+    ("sunday", 2026, 2, 4),
+    ("sunday", 2026, 8, 6),
+    ("monday", 2026, 6, 5),   # June 1 2026 is a Monday
+])
+def test_total_weeks(rule, year, month, total_weeks):
+    assert ChurchCalendar(rule).month(year, month).total_weeks == total_weeks
+
+
+def test_unknown_rule_is_rejected():
+    with pytest.raises(ValueError):
+        ChurchCalendar("fortnight").month(2026, 1)
+
+
+@pytest.mark.parametrize("instant, expected", [
+    # Late evening west of UTC is already the next month (and week 1) in UTC
+    (datetime(2026, 1, 31, 23, 30, tzinfo=timezone(timedelta(hours=-5))), (2026, "February", 1, 4)),
+    (datetime(2026, 6, 30, 22, 0, tzinfo=timezone(timedelta(hours=-3))), (2026, "July", 1, 5)),
+    # Just after midnight east of UTC is still the previous month/year in UTC
+    (datetime(2026, 3, 1, 0, 15, tzinfo=timezone(timedelta(hours=1))), (2026, "February", 4, 4)),
+    (datetime(2027, 1, 1, 0, 30, tzinfo=timezone(timedelta(hours=1))), (2026, "December", 5, 5)),
+    (datetime(2026, 12, 31, 23, 59, tzinfo=timezone.utc), (2026, "December", 5, 5)),
+    (datetime(2027, 1, 1, 0, 0, tzinfo=timezone.utc), (2027, "January", 1, 5)),
+])
+def test_today_uses_the_utc_date(monkeypatch, instant, expected):
+    frozen_utcnow(monkeypatch, instant)
+    assert ChurchCalendar("day").today() == expected
+
+
+def test_month_change_drops_the_previous_month(monkeypatch):
+    calendar = ChurchCalendar("day")
+
+    frozen_utcnow(monkeypatch, datetime(2026, 12, 31, 23, 59, tzinfo=timezone.utc))
+    assert calendar.today()[:2] == (2026, "December")
+
+    frozen_utcnow(monkeypatch, datetime(2027, 1, 1, 0, 1, tzinfo=timezone.utc))
+    assert calendar.today()[:2] == (2027, "January")
+    assert list(calendar._months) == [(2027, 1, "day")]
+
+
+def test_rule_comes_from_the_app_config(app):
+    with app.app_context():
+        app.config["CHURCH_WEEK_START"] = "Sunday"
+        try:
+            assert ChurchCalendar().week_of(date(2026, 1, 4)) == 2
+        finally:
+            app.config["CHURCH_WEEK_START"] = "day"
+        assert ChurchCalendar().week_of(date(2026, 1, 4)) == 1
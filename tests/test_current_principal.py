@@ -0,0 +1,69 @@
+import pytest
+from flask_jwt_extended import create_access_token, verify_jwt_in_request
+
+from app.extensions import db
+from app.models import Role
+from app.utils.access_control import (
+    CLAIMS_VERSION, ClaimsUser, get_current_principal, resolve_scope, user_claims,
+)
+
+
+def token_for(user, **claims):
+    """Access token for `user` with its login claims, overridden by `claims` (None drops one)."""
+    claims = {**user_claims(user), **claims}
+    claims = {key: value for key, value in claims.items() if value is not None}
+    return create_access_token(identity=str(user.id), additional_claims=claims)
+
+
+def principal_for(app, token, count_statements):
+    """get_current_principal() inside a request carrying `token`, and the statements it ran."""
+    with app.test_request_context(headers={"Authorization": f"Bearer {token}"}):
+        verify_jwt_in_request()
+        with count_statements() as statements:
+            principal = get_current_principal()
+            scope = resolve_scope(principal)
+    return principal, scope, statements
+
+
+def user_queries(statements):
+    return [sql for sql in statements if "FROM users" in sql]
+
+
+def test_claims_token_runs_no_user_queries(app, make_user, hierarchy, count_statements):
+    admin = make_user("State Admin", state_id=hierarchy["S1"])
+
+    principal, scope, statements = principal_for(app, token_for(admin), count_statements)
+
+    assert isinstance(principal, ClaimsUser)
+    assert principal.id == admin.id
+    assert scope == ("state", hierarchy["S1"])
+    assert statements == []
+
+
+@pytest.mark.parametrize("claims_v", [None, CLAIMS_VERSION + 1])
+def test_missing_or_stale_claims_fall_back_to_the_database(app, make_user, hierarchy, count_statements, claims_v):
+    admin = make_user("State Admin", state_id=hierarchy["S1"])
+    # Token claims say S2; only the database is trusted for this claims layout
+    token = token_for(admin, claims_v=claims_v, state_id=hierarchy["S2"])
+
+    principal, scope, statements = principal_for(app, token, count_statements)
+
+    assert not isinstance(principal, ClaimsUser)
+    assert principal.id == admin.id
+    assert scope == ("state", hierarchy["S1"])
+    assert len(user_queries(statements)) == 1
+
+
+def test_require_role_checks_current_roles(client, make_user, auth_headers, hierarchy):
+    admin = make_user("Super Admin")
+    headers = auth_headers(admin)
+
+    admin.roles = [Role.query.filter_by(name="State Admin").one()]
+    db.session.commit()
+    response = client.post("/hierarchy/states", headers=headers, json={"name": "S3", "code": "S3"})
+    assert response.status_code == 403
+
+    db.session.delete(admin)
+    db.session.commit()
+    response = client.post("/hierarchy/states", headers=headers, json={"name": "S3", "code": "S3"})
+    assert response.status_code == 401
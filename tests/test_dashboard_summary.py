@@ -0,0 +1,128 @@
+import pytest
+
+from app.controllers import dashboard_controller
+from app.controllers.attendance_controller import create_attendance
+from app.controllers.dashboard_controller import SummaryCache, get_dashboard_summary
+
+PEOPLE_PER_SUBMISSION = 10 + 12 + 3 + 4 + 5 + 6  # attendance_data defaults
+
+
+@pytest.fixture
+def seeded(attendance_data, hierarchy):
+    """Two S1 submissions (D1, D2) and one region-level S2 submission."""
+    create_attendance(attendance_data(week=1))
+    create_attendance(attendance_data(week=1, district_id=hierarchy["D2"]))
+    create_attendance(attendance_data(
+        week=1, state_id=hierarchy["S2"], region_id=hierarchy["R2"],
+        old_group_id=None, group_id=None, district_id=None,
+    ))
+    return hierarchy
+
+
+@pytest.fixture
+def cache(app, monkeypatch):
+    """A fresh summary cache with a 30s TTL and a controllable clock."""
+    monkeypatch.setitem(app.config, "DASHBOARD_CACHE_SECONDS", 30)
+    cache = SummaryCache()
+    monkeypatch.setattr(dashboard_controller, "summary_cache", cache)
+
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(dashboard_controller.time, "monotonic", lambda: clock["now"])
+    cache.clock = clock
+    return cache
+
+
+def state_scope(state_id):
+    return {"scope": "state", "state_id": state_id, "filters": {"state_id": state_id}}
+
+
+@pytest.mark.parametrize("scope", ["global", "state", "region"])
+def test_summary_is_a_single_statement(seeded, count_statements, scope):
+    access_scope = {
+        "global": {"scope": "global"},
+        "state": state_scope(seeded["S1"]),
+        "region": {"scope": "region", "filters": {"state_id": seeded["S1"], "region_id": seeded["R1"]}},
+    }[scope]
+
+    with count_statements() as statements:
+        get_dashboard_summary(access_scope)
+    assert len(statements) == 1
+
+
+def test_summary_is_scoped(seeded):
+    everything = get_dashboard_summary({"scope": "global"})
+    s1 = get_dashboard_summary(state_scope(seeded["S1"]))
+    s2 = get_dashboard_summary(state_scope(seeded["S2"]))
+
+    assert everything["total_attendance_records"] == 3
+    assert everything["states_count"] == 2
+    assert s1["total_attendance_records"] == 2
+    assert s1["total_attendance"] == 2 * PEOPLE_PER_SUBMISSION
+    assert s1["districts_count"] == 2
+    assert s2["total_attendance_records"] == 1
+    assert s2["districts_count"] == 0
+    assert "states_count" not in s1
+
+
+def test_repeated_calls_within_the_ttl_run_no_statement(seeded, cache, count_statements):
+    with count_statements() as first:
+        summary = get_dashboard_summary(state_scope(seeded["S1"]))
+    with count_statements() as second:
+        assert get_dashboard_summary(state_scope(seeded["S1"])) == summary
+    assert (len(first), len(second)) == (1, 0)
+
+
+def test_each_scope_has_its_own_entry(seeded, cache, count_statements):
+    s1 = get_dashboard_summary(state_scope(seeded["S1"]))
+
+    with count_statements() as statements:
+        s2 = get_dashboard_summary(state_scope(seeded["S2"]))
+    assert len(statements) == 1
+    assert s1["total_attendance_records"] == 2
+    assert s2["total_attendance_records"] == 1
+
+
+def test_callers_get_a_copy(seeded, cache):
+    get_dashboard_summary(state_scope(seeded["S1"]))["total_users"] = -1
+    assert get_dashboard_summary(state_scope(seeded["S1"]))["total_users"] != -1
+
+
+def test_writes_show_up_once_the_entry_expires(seeded, cache, attendance_data):
+    before = get_dashboard_summary(state_scope(seeded["S1"]))["total_attendance_records"]
+    create_attendance(attendance_data(week=2))
+
+    # TTL-only: still the cached figure...
+    assert get_dashboard_summary(state_scope(seeded["S1"]))["total_attendance_records"] == before
+    # ...until DASHBOARD_CACHE_SECONDS have passed
+    cache.clock["now"] += 31
+    assert get_dashboard_summary(state_scope(seeded["S1"]))["total_attendance_records"] == before + 1
+
+
+def test_ttl_zero_disables_the_cache(seeded, app, monkeypatch, count_statements):
+    monkeypatch.setitem(app.config, "DASHBOARD_CACHE_SECONDS", 0)
+    monkeypatch.setattr(dashboard_controller, "summary_cache", SummaryCache())
+
+    with count_statements() as statements:
+        get_dashboard_summary(state_scope(seeded["S1"]))
+        get_dashboard_summary(state_scope(seeded["S1"]))
+    assert len(statements) == 2
+
+
+def test_route_shares_the_entry_between_admins_of_a_scope(client, seeded, cache, make_user, auth_headers,
+                                                        count_statements):
+    first = auth_headers(make_user("State Admin", "one@example.com", state_id=seeded["S1"]))
+    second = auth_headers(make_user("State Admin", "two@example.com", state_id=seeded["S1"]))
+    other_state = auth_headers(make_user("State Admin", "three@example.com", state_id=seeded["S2"]))
+
+    response = client.get("/dashboard/dashboard/summary", headers=first)
+    assert response.status_code == 200
+    assert response.get_json()["total_attendance_records"] == 2
+
+    with count_statements() as statements:
+        response = client.get("/dashboard/dashboard/summary", headers=second)
+    assert response.get_json()["total_attendance_records"] == 2
+    assert statements == []
+
+    response = client.get("/dashboard/dashboard/summary", headers=other_state)
+    assert response.get_json()["total_attendance_records"] == 1
+    assert response.get_json()["user_scope"] == "state"
@@ -0,0 +1,89 @@
+import pytest
+
+from app.extensions import db
+from app.models import State
+from app.utils.hierarchy_cache import bump_hierarchy_version
+
+
+@pytest.fixture
+def super_admin(make_user, auth_headers, hierarchy):
+    return auth_headers(make_user("Super Admin"))
+
+
+def get_states(client, headers, **extra):
+    return client.get("/hierarchy/states", headers={**headers, **extra})
+
+
+def test_scopes_get_different_etags(client, make_user, auth_headers, hierarchy):
+    s1_admin = auth_headers(make_user("State Admin", "s1@example.com", state_id=hierarchy["S1"]))
+    other_s1_admin = auth_headers(make_user("State Admin", "s1b@example.com", state_id=hierarchy["S1"]))
+    s2_admin = auth_headers(make_user("State Admin", "s2@example.com", state_id=hierarchy["S2"]))
+
+    s1 = get_states(client, s1_admin)
+    assert [s["name"] for s in s1.get_json()] == ["S1"]
+    assert get_states(client, other_s1_admin).get_etag() == s1.get_etag()
+    assert get_states(client, s2_admin).get_etag() != s1.get_etag()
+
+    # An S1 validator does not revalidate the S2 listing
+    response = get_states(client, s2_admin, **{"If-None-Match": s1.headers["ETag"]})
+    assert response.status_code == 200
+    assert [s["name"] for s in response.get_json()] == ["S2"]
+
+
+def test_matching_if_none_match_gets_304(client, super_admin, count_statements):
+    first = get_states(client, super_admin)
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, max-age=0"
+    etag, weak = first.get_etag()
+    assert etag and not weak
+
+    with count_statements() as statements:
+        response = get_states(client, super_admin, **{"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.get_etag() == (etag, False)
+    assert not any("FROM states" in sql for sql in statements)
+
+
+@pytest.mark.parametrize("path", ["/hierarchy/states", "/hierarchy/regions/by_state/{S1}"])
+def test_hierarchy_write_changes_the_etag(client, super_admin, hierarchy, path):
+    path = path.format(**hierarchy)
+    before = client.get(path, headers=super_admin)
+
+    response = client.post("/hierarchy/states", headers=super_admin, json={"name": "S3", "code": "S3"})
+    assert response.status_code == 201
+
+    after = client.get(path, headers={**super_admin, "If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.get_etag() != before.get_etag()
+
+
+def test_version_bump_changes_the_etag(client, super_admin):
+    before = get_states(client, super_admin)
+    bump_hierarchy_version()
+    db.session.commit()
+
+    assert get_states(client, super_admin).get_etag() != before.get_etag()
+
+
+def test_weak_validator_matches(client, super_admin):
+    etag, _ = get_states(client, super_admin).get_etag()
+
+    response = get_states(client, super_admin, **{"If-None-Match": f'"other", W/"{etag}"'})
+    assert response.status_code == 304
+
+
+def test_compressed_response_revalidates_with_its_weak_etag(client, super_admin):
+    db.session.add_all([State(name=f"State number {i:03}", code=f"X{i:03}") for i in range(60)])
+    db.session.commit()
+
+    identity = get_states(client, super_admin)
+    compressed = get_states(client, super_admin, **{"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.get_etag() == (identity.get_etag()[0], True)
+
+    response = get_states(client, super_admin, **{
+        "Accept-Encoding": "gzip", "If-None-Match": compressed.headers["ETag"],
+    })
+    assert response.status_code == 304
+    assert "Content-Encoding" not in response.headers
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from app.extensions import db
+from app.models import NotificationJob, NotificationOutbox, OldGroup
+from app.utils.notification_outbox import enqueue_reminder_job, plan_job, plan_queued_jobs
+
+
+@pytest.fixture
+def queued_job(hierarchy):
+    db.session.get(OldGroup, hierarchy["OG1"]).leader_email = "leader@example.com"
+    db.session.commit()
+    return enqueue_reminder_job("old_group", hierarchy["OG1"], methods=("email",))
+
+
+def in_other_worker(app, fn):
+    """Run `fn` in its own thread and app context (so its own session and connection)."""
+    result = {}
+
+    def run():
+        with app.app_context():
+            result["value"] = fn()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return result["value"]
+
+
+def test_plans_a_queued_job_once(queued_job):
+    assert plan_queued_jobs() == 1
+    assert plan_queued_jobs() == 0
+
+    job = db.session.get(NotificationJob, queued_job.id)
+    assert job.status == "running"
+    assert job.total == NotificationOutbox.query.count() == 1
+
+
+def test_a_job_claimed_by_another_worker_is_skipped(app, queued_job):
+    # This worker read the job while it was queued...
+    job = db.session.get(NotificationJob, queued_job.id)
+    assert job.status == "queued"
+
+    # ...but another worker planned it first
+    assert in_other_worker(app, plan_queued_jobs) == 1
+
+    assert plan_job(job) is False
+    assert NotificationOutbox.query.count() == 1
+
+
+def test_concurrent_workers_plan_each_job_once(app, queued_job):
+    enqueue_reminder_job("old_group", queued_job.entity_id, methods=("email",))
+    db.session.remove()
+
+    barrier = threading.Barrier(3)
+    planned = []
+
+    def worker():
+        with app.app_context():
+            barrier.wait()
+            planned.append(plan_queued_jobs())
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(planned) == 2
+    assert NotificationOutbox.query.count() == 2
+
+
+def test_a_failed_plan_marks_the_job_failed(hierarchy):
+    missing = enqueue_reminder_job("old_group", 999, methods=("email",))
+
+    assert plan_queued_jobs() == 0
+    job = db.session.get(NotificationJob, missing.id)
+    assert job.status == "failed"
+    assert job.error == "Entity not found"
+    assert NotificationOutbox.query.count() == 0
@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import time
+
+from flask import Flask
+
+from app.extensions import db
+from app.models import SchedulerLease
+from app.tasks.leader import SchedulerLeader
+
+WORKERS = 3
+LEASE_SECONDS = 1.0
+HEARTBEAT_SECONDS = 0.1
+CRASH_AT = 1.5     # seconds after the start: the leader at that point dies without releasing
+RUN_FOR = 4.5
+
+
+class FakeScheduler:
+    def start(self):
+        pass
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def lease_worker(database_url, barrier, crash, events):
+    """One app process: heartbeat like the real thread, report (holder, leader?, time) after each round."""
+    app = Flask("lease-worker")
+    app.config.update(SQLALCHEMY_DATABASE_URI=database_url, SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+    leader = SchedulerLeader(app, FakeScheduler, name="test", lease_seconds=LEASE_SECONDS,
+                             heartbeat_seconds=HEARTBEAT_SECONDS)
+
+    barrier.wait()
+    start = time.time()
+    while time.time() - start < RUN_FOR:
+        leader.heartbeat()
+        now = time.time()
+        events.put((leader.holder_id, leader.is_leader, now))
+        if leader.is_leader and now - start >= CRASH_AT:
+            with crash.get_lock():
+                crashing, crash.value = not crash.value, True
+            if crashing:
+                events.put((leader.holder_id, "crashed", now))
+                os._exit(0)  # no release, no atexit: the lease has to expire
+        time.sleep(HEARTBEAT_SECONDS)
+    leader.stop()
+
+
+def leadership_intervals(events):
+    """Contiguous runs of is_leader=True per holder, as (start, end, holder)."""
+    intervals, open_runs = [], {}
+    for holder, leader, at in sorted(events, key=lambda event: event[2]):
+        if leader is True:
+            start, _ = open_runs.get(holder, (at, at))
+            open_runs[holder] = (start, at)
+        elif holder in open_runs:
+            start, end = open_runs.pop(holder)
+            intervals.append((start, end, holder))
+    intervals.extend((start, end, holder) for holder, (start, end) in open_runs.items())
+    return sorted(intervals)
+
+
+def test_one_leader_at_a_time_and_failover_after_expiry(app, database):
+    database_url = app.config["SQLALCHEMY_DATABASE_URI"]
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(WORKERS)
+    crash = context.Value("b", False)
+    events = context.SimpleQueue()  # unbuffered: nothing is lost when a worker exits abruptly
+
+    processes = [
+        context.Process(target=lease_worker, args=(database_url, barrier, crash, events))
+        for _ in range(WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    collected = []
+    while not events.empty():
+        collected.append(events.get())
+    crashed = [holder for holder, state, _ in collected if state == "crashed"]
+    intervals = leadership_intervals([event for event in collected if event[1] != "crashed"])
+
+    # Exactly one process led at the crash, and only it died
+    assert len(crashed) == 1
+
+    # Leadership intervals of different processes never overlap
+    for (_, end, holder), (next_start, _, next_holder) in zip(intervals, intervals[1:]):
+        assert holder == next_holder or end < next_start, intervals
+
+    # Someone else took over, but only once the dead leader's lease had run out
+    assert intervals[0][2] == crashed[0], intervals
+    last_renewal = max(end for _, end, holder in intervals if holder == crashed[0])
+    takeover = next(start for start, _, holder in intervals if holder != crashed[0])
+    assert LEASE_SECONDS - HEARTBEAT_SECONDS <= takeover - last_renewal < LEASE_SECONDS + 1.0, intervals
+
+    lease = db.session.get(SchedulerLease, "test")
+    assert lease.holder is None  # the survivor released it on stop()
@@ -0,0 +1,103 @@
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from app.utils import whatsapp_service as module
+from app.utils.whatsapp_service import WhatsAppService
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = ""
+
+    def json(self):
+        return {"messages": [{"id": "wamid.1"}]}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("WHATSAPP_MAX_RETRIES", "3")
+    monkeypatch.setenv("WHATSAPP_MAX_RETRY_AFTER", "30")
+    service = WhatsAppService()
+    service.sleeps = []
+    monkeypatch.setattr(module.time, "sleep", service.sleeps.append)
+    return service
+
+
+def respond(service, monkeypatch, *outcomes):
+    """session.post returns (or raises) each outcome in turn; returns the call log."""
+    calls = []
+    outcomes = list(outcomes)
+
+    def post(*args, **kwargs):
+        calls.append(kwargs)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(service.session, "post", post)
+    return calls
+
+
+def refused():
+    reason = NewConnectionError(None, "Failed to establish a new connection: [Errno 111] Connection refused")
+    return requests.ConnectionError(MaxRetryError(None, "/messages", reason))
+
+
+@pytest.mark.parametrize("error", [
+    requests.exceptions.ConnectTimeout("connect timed out"),
+    refused(),
+], ids=["connect-timeout", "connection-refused"])
+def test_unsent_requests_are_retried(service, monkeypatch, error):
+    calls = respond(service, monkeypatch, error, FakeResponse(200))
+
+    assert service.send_message("2348000000000", "hi") is True
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("error", [
+    requests.exceptions.ReadTimeout("read timed out"),
+    requests.ConnectionError(ProtocolError("Connection aborted.", ConnectionResetError())),
+], ids=["read-timeout", "connection-dropped"])
+def test_requests_that_may_have_been_delivered_are_not_retried(service, monkeypatch, error):
+    calls = respond(service, monkeypatch, error, FakeResponse(200))
+
+    assert service.send_message("2348000000000", "hi") is False
+    assert len(calls) == 1
+    assert service.sleeps == []
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_rate_limit_and_server_errors_are_retried(service, monkeypatch, status):
+    calls = respond(service, monkeypatch, FakeResponse(status), FakeResponse(200))
+
+    assert service.send_message("2348000000000", "hi") is True
+    assert len(calls) == 2
+
+
+def test_client_errors_are_not_retried(service, monkeypatch):
+    calls = respond(service, monkeypatch, FakeResponse(400), FakeResponse(200))
+
+    assert service.send_message("2348000000000", "hi") is False
+    assert len(calls) == 1
+
+
+def test_retry_after_is_honoured_up_to_the_configured_maximum(service, monkeypatch):
+    respond(service, monkeypatch,
+            FakeResponse(429, {"Retry-After": "2"}),
+            FakeResponse(429, {"Retry-After": "3600"}),
+            FakeResponse(200))
+
+    assert service.send_message("2348000000000", "hi") is True
+    assert service.sleeps == [2.0, 30.0]
+
+
+def test_gives_up_after_max_retries(service, monkeypatch):
+    calls = respond(service, monkeypatch, *[FakeResponse(503)] * 4)
+
+    assert service.send_message("2348000000000", "hi") is False
+    assert len(calls) == 4
+    assert len(service.sleeps) == 3
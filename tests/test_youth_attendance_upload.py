@@ -0,0 +1,24 @@
+import io
+
+from app.models import YouthAttendance
+
+HEADER = "state_id,region_id,district_id,group_id,old_group_id,year,month,week,member_boys,member_girls\n"
+
+
+def upload(client, headers, body):
+    return client.post("/youth-attendance/youth-attendance/upload?attendance_type=weekly", headers=headers,
+                       data={"file": (io.BytesIO(body.encode()), "youth.csv")}, content_type="multipart/form-data")
+
+
+def test_upload_counts_distinct_submissions(client, make_user, auth_headers, hierarchy):
+    headers = auth_headers(make_user("Super Admin"))
+    ids = "{S1},{R1},{D1},{G1},{OG1}".format(**hierarchy)
+    body = HEADER + f"{ids},2026,May,1,3,4\n" + f"{ids},2026,May,1,5,6\n" + f"{ids},2026,May,2,1,1\n"
+
+    response = upload(client, headers, body)
+    assert response.status_code == 201
+    assert response.get_json()["message"] == "2 records uploaded"
+
+    week_one = YouthAttendance.query.filter_by(week=1).one()
+    assert (week_one.member_boys, week_one.member_girls) == (5, 6)
+    assert YouthAttendance.query.count() == 2